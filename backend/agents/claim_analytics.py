@@ -0,0 +1,187 @@
+# backend/agents/claim_analytics.py
+import asyncio
+import logging
+from config import Config
+from services.claim_index import claim_vector_index
+from services.neo4j_async_service import neo4j_async_service
+from utils.helpers import claim_id
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Spread aggregates are maintained by the post write itself (see POST_WRITE_QUERY), so reads never
+# scan CONTAINS_CLAIM edges:
+#   (Claim)   postCount, authorCount, firstSeen, lastSeen, claimId
+#   (Entity)  postCount, firstSeen, lastSeen (counting MENTIONS links only)
+#   (Author)-[:SPREAD {posts}]->(Claim)             that author's posts carrying the claim
+#   (Claim)-[:VERDICT_MIX {posts}]->(FactCheckVerdict)  posts carrying the claim, per current post verdict
+# A post's current verdict is kept in p.verdict, and its seen time in p.seenAt: its timestamp parsed to a
+# datetime (see utils.helpers.parse_timestamp), else its creation time. firstSeen/lastSeen are datetimes too.
+
+# Moves a post's claims from the counter of `previousVerdict` to that of p.verdict. Expects `p` and `previousVerdict` in scope.
+VERDICT_MIX_MOVE = """
+CALL {
+    WITH p, previousVerdict
+    WITH p, previousVerdict WHERE coalesce(previousVerdict, '') <> coalesce(p.verdict, '')
+    MATCH (p)-[:CONTAINS_CLAIM]->(c:Claim)
+    OPTIONAL MATCH (c)-[old:VERDICT_MIX]->(:FactCheckVerdict {value: previousVerdict})
+    SET old.posts = old.posts - 1
+    FOREACH (counter IN CASE WHEN old.posts <= 0 THEN [old] ELSE [] END | DELETE counter)
+    WITH p, c
+    MATCH (v:FactCheckVerdict {value: p.verdict})
+    MERGE (c)-[m:VERDICT_MIX]->(v) ON CREATE SET m.posts = 1 ON MATCH SET m.posts = m.posts + 1
+}
+"""
+
+UPDATE_VERDICT_QUERY = """
+MATCH (p:Post {id: $postId})
+WITH p, p.verdict AS previousVerdict
+MERGE (v:FactCheckVerdict {value: $verdictValue}) MERGE (s:FactCheckSource {name: $sourceName})
+MERGE (p)-[:HAS_VERDICT]->(v) MERGE (v)-[:FROM_SOURCE]->(s)
+SET p.verdict = $verdictValue
+WITH p, previousVerdict
+""" + VERDICT_MIX_MOVE
+
+CLAIM_FIELDS = """
+RETURN c.claimId AS claimId, c.text AS text, coalesce(c.postCount, 0) AS postCount,
+       coalesce(c.authorCount, 0) AS authorCount, c.firstSeen AS firstSeen, c.lastSeen AS lastSeen
+"""
+
+# Sort key -> indexed Claim property; each ORDER BY ... LIMIT is served from its range index.
+TOP_CLAIMS_SORTS = {"posts": "postCount", "authors": "authorCount", "recent": "lastSeen"}
+
+CLAIM_SPREAD_QUERY = """
+MATCH (c:Claim {claimId: $claimId})
+""" + CLAIM_FIELDS + """,
+       [(c)-[m:VERDICT_MIX]->(v:FactCheckVerdict) | {verdict: v.value, posts: m.posts}] AS verdicts
+"""
+
+# --- Full rebuild, for data written before the aggregates existed or after manual edits ---------
+
+# Posts written before p.seenAt existed take it from an ISO 8601 timestamp, else their creation time.
+POST_REBUILD_QUERY = """
+MATCH (p:Post) WHERE p.id > $after
+WITH p ORDER BY p.id LIMIT $limit
+SET p.verdict = coalesce(p.verdict, head([(p)-[:HAS_VERDICT]->(v:FactCheckVerdict) | v.value])),
+    p.seenAt = coalesce(p.seenAt, head([(p)-[:AT_TIME]->(t:Timestamp) WHERE t.value =~ $isoPattern | datetime(t.value)]), p.createdAt)
+RETURN max(p.id) AS last
+"""
+ISO_TIMESTAMP_PATTERN = r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})"
+
+CLAIM_PAGE_QUERY = "MATCH (c:Claim) WHERE c.text > $after RETURN c.text AS text ORDER BY c.text LIMIT $limit"
+
+CLAIM_SPREAD_REBUILD_QUERY = """
+UNWIND $claims AS claim
+MATCH (c:Claim {text: claim.text})
+SET c.claimId = coalesce(c.claimId, claim.id)
+WITH c
+CALL { WITH c MATCH (:Author)-[s:SPREAD]->(c) DELETE s }
+CALL { WITH c MATCH (c)-[m:VERDICT_MIX]->(:FactCheckVerdict) DELETE m }
+CALL {
+    WITH c
+    MATCH (a:Author)-[:CREATED]->(p:Post)-[:CONTAINS_CLAIM]->(c)
+    WITH c, a, count(DISTINCT p) AS posts
+    CREATE (a)-[:SPREAD {posts: posts}]->(c)
+}
+CALL {
+    WITH c
+    MATCH (p:Post)-[:CONTAINS_CLAIM]->(c)
+    MATCH (v:FactCheckVerdict {value: p.verdict})
+    WITH c, v, count(p) AS posts
+    CREATE (c)-[:VERDICT_MIX {posts: posts}]->(v)
+}
+CALL {
+    WITH c
+    OPTIONAL MATCH (p:Post)-[:CONTAINS_CLAIM]->(c)
+    WITH c, p, coalesce(p.seenAt, p.createdAt) AS seenAt
+    WITH c, count(p) AS posts, min(seenAt) AS firstSeen, max(seenAt) AS lastSeen
+    SET c.postCount = posts, c.firstSeen = firstSeen, c.lastSeen = lastSeen,
+        c.authorCount = size([(a:Author)-[:SPREAD]->(c) | a])
+}
+RETURN count(c) AS claims
+"""
+
+ENTITY_SPREAD_REBUILD_QUERY = """
+MATCH (e:Entity) WHERE e.name > $after
+WITH e ORDER BY e.name LIMIT $limit
+CALL {
+    WITH e
+    OPTIONAL MATCH (p:Post)-[:MENTIONS]->(e)
+    WITH e, p, coalesce(p.seenAt, p.createdAt) AS seenAt
+    WITH e, count(p) AS posts, min(seenAt) AS firstSeen, max(seenAt) AS lastSeen
+    SET e.postCount = posts, e.firstSeen = firstSeen, e.lastSeen = lastSeen
+}
+RETURN max(e.name) AS last
+"""
+
+class ClaimAnalytics:
+    """
+    Answers claim questions in time independent of graph size: spread from the precomputed
+    aggregates, similarity from the local vector index.
+    """
+
+    def __init__(self, neo4j=None, vector_index=None):
+        self.neo4j = neo4j or neo4j_async_service
+        self.vector_index = vector_index or claim_vector_index
+
+    async def top_claims(self, sort: str = "posts", limit: int = 20) -> list[dict]:
+        """The claims with the most posts, most authors, or most recent sighting."""
+        prop = TOP_CLAIMS_SORTS[sort]
+        query = f"MATCH (c:Claim) WHERE c.{prop} IS NOT NULL AND c.postCount > 0 {CLAIM_FIELDS} ORDER BY c.{prop} DESC LIMIT $limit"
+        records = await self.neo4j.read(query, {"limit": limit})
+        return [record.data() for record in records]
+
+    async def claim_spread(self, claim_id: str) -> dict:
+        """Post and author counts, first/last seen and verdict mix of one claim, or None if unknown."""
+        records = await self.neo4j.read(CLAIM_SPREAD_QUERY, {"claimId": claim_id})
+        if not records:
+            return None
+        spread = records[0].data()
+        spread['verdicts'] = sorted(spread['verdicts'], key=lambda mix: -mix['posts'])
+        return spread
+
+    async def similar_claims(self, claims: list[str], k: int = 5, min_score: float = 0.0) -> list[dict]:
+        """Stored claims most similar to each given claim, from the local vector index (no LLM, no Neo4j)."""
+        matches = await asyncio.to_thread(self.vector_index.search, claims, k, min_score)
+        return [{"query": claim, "matches": claim_matches} for claim, claim_matches in zip(claims, matches)]
+
+    async def index_claims(self, page_size: int = None) -> int:
+        """Adds every Claim in the graph to the vector index, e.g. for claims written before it existed."""
+        page_size = page_size or Config.SPREAD_REBUILD_PAGE_SIZE
+        added, after = 0, ""
+        while True:
+            texts = [record['text'] for record in await self.neo4j.read(CLAIM_PAGE_QUERY, {"after": after, "limit": page_size})]
+            if not texts:
+                return added
+            added += await asyncio.to_thread(self.vector_index.add, texts)
+            after = texts[-1]
+
+    async def _rebuild_pages(self, query: str, page_size: int, params: dict = None) -> int:
+        after, pages = "", 0
+        while True:
+            records = await self.neo4j.write(query, {**(params or {}), "after": after, "limit": page_size})
+            last = records[0]['last'] if records else None
+            if last is None:
+                return pages
+            after, pages = last, pages + 1
+
+    async def rebuild(self, page_size: int = None) -> dict:
+        """
+        Recomputes every aggregate from the CONTAINS_CLAIM and MENTIONS links, one page per
+        transaction. Idempotent; only needed for graphs written before the aggregates existed.
+        """
+        page_size = page_size or Config.SPREAD_REBUILD_PAGE_SIZE
+        await self._rebuild_pages(POST_REBUILD_QUERY, page_size, {"isoPattern": ISO_TIMESTAMP_PATTERN})
+        claims, after = 0, ""
+        while True:
+            texts = [record['text'] for record in await self.neo4j.read(CLAIM_PAGE_QUERY, {"after": after, "limit": page_size})]
+            if not texts:
+                break
+            await self.neo4j.write(CLAIM_SPREAD_REBUILD_QUERY, {"claims": [{"text": text, "id": claim_id(text)} for text in texts]})
+            claims, after = claims + len(texts), texts[-1]
+            logger.info(f"Rebuilt spread aggregates of {claims} claims.")
+        entity_pages = await self._rebuild_pages(ENTITY_SPREAD_REBUILD_QUERY, page_size)
+        return {"claims": claims, "entity_pages": entity_pages}
+
+# Global instance for easy access
+claim_analytics = ClaimAnalytics()
@@ -0,0 +1,421 @@
+# backend/agents/csv_export.py
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import os
+import shlex
+import time
+from datetime import datetime, timezone
+from config import Config
+from agents.dataset_loader import dataset_loader
+from agents.ingestion_jobs import IngestionJobManager
+from agents.ingestion_pipeline import IngestionStats, run_ingestion_pipeline
+from utils.helpers import claim_id
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Label -> columns as (property, import type). The first column is the node key and its ID space
+# in neo4j-admin import, matching the uniqueness constraints in services/schema.py.
+NODE_COLUMNS = {
+    "Post": [("id", "ID"), ("content", None), ("summary", None), ("extractionTier", None), ("contentHash", None),
+             ("verdict", None), ("createdAt", "datetime"), ("seenAt", "datetime")],
+    "Author": [("name", "ID")],
+    "Timestamp": [("value", "ID")],
+    "FactCheckVerdict": [("value", "ID")],
+    "FactCheckSource": [("name", "ID")],
+    "Claim": [("text", "ID"), ("claimId", None)],
+    "Entity": [("name", "ID")],
+    "Keyword": [("text", "ID")],
+    "Hashtag": [("tag", "ID")],
+}
+
+# Relationship type -> (start label, end label, property columns), as written by POST_WRITE_QUERY.
+RELATIONSHIP_COLUMNS = {
+    "CREATED": ("Author", "Post", []),
+    "AT_TIME": ("Post", "Timestamp", []),
+    "HAS_VERDICT": ("Post", "FactCheckVerdict", []),
+    "FROM_SOURCE": ("FactCheckVerdict", "FactCheckSource", []),
+    "CONTAINS_CLAIM": ("Post", "Claim", []),
+    "MENTIONS": ("Post", "Entity", []),
+    "HAS_KEYWORD": ("Post", "Keyword", []),
+    "HAS_HASHTAG": ("Post", "Hashtag", []),
+    "MENTIONS_USER": ("Post", "Entity", []),
+    "DUPLICATE_OF": ("Post", "Post", [("similarity", "float")]),
+}
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 2  # 2: Post.seenAt column
+_MERGE_BATCH_ROWS = 10000
+_LOAD_CSV_CONVERSIONS = {"datetime": "datetime({})", "float": "toFloat({})"}
+
+def _digest(*values: str) -> int:
+    # Dedupe sets hold 8-byte digests rather than the keys (claims can be long); collisions are
+    # negligible below billions of keys.
+    return int.from_bytes(hashlib.blake2b("\x1f".join(values).encode('utf-8'), digest_size=8).digest(), 'big')
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def _node_header(label: str) -> list[str]:
+    return [f"{name}:ID({label})" if kind == "ID" else f"{name}:{kind}" if kind else name for name, kind in NODE_COLUMNS[label]]
+
+def _relationship_header(rel_type: str) -> list[str]:
+    start, end, properties = RELATIONSHIP_COLUMNS[rel_type]
+    return [f":START_ID({start})", f":END_ID({end})"] + [f"{name}:{kind}" if kind else name for name, kind in properties]
+
+def _load_csv_assignments(variable: str, columns: list, offset: int) -> str:
+    assignments = [
+        f"{variable}.{name} = " + _LOAD_CSV_CONVERSIONS.get(kind, "{}").format(f"row[{offset + i}]")
+        for i, (name, kind) in enumerate(columns)
+    ]
+    return f" SET {', '.join(assignments)}" if assignments else ""
+
+def load_csv_statements() -> dict:
+    """
+    One LOAD CSV statement per node label and relationship type, reading a header-less shard
+    from the `$file` parameter. Run nodes before relationships, after `manage.py init-schema`.
+    """
+    statements = {"nodes": {}, "relationships": {}}
+    for label, columns in NODE_COLUMNS.items():
+        key = columns[0][0]
+        statements["nodes"][label] = (
+            f"LOAD CSV FROM $file AS row CALL {{ WITH row MERGE (n:{label} {{{key}: row[0]}})"
+            f"{_load_csv_assignments('n', columns[1:], 1)} }} IN TRANSACTIONS OF 10000 ROWS"
+        )
+    for rel_type, (start, end, properties) in RELATIONSHIP_COLUMNS.items():
+        statements["relationships"][rel_type] = (
+            f"LOAD CSV FROM $file AS row CALL {{ WITH row MATCH (a:{start} {{{NODE_COLUMNS[start][0][0]}: row[0]}}) "
+            f"MATCH (b:{end} {{{NODE_COLUMNS[end][0][0]}: row[1]}}) MERGE (a)-[r:{rel_type}]->(b)"
+            f"{_load_csv_assignments('r', properties, 2)} }} IN TRANSACTIONS OF 10000 ROWS"
+        )
+    return statements
+
+class _ShardSet:
+    """
+    Header-less CSV shards of one node label or relationship type, plus a separate header file
+    as neo4j-admin import expects. A new shard is started every `shard_rows` rows and on every
+    run, so shards are only ever appended to by the run that created them.
+    """
+    def __init__(self, root: str, kind: str, name: str, header: list[str], files: list, shard_rows: int):
+        self.root, self.kind, self.name = root, kind, name
+        self.files = files  # manifest entries {"path", "rows", "bytes"}, paths relative to root
+        self.shard_rows = shard_rows
+        self.header_path = f"{kind}/{name}.header.csv"
+        self._handle = self._writer = self._current = None
+        self._rows = 0  # rows in the open shard, committed or not
+        self._sealed = []  # (entry, rows, bytes) of shards closed since the last commit
+        os.makedirs(os.path.join(root, kind), exist_ok=True)
+        with open(os.path.join(root, self.header_path), 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f, lineterminator='\n').writerow(header)
+
+    def _rotate(self, run_id: str):
+        self.close()
+        number = sum(1 for entry in self.files if entry['path'].startswith(f"{self.kind}/{self.name}-{run_id}-")) + 1
+        self._current = {"path": f"{self.kind}/{self.name}-{run_id}-{number:05d}.csv", "rows": 0, "bytes": 0}
+        self.files.append(self._current)
+        self._handle = open(os.path.join(self.root, self._current['path']), 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._handle, lineterminator='\n')
+        self._rows = 0
+
+    def write(self, run_id: str, rows: list):
+        for row in rows:
+            if self._handle is None or self._rows >= self.shard_rows:
+                self._rotate(run_id)
+            self._writer.writerow(row)
+            self._rows += 1
+
+    def commit(self):
+        """Syncs the shards and records their sizes in the manifest entries, which is what a checkpoint commits to."""
+        for entry, rows, size in self._sealed:
+            entry.update(rows=rows, bytes=size)
+        self._sealed = []
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._current.update(rows=self._rows, bytes=self._handle.tell())
+
+    def close(self):
+        """Closes the open shard; its size is only committed by the next commit()."""
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._sealed.append((self._current, self._rows, self._handle.tell()))
+            self._handle.close()
+            self._handle = self._writer = self._current = None
+
+    def read(self):
+        """Yields the committed rows of every shard, ignoring anything written after the last checkpoint."""
+        for entry in list(self.files):
+            with open(os.path.join(self.root, entry['path']), newline='', encoding='utf-8') as f:
+                for _, row in zip(range(entry['rows']), csv.reader(f)):
+                    yield row
+
+class CsvGraphExport:
+    """
+    Writes the graph that POST_WRITE_QUERY would build as de-duplicated node and relationship CSV
+    shards for `neo4j-admin database import full` (or LOAD CSV), instead of running transactions.
+    Implements `write_posts_bulk` so it can stand in for GraphAgent in the ingestion pipeline.
+
+    The directory accumulates runs: node keys and post ids already exported by earlier runs are
+    loaded from their shards, so every node and every post's relationships appear exactly once.
+    manifest.json lists the shards with their committed row counts and byte sizes, the runs with
+    their dataset position, and the import command. A checkpoint after each pipeline chunk makes
+    an interrupted run resumable; uncommitted shard tails are cut off when the directory is reopened.
+    Spread aggregates and the claim similarity index are not exported; after importing run
+    `manage.py rebuild-spread` and `manage.py index-claims`.
+    """
+    def __init__(self, directory: str = None, shard_rows: int = None):
+        self.directory = directory or Config.EXPORT_DIR
+        self.shard_rows = shard_rows or Config.EXPORT_SHARD_ROWS
+        self.manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest = self._read_manifest(self.directory) if os.path.exists(self.manifest_path) else {
+            "format": MANIFEST_FORMAT,
+            "nodes": {label: {"header": None, "files": []} for label in NODE_COLUMNS},
+            "relationships": {rel_type: {"header": None, "files": []} for rel_type in RELATIONSHIP_COLUMNS},
+            "runs": [],
+        }
+        self.nodes = {label: self._shard_set("nodes", label, _node_header(label)) for label in NODE_COLUMNS}
+        self.relationships = {rel_type: self._shard_set("relationships", rel_type, _relationship_header(rel_type))
+                              for rel_type in RELATIONSHIP_COLUMNS}
+        self._repair()
+        self._seen = {label: {_digest(row[0]) for row in shards.read()} for label, shards in self.nodes.items()}
+        self._seen_sources = {_digest(*row[:2]) for row in self.relationships["FROM_SOURCE"].read()}
+        self.run = None
+        self._pending = {"posts": 0, "skipped_posts": 0}  # run counters not checkpointed yet
+
+    @staticmethod
+    def _read_manifest(directory: str) -> dict:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise ValueError(f"Unsupported export manifest format in {directory}: {manifest.get('format')}")
+        return manifest
+
+    def _shard_set(self, kind: str, name: str, header: list[str]) -> _ShardSet:
+        entry = self.manifest[kind].setdefault(name, {"header": None, "files": []})
+        shards = _ShardSet(self.directory, kind, name, header, entry["files"], self.shard_rows)
+        entry["header"] = shards.header_path
+        return shards
+
+    def _repair(self):
+        """Cuts shards back to their last checkpointed size and removes shards no checkpoint recorded."""
+        committed = set()
+        for shards in self._shard_sets():
+            for entry in shards.files:
+                committed.add(entry['path'])
+                path = os.path.join(self.directory, entry['path'])
+                if os.path.getsize(path) > entry['bytes']:
+                    with open(path, 'r+b') as f:
+                        f.truncate(entry['bytes'])
+        for kind in ("nodes", "relationships"):
+            for name in os.listdir(os.path.join(self.directory, kind)):
+                if not name.endswith(".header.csv") and f"{kind}/{name}" not in committed:
+                    logger.warning(f"Removing uncommitted export shard {kind}/{name}.")
+                    os.remove(os.path.join(self.directory, kind, name))
+
+    def start_run(self, source: dict, run_key: str = None) -> int:
+        """Starts a run, or resumes the unfinished run with the same key. Returns the dataset index to start from."""
+        unfinished = next((run for run in reversed(self.manifest["runs"])
+                           if run_key and run.get("run_key") == run_key and run["status"] != "completed"), None)
+        if unfinished:
+            self.run = unfinished
+            logger.info(f"Resuming export run {unfinished['run_id']} from index {unfinished['next_index']}.")
+        else:
+            self.run = {"run_id": f"run{len(self.manifest['runs']) + 1:04d}", "run_key": run_key, "source": source,
+                        "next_index": 0, "posts": 0, "skipped_posts": 0, "started_at": _now_iso()}
+            self.manifest["runs"].append(self.run)
+        self.run.update(status="running", finished_at=None)
+        self._save_manifest()
+        return self.run["next_index"]
+
+    def _add(self, label: str, key) -> bool:
+        """Marks a node key as exported; False if it already was (or is missing)."""
+        if key is None or key == "":
+            return False
+        digest = _digest(key)
+        if digest in self._seen[label]:
+            return False
+        self._seen[label].add(digest)
+        return True
+
+    def _add_source_link(self, verdict: str, source: str) -> bool:
+        digest = _digest(verdict, source)
+        if digest in self._seen_sources:
+            return False
+        self._seen_sources.add(digest)
+        return True
+
+    def _export_rows(self, rows: list[dict]) -> list[dict]:
+        nodes = {label: [] for label in NODE_COLUMNS}
+        links = {rel_type: [] for rel_type in RELATIONSHIP_COLUMNS}
+
+        def node(label: str, key, *properties):
+            if self._add(label, key):
+                nodes[label].append([key, *properties])
+
+        created_at, results = _now_iso(), []
+        for row in rows:
+            post_id = row['postId']
+            if not self._add("Post", post_id):
+                self._pending["skipped_posts"] += 1
+                results.append({"post_id": post_id, "status": "unchanged", "exported": False})
+                continue
+            nodes["Post"].append([post_id, row['postContent'], row['postSummary'], row.get('extractionTier'),
+                                  row.get('contentHash'), row.get('verdictValue'), created_at, row.get('seenAt') or created_at])
+            node("Author", row['authorName'])
+            links["CREATED"].append([row['authorName'], post_id])
+            if row.get('timestampValue') is not None:
+                node("Timestamp", row['timestampValue'])
+                links["AT_TIME"].append([post_id, row['timestampValue']])
+            if row.get('verdictValue') is not None:
+                node("FactCheckVerdict", row['verdictValue'])
+                links["HAS_VERDICT"].append([post_id, row['verdictValue']])
+                if row.get('verdictSource'):
+                    node("FactCheckSource", row['verdictSource'])
+                    if self._add_source_link(row['verdictValue'], row['verdictSource']):
+                        links["FROM_SOURCE"].append([row['verdictValue'], row['verdictSource']])
+            for claim in row['claimsList']:
+                node("Claim", claim, claim_id(claim))
+                links["CONTAINS_CLAIM"].append([post_id, claim])
+            for label, rel_type, field in (("Entity", "MENTIONS", 'entitiesList'), ("Keyword", "HAS_KEYWORD", 'keywordsList'),
+                                           ("Hashtag", "HAS_HASHTAG", 'hashtagsList'), ("Entity", "MENTIONS_USER", 'mentionsList')):
+                for key in row[field]:
+                    node(label, key)
+                    links[rel_type].append([post_id, key])
+            if row.get('duplicateOf'):
+                links["DUPLICATE_OF"].append([post_id, row['duplicateOf'], row.get('duplicateSimilarity')])
+            results.append({"post_id": post_id, "status": "success", "exported": True})
+
+        for label, batch in nodes.items():
+            self.nodes[label].write(self.run["run_id"], batch)
+        for rel_type, batch in links.items():
+            self.relationships[rel_type].write(self.run["run_id"], batch)
+        self._pending["posts"] += sum(1 for result in results if result['status'] == "success")
+        return results
+
+    def _shard_sets(self) -> list[_ShardSet]:
+        return list(self.nodes.values()) + list(self.relationships.values())
+
+    async def write_posts_bulk(self, rows: list[dict]) -> list[dict]:
+        """Pipeline write stage: appends the posts' nodes and relationships to the shards. One result per row."""
+        return await asyncio.to_thread(self._export_rows, rows)
+
+    def checkpoint(self, next_index: int = None):
+        """Commits everything written so far; the run resumes from `next_index` if interrupted."""
+        for shards in self._shard_sets():
+            shards.commit()
+        for key, count in self._pending.items():
+            self.run[key] += count
+        self._pending = {key: 0 for key in self._pending}
+        if next_index is not None:
+            self.run["next_index"] = next_index
+        self._save_manifest()
+
+    def finish_run(self, status: str = "completed"):
+        """Closes the run. Anything written after the last checkpoint is only kept if it completed."""
+        if status == "completed":
+            self.checkpoint()
+        for shards in self._shard_sets():
+            shards.close()
+        self.run.update(status=status, finished_at=_now_iso())
+        self._save_manifest()
+
+    def import_command(self) -> str:
+        """The neo4j-admin command importing every shard, to run from the export directory into an empty database."""
+        args = ["neo4j-admin", "database", "import", "full", "--multiline-fields=true",
+                # DUPLICATE_OF may point at an original that was ingested transactionally rather than exported.
+                "--skip-bad-relationships=true"]
+        for option, shard_sets in (("--nodes", self.nodes), ("--relationships", self.relationships)):
+            for name, shards in shard_sets.items():
+                if shards.files:
+                    args.append(f"{option}={name}=" + ",".join([shards.header_path] + [entry['path'] for entry in shards.files]))
+        args.append(Config.NEO4J_DATABASE or "neo4j")
+        return " ".join(shlex.quote(arg) for arg in args)
+
+    def _save_manifest(self):
+        self.manifest["updated_at"] = _now_iso()
+        self.manifest["neo4j_admin_import"] = self.import_command()
+        self.manifest["load_csv"] = load_csv_statements()
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def merge_from(self, source_directory: str) -> dict:
+        """
+        Appends another export directory's shards as a new run, dropping nodes this directory already
+        has. A post exported by both keeps the relationships of its first export only.
+        """
+        source = CsvGraphExport(source_directory)
+        self.start_run({"merged_from": os.path.abspath(source_directory), "source_runs": source.manifest["runs"]})
+        kept_posts, counts = set(), {"posts": 0, "nodes": 0, "relationships": 0}
+
+        def copy(shards: _ShardSet, target: _ShardSet, keep):
+            batch = []
+            for row in shards.read():
+                if keep(row):
+                    batch.append(row)
+                if len(batch) >= _MERGE_BATCH_ROWS:
+                    target.write(self.run["run_id"], batch)
+                    batch = []
+            target.write(self.run["run_id"], batch)
+
+        def keep_node(label):
+            def keep(row):
+                if not self._add(label, row[0]):
+                    return False
+                counts["nodes"] += 1
+                if label == "Post":
+                    kept_posts.add(_digest(row[0]))
+                return True
+            return keep
+
+        def keep_link(rel_type):
+            start = RELATIONSHIP_COLUMNS[rel_type][0]
+            def keep(row):
+                kept = self._add_source_link(row[0], row[1]) if rel_type == "FROM_SOURCE" else \
+                    _digest(row[0] if start == "Post" else row[1]) in kept_posts
+                counts["relationships"] += kept
+                return kept
+            return keep
+
+        for label in NODE_COLUMNS:
+            copy(source.nodes[label], self.nodes[label], keep_node(label))
+        for rel_type in RELATIONSHIP_COLUMNS:
+            copy(source.relationships[rel_type], self.relationships[rel_type], keep_link(rel_type))
+        counts["posts"] = self._pending["posts"] = len(kept_posts)
+        self.finish_run()
+        return counts
+
+async def export_dataset(dataset_name: str, config_name: str = None, split: str = 'train', limit: int = None,
+                         directory: str = None, extraction_policy: dict = None) -> dict:
+    """
+    Runs a Hugging Face split through the extraction pipeline into CSV shards instead of Neo4j.
+    Posts get the same ids as the transactional ingestion path, and Neo4j is never contacted.
+    """
+    export = CsvGraphExport(directory)
+    run_key = IngestionJobManager.job_id_for(dataset_name, config_name, split, limit)
+    start = export.start_run({"dataset_name": dataset_name, "config_name": config_name, "split": split, "limit": limit}, run_key)
+    rows, total = await asyncio.to_thread(
+        dataset_loader.iter_hf_dataset, dataset_name, config_name, split, start, limit, Config.INGEST_STREAMING)
+    id_prefix = f"{dataset_name.replace('/', '_')}_{split}"
+    stats, started = IngestionStats(), time.monotonic()
+
+    def on_commit(next_index: int, stats: IngestionStats):
+        export.checkpoint(next_index)
+        logger.info(f"Exported up to index {next_index - 1} / {total or '?'} "
+                    f"({(next_index - start) / max(time.monotonic() - started, 1e-9):.1f} items/s).")
+
+    try:
+        await run_ingestion_pipeline(rows, id_prefix, start_index=start, stats=stats, on_commit=on_commit,
+                                     extraction_policy=extraction_policy, writer=export, check_stored=False)
+    except BaseException:
+        export.finish_run("interrupted")
+        raise
+    export.finish_run()
+    return {"run_id": export.run["run_id"], "exported": stats.processed, "already_exported": stats.unchanged,
+            "failed": stats.failed, "manifest": export.manifest_path}
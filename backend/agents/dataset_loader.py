@@ -1,16 +1,24 @@
 # backend/agents/dataset_loader.py
-from datasets import load_dataset, Dataset
 from config import Config
 import logging
+from typing import TYPE_CHECKING
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    from datasets import Dataset, IterableDataset
+
+def load_dataset(*args, **kwargs):
+    # `datasets` takes about half a second to import, so it is only loaded when a dataset is.
+    from datasets import load_dataset as hf_load_dataset
+    return hf_load_dataset(*args, **kwargs)
+
 class DatasetLoader:
     def __init__(self):
         self.hf_token = Config.HUGGINGFACE_TOKEN
 
-    def load_hf_dataset(self, dataset_name: str, config_name: str = None, split: str = 'train') -> Dataset:
+    def load_hf_dataset(self, dataset_name: str, config_name: str = None, split: str = 'train') -> "Dataset":
         """
         Loads a dataset from Hugging Face.
         """
@@ -25,5 +33,45 @@ class DatasetLoader:
             logger.error(f"Failed to load Hugging Face dataset '{dataset_name}': {e}")
             raise
 
+    def open_hf_stream(self, dataset_name: str, config_name: str = None, split: str = 'train') -> "IterableDataset":
+        """
+        Opens a Hugging Face split in streaming mode: rows are fetched lazily, so
+        memory use does not depend on the size of the split.
+        """
+        try:
+            if config_name:
+                dataset = load_dataset(dataset_name, config_name, split=split, token=self.hf_token, streaming=True)
+            else:
+                dataset = load_dataset(dataset_name, split=split, token=self.hf_token, streaming=True)
+            logger.info(f"Opened streaming Hugging Face dataset: {dataset_name} (split: {split}).")
+            return dataset
+        except Exception as e:
+            logger.error(f"Failed to open streaming Hugging Face dataset '{dataset_name}': {e}")
+            raise
+
+    def iter_hf_dataset(self, dataset_name: str, config_name: str = None, split: str = 'train',
+                        start: int = 0, limit: int = None, streaming: bool = True):
+        """
+        Returns (rows, total) where rows lazily yields the items in [start, limit) of the split
+        and total is the number of items that will be ingested overall, or None if unknown.
+        """
+        if streaming:
+            dataset = self.open_hf_stream(dataset_name, config_name, split)
+            total = None
+            split_info = (dataset.info.splits or {}).get(split) if dataset.info else None
+            if split_info and split_info.num_examples:
+                total = split_info.num_examples
+            if limit:
+                total = min(total, limit) if total else limit
+            rows = dataset.skip(start) if start else dataset
+            if limit:
+                rows = rows.take(max(limit - start, 0))
+            return rows, total
+
+        # Map-style: the Arrow table is memory-mapped and iterating decodes rows lazily.
+        dataset = self.load_hf_dataset(dataset_name, config_name, split)
+        total = min(len(dataset), limit) if limit else len(dataset)
+        return iter(dataset.select(range(start, total))), total
+
 # Global instance
 dataset_loader = DatasetLoader()
\ No newline at end of file
@@ -1,58 +1,603 @@
 # backend/agents/graph_agent.py
 import json
 import asyncio
-from services.neo4j_service import neo4j_service
+import time
+from collections import Counter, defaultdict
+from services.neo4j_async_service import neo4j_async_service
 from services.groq_service import groq_service
-from utils.helpers import clean_text, extract_hashtags, extract_mentions, format_timestamp, serialize_neo4j_value
+from services.extraction_cache import extraction_cache
+from services.dedup_index import near_duplicate_index
+from services.canonical_index import canonical_index, normalize_key
+from services.claim_index import claim_vector_index
+from agents.local_extractor import local_extractor
+from agents.claim_analytics import VERDICT_MIX_MOVE, UPDATE_VERDICT_QUERY
+from config import Config
+from utils.lru_cache import LRUCache
+from utils.helpers import clean_text, extract_hashtags, extract_mentions, format_timestamp, parse_timestamp, estimate_tokens, content_fingerprint, claim_id, encode_cursor, decode_cursor
+from utils.serialization import GraphSerializer
+from utils.text_chunker import chunk_text
+from utils.metrics import registry, EXTRACTION_SECONDS, EXTRACTION_PARSE_SECONDS, EXTRACTION_FAILURES
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EXTRACTION_PROMPT = """
+        You are an expert information extraction AI. Analyze the provided text and respond ONLY with a valid JSON object containing these keys: "claims", "entities", "summary", "keywords".
+        Example: { "claims": ["Statement 1."], "entities": ["Entity A"], "summary": "A summary.", "keywords": ["keyword1"] }
+        """
+
+BATCH_EXTRACTION_PROMPT = """
+        You are an expert information extraction AI. You will receive a JSON array of texts, each with an "id".
+        Respond ONLY with a valid JSON array containing exactly one object per input text, with these keys: "id", "claims", "entities", "summary", "keywords".
+        Example: [ { "id": "0", "claims": ["Statement 1."], "entities": ["Entity A"], "summary": "A summary.", "keywords": ["keyword1"] } ]
+        """
+
+SUMMARY_REDUCE_PROMPT = """
+        You are an expert summarization AI. You will receive numbered summaries of consecutive sections of one document.
+        Respond ONLY with one concise summary of the whole document (at most three sentences), as plain text.
+        """
+
+EXTRACTION_DEFAULTS = {"claims": [], "entities": [], "summary": "", "keywords": []}
+MERGED_KEYWORD_LIMIT = 15  # keywords kept for a chunked text, ranked by how many chunks produced them
+
+# One parameterized statement serves both the single-post and the bulk path:
+# each row is the parameter map produced by GraphAgent.prepare_post.
+# Claim and entity links also maintain the spread aggregates described in agents.claim_analytics:
+# counters change only when a link is actually created or deleted, so rewrites never double count.
+POST_WRITE_QUERY = """
+UNWIND $rows AS row
+MERGE (p:Post {id: row.postId})
+  ON CREATE SET p.content = row.postContent, p.summary = row.postSummary, p.createdAt = datetime()
+  ON MATCH SET p.content = row.postContent, p.summary = row.postSummary, p.updatedAt = datetime()
+WITH p, row, p.verdict AS previousVerdict, p.seenAt AS previousSeenAt
+SET p.extractionTier = row.extractionTier, p.contentHash = row.contentHash, p.verdict = coalesce(row.verdictValue, previousVerdict),
+    p.seenAt = coalesce(datetime(row.seenAt), p.createdAt)
+MERGE (a:Author {name: row.authorName}) MERGE (a)-[:CREATED]->(p)
+WITH p, row, a, previousVerdict, previousSeenAt, p.seenAt AS seenAt
+FOREACH (_ IN CASE WHEN row.timestampValue IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (t:Timestamp {value: row.timestampValue}) MERGE (p)-[:AT_TIME]->(t)
+)
+FOREACH (_ IN CASE WHEN row.verdictValue IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (v:FactCheckVerdict {value: row.verdictValue})
+    MERGE (s:FactCheckSource {name: row.verdictSource})
+    MERGE (p)-[:HAS_VERDICT]->(v) MERGE (v)-[:FROM_SOURCE]->(s)
+)
+WITH p, row, a, previousVerdict, previousSeenAt, seenAt
+""" + VERDICT_MIX_MOVE + """
+CALL {
+    // A post whose author changed: its claims move from the old author's spread to the new one's.
+    WITH p, a
+    MATCH (old:Author)-[created:CREATED]->(p) WHERE old <> a
+    DELETE created
+    WITH p, a, old
+    MATCH (p)-[:CONTAINS_CLAIM]->(c:Claim)
+    OPTIONAL MATCH (old)-[s:SPREAD]->(c)
+    SET s.posts = s.posts - 1
+    SET c.authorCount = c.authorCount - CASE WHEN s.posts <= 0 THEN 1 ELSE 0 END
+    FOREACH (counter IN CASE WHEN s.posts <= 0 THEN [s] ELSE [] END | DELETE counter)
+    MERGE (a)-[n:SPREAD]->(c)
+      ON CREATE SET n.posts = 1, c.authorCount = coalesce(c.authorCount, 0) + 1
+      ON MATCH SET n.posts = n.posts + 1
+}
+CALL {
+    // Claims this post no longer carries give back its post, author and verdict counts.
+    WITH p, row, a
+    WITH p, row, a WHERE row.removed IS NOT NULL
+    MATCH (p)-[:CONTAINS_CLAIM]->(c:Claim) WHERE c.text IN row.removed.claimsList
+    OPTIONAL MATCH (a)-[s:SPREAD]->(c)
+    OPTIONAL MATCH (c)-[m:VERDICT_MIX]->(:FactCheckVerdict {value: p.verdict})
+    SET c.postCount = c.postCount - 1, s.posts = s.posts - 1, m.posts = m.posts - 1
+    SET c.authorCount = c.authorCount - CASE WHEN s.posts <= 0 THEN 1 ELSE 0 END
+    FOREACH (counter IN [r IN [s, m] WHERE r.posts <= 0] | DELETE counter)
+}
+CALL {
+    // Changed posts: drop the links to claims, entities, keywords, hashtags and mentions the new version no longer has.
+    WITH p, row
+    WITH p, row WHERE row.removed IS NOT NULL
+    MATCH (p)-[r:CONTAINS_CLAIM|MENTIONS|HAS_KEYWORD|HAS_HASHTAG|MENTIONS_USER]->(n)
+    WHERE coalesce(n.text, n.name, n.tag) IN CASE type(r)
+        WHEN 'CONTAINS_CLAIM' THEN row.removed.claimsList WHEN 'MENTIONS' THEN row.removed.entitiesList
+        WHEN 'HAS_KEYWORD' THEN row.removed.keywordsList WHEN 'HAS_HASHTAG' THEN row.removed.hashtagsList
+        ELSE row.removed.mentionsList END
+    FOREACH (_ IN CASE WHEN type(r) = 'MENTIONS' THEN [1] ELSE [] END | SET n.postCount = n.postCount - 1)
+    DELETE r
+}
+CALL {
+    WITH p, row, a, seenAt
+    UNWIND row.claimsList AS claimText
+    MERGE (c:Claim {text: claimText})
+    WITH p, a, seenAt, c WHERE NOT (p)-[:CONTAINS_CLAIM]->(c)
+    CREATE (p)-[:CONTAINS_CLAIM]->(c)
+    SET c.postCount = coalesce(c.postCount, 0) + 1,
+        c.firstSeen = CASE WHEN c.firstSeen <= seenAt THEN c.firstSeen ELSE seenAt END,
+        c.lastSeen = CASE WHEN c.lastSeen >= seenAt THEN c.lastSeen ELSE seenAt END
+    MERGE (a)-[s:SPREAD]->(c)
+      ON CREATE SET s.posts = 1, c.authorCount = coalesce(c.authorCount, 0) + 1
+      ON MATCH SET s.posts = s.posts + 1
+    WITH p, c
+    MATCH (v:FactCheckVerdict {value: p.verdict})
+    MERGE (c)-[m:VERDICT_MIX]->(v) ON CREATE SET m.posts = 1 ON MATCH SET m.posts = m.posts + 1
+}
+CALL {
+    WITH p, row, seenAt
+    UNWIND row.entitiesList AS entityName
+    MERGE (e:Entity {name: entityName})
+    WITH p, seenAt, e WHERE NOT (p)-[:MENTIONS]->(e)
+    CREATE (p)-[:MENTIONS]->(e)
+    SET e.postCount = coalesce(e.postCount, 0) + 1,
+        e.firstSeen = CASE WHEN e.firstSeen <= seenAt THEN e.firstSeen ELSE seenAt END,
+        e.lastSeen = CASE WHEN e.lastSeen >= seenAt THEN e.lastSeen ELSE seenAt END
+}
+CALL {
+    // Claims and entities the post left, or whose sighting by this post moved in time, recompute their
+    // seen times from their remaining posts; a left one only if the post's old time was its first or last.
+    WITH p, row, previousSeenAt, seenAt
+    WITH p, row, previousSeenAt, seenAt WHERE row.removed IS NOT NULL AND previousSeenAt IS NOT NULL
+    CALL {
+        WITH row
+        MATCH (n:Claim) WHERE n.text IN row.removed.claimsList RETURN n
+        UNION
+        WITH row
+        MATCH (n:Entity) WHERE n.name IN row.removed.entitiesList RETURN n
+        UNION
+        WITH p, previousSeenAt, seenAt
+        MATCH (p)-[:CONTAINS_CLAIM|MENTIONS]->(n) WHERE previousSeenAt <> seenAt RETURN n
+    }
+    WITH p, previousSeenAt, n
+    WITH n WHERE previousSeenAt IN [n.firstSeen, n.lastSeen] OR (p)-[:CONTAINS_CLAIM|MENTIONS]->(n)
+    CALL {
+        WITH n
+        OPTIONAL MATCH (q:Post)-[:CONTAINS_CLAIM|MENTIONS]->(n)
+        RETURN min(coalesce(q.seenAt, q.createdAt)) AS firstSeen, max(coalesce(q.seenAt, q.createdAt)) AS lastSeen
+    }
+    SET n.firstSeen = firstSeen, n.lastSeen = lastSeen
+}
+FOREACH (keywordText IN row.keywordsList | MERGE (k:Keyword {text: keywordText}) MERGE (p)-[:HAS_KEYWORD]->(k) )
+FOREACH (hashtagTag IN row.hashtagsList | MERGE (h:Hashtag {tag: hashtagTag}) MERGE (p)-[:HAS_HASHTAG]->(h) )
+FOREACH (mentionName IN row.mentionsList | MERGE (m:Entity {name: mentionName}) MERGE (p)-[:MENTIONS_USER]->(m) )
+WITH p, row
+OPTIONAL MATCH (orig:Post {id: row.duplicateOf})
+FOREACH (_ IN CASE WHEN orig IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (p)-[d:DUPLICATE_OF]->(orig) SET d.similarity = row.duplicateSimilarity
+)
+RETURN p.id AS postId
+"""
+
+# Stored fingerprint and current relationship targets of existing posts, for many ids at once.
+POST_STATE_QUERY = """
+UNWIND $postIds AS postId
+MATCH (p:Post {id: postId})
+RETURN p.id AS postId, p.contentHash AS contentHash,
+       [(p)-[:CONTAINS_CLAIM]->(c:Claim) | c.text] AS claimsList,
+       [(p)-[:MENTIONS]->(e:Entity) | e.name] AS entitiesList,
+       [(p)-[:HAS_KEYWORD]->(k:Keyword) | k.text] AS keywordsList,
+       [(p)-[:HAS_HASHTAG]->(h:Hashtag) | h.tag] AS hashtagsList,
+       [(p)-[:MENTIONS_USER]->(m:Entity) | m.name] AS mentionsList
+"""
+
+DIFFED_LISTS = ("claimsList", "entitiesList", "keywordsList", "hashtagsList", "mentionsList")
+
+# Shared (hub) nodes are created first, per label in a fixed order and sorted within each label,
+# so concurrent writers take node-creation locks in the same global order instead of deadlocking.
+# Claims are also written to here (claimId), so their locks for the spread counters are taken in that order too.
+SHARED_NODES_QUERY = """
+CALL { UNWIND $authors AS name MERGE (:Author {name: name}) }
+CALL { UNWIND $timestamps AS value MERGE (:Timestamp {value: value}) }
+CALL { UNWIND $verdicts AS value MERGE (:FactCheckVerdict {value: value}) }
+CALL { UNWIND $sources AS name MERGE (:FactCheckSource {name: name}) }
+CALL { UNWIND $claims AS claim MERGE (c:Claim {text: claim.text}) SET c.claimId = coalesce(c.claimId, claim.id) }
+CALL { UNWIND $entities AS name MERGE (:Entity {name: name}) }
+CALL { UNWIND $keywords AS text MERGE (:Keyword {text: text}) }
+CALL { UNWIND $hashtags AS tag MERGE (:Hashtag {tag: tag}) }
+"""
+
+def _shared_node_params(rows: list[dict]) -> dict:
+    def keys(*fields):
+        values = set()
+        for row in rows:
+            for field in fields:
+                value = row.get(field)
+                if isinstance(value, list):
+                    values.update(value)
+                elif value is not None:
+                    values.add(value)
+        return sorted(values)
+
+    return {
+        "authors": keys('authorName'), "timestamps": keys('timestampValue'),
+        "verdicts": keys('verdictValue'), "sources": sorted({row['verdictSource'] for row in rows if row.get('verdictValue') is not None and row.get('verdictSource')}),
+        "claims": [{"text": text, "id": claim_id(text)} for text in keys('claimsList')], "entities": keys('entitiesList', 'mentionsList'),
+        "keywords": keys('keywordsList'), "hashtags": keys('hashtagsList'),
+    }
+
+# Label -> key property of every node a post write MERGEs, for matching nodes in cached graph pages.
+NODE_KEYS = {
+    "Post": "id", "Author": "name", "Timestamp": "value", "FactCheckVerdict": "value", "FactCheckSource": "name",
+    "Claim": "text", "Entity": "name", "Keyword": "text", "Hashtag": "tag",
+}
+
+def _graph_node_keys(nodes: list[dict]) -> frozenset:
+    """(label, key) of each serialized node in a graph page."""
+    return frozenset(
+        (label, node['id'] if label == "Post" else node['properties'].get(NODE_KEYS[label]))
+        for node in nodes for label in node['labels'] if label in NODE_KEYS
+    )
+
+def _written_node_keys(rows: list[dict]) -> set:
+    """(label, key) of every node the rows link to or unlink from, besides the posts themselves."""
+    fields = {"claimsList": "Claim", "entitiesList": "Entity", "mentionsList": "Entity", "keywordsList": "Keyword", "hashtagsList": "Hashtag"}
+    node_keys = set()
+    for row in rows:
+        for field, label in fields.items():
+            node_keys.update((label, value) for value in row.get(field) or [])
+            node_keys.update((label, value) for value in (row.get('removed') or {}).get(field) or [])
+        for label, value in (("Author", row.get('authorName')), ("Timestamp", row.get('timestampValue')),
+                             ("FactCheckVerdict", row.get('verdictValue')), ("FactCheckSource", row.get('verdictSource')),
+                             ("Post", row.get('duplicateOf'))):
+            if value is not None:
+                node_keys.add((label, value))
+    return node_keys
+
 class GraphAgent:
     def __init__(self):
-        self.neo4j = neo4j_service
+        self.neo4j = neo4j_async_service
         self.groq = groq_service
+        self.extraction_cache = extraction_cache
+        self.dedup_index = near_duplicate_index
+        self.local_extractor = local_extractor
+        self.tier_counts = Counter()
+        self.fingerprint_checks = Counter()  # posts found "new", "changed" or "unchanged"
+        self.canonical_index = canonical_index
+        self.claim_index = claim_vector_index
+        self._next_seed = 0.0
+        # Serialized /post-graph and /post-summary responses, keyed by (kind, post_id, ...).
+        # Graph entries are stored as (graph_data, node keys of the page) for invalidation.
+        # Per process: writes made by other workers are only seen once an entry's TTL expires.
+        self.response_cache = LRUCache(Config.RESPONSE_CACHE_MAX_ENTRIES, Config.RESPONSE_CACHE_TTL_SECONDS)
 
-    async def _extract_with_groq(self, text: str) -> dict:
-        prompt = """
-        You are an expert information extraction AI. Analyze the provided text and respond ONLY with a valid JSON object containing these keys: "claims", "entities", "summary", "keywords".
-        Example: { "claims": ["Statement 1."], "entities": ["Entity A"], "summary": "A summary.", "keywords": ["keyword1"] }
-        """
+    def _cache_key(self, text: str, model_type: str):
+        # Batched and single-post extractions share one key space: both produce the same
+        # per-post JSON for EXTRACTION_PROMPT, so either path can serve the other's hits.
+        if not Config.EXTRACTION_CACHE_ENABLED:
+            return None
+        return self.extraction_cache.make_key(text, EXTRACTION_PROMPT, self.groq.model_name(model_type))
+
+    @staticmethod
+    def _parse_json_payload(response_str: str, opener: str = '{', closer: str = '}'):
+        json_match_start = response_str.find(opener)
+        json_match_end = response_str.rfind(closer) + 1
+        if json_match_start == -1 or json_match_end == 0:
+            raise json.JSONDecodeError("No JSON payload found in LLM response", response_str, 0)
+        return json.loads(response_str[json_match_start:json_match_end])
+
+    @staticmethod
+    def _is_valid_extraction(entry) -> bool:
+        return (
+            isinstance(entry, dict)
+            and isinstance(entry.get('claims', []), list)
+            and isinstance(entry.get('entities', []), list)
+            and isinstance(entry.get('keywords', []), list)
+            and isinstance(entry.get('summary', ''), str)
+        )
+
+    async def _extract_with_groq(self, text: str, model_type: str = "accurate") -> dict:
+        cache_key = self._cache_key(text, model_type)
+        if cache_key:
+            cached = await asyncio.to_thread(self.extraction_cache.get, cache_key)
+            if cached is not None and self._is_valid_extraction(cached):
+                return cached
         try:
-            response_json_str = await self.groq.invoke_llm_chain(
-                system_prompt=prompt, user_message=f"Text to analyze: {text}", model_type="accurate"
-            )
-            json_match_start = response_json_str.find('{')
-            json_match_end = response_json_str.rfind('}') + 1
-            if json_match_start == -1 or json_match_end == 0:
-                raise json.JSONDecodeError("No JSON object found in LLM response", response_json_str, 0)
-            json_match = response_json_str[json_match_start:json_match_end]
-            return json.loads(json_match)
+            with EXTRACTION_SECONDS.time(model_type=model_type, mode="single"):
+                response_json_str = await self.groq.invoke_llm_chain(
+                    system_prompt=EXTRACTION_PROMPT, user_message=f"Text to analyze: {text}", model_type=model_type
+                )
+                with EXTRACTION_PARSE_SECONDS.time(mode="single"):
+                    extracted = self._parse_json_payload(response_json_str)
         except Exception as e:
+            reason = "invalid_json" if isinstance(e, json.JSONDecodeError) else "llm_error"
+            EXTRACTION_FAILURES.inc(model_type=model_type, reason=reason)
             logger.error(f"Groq extraction failed or returned invalid JSON: {e}")
             return {"claims": [], "entities": [], "summary": "", "keywords": []}
+        if not self._is_valid_extraction(extracted):
+            EXTRACTION_FAILURES.inc(model_type=model_type, reason="invalid_shape")
+            logger.error(f"Groq extraction returned JSON of the wrong shape: {str(extracted)[:200]}")
+            return {"claims": [], "entities": [], "summary": "", "keywords": []}
+        extracted = {key: extracted.get(key, default) for key, default in EXTRACTION_DEFAULTS.items()}
+        # Only well-formed results are cached, so a transient failure is retried next time.
+        if cache_key:
+            await asyncio.to_thread(self.extraction_cache.set, cache_key, extracted)
+        return extracted
 
-    async def process_post(self, post_data: dict) -> dict:
+    async def _extract_batch_with_groq(self, texts: list[str], model_type: str = "accurate") -> list[dict]:
         """
-        This is the DEFINITIVE, FINAL version, built specifically for the 'supergoose/.../healthfact_classification' dataset.
+        Extracts several short texts with one LLM request. Entries the model skips or
+        garbles fall back to a single-post call; the rest are cached individually.
         """
+        payload = json.dumps([{"id": str(i), "text": text} for i, text in enumerate(texts)], ensure_ascii=False)
+        by_id = {}
+        try:
+            with EXTRACTION_SECONDS.time(model_type=model_type, mode="batch"):
+                response_str = await self.groq.invoke_llm_chain(
+                    system_prompt=BATCH_EXTRACTION_PROMPT, user_message=f"Texts to analyze: {payload}", model_type=model_type
+                )
+                with EXTRACTION_PARSE_SECONDS.time(mode="batch"):
+                    entries = self._parse_json_payload(response_str, '[', ']')
+                    for entry in entries if isinstance(entries, list) else []:
+                        if self._is_valid_extraction(entry) and str(entry.get('id')) not in by_id:
+                            by_id[str(entry.get('id'))] = {key: entry.get(key, default) for key, default in EXTRACTION_DEFAULTS.items()}
+        except Exception as e:
+            reason = "invalid_json" if isinstance(e, json.JSONDecodeError) else "llm_error"
+            EXTRACTION_FAILURES.inc(model_type=model_type, reason=f"batch_{reason}")
+            logger.warning(f"Batched Groq extraction of {len(texts)} posts failed, falling back to single-post calls: {e}")
+
+        results = [None] * len(texts)
+        fallback_indices = []
+        for i, text in enumerate(texts):
+            extracted = by_id.get(str(i))
+            if extracted is None:
+                fallback_indices.append(i)
+                continue
+            cache_key = self._cache_key(text, model_type)
+            if cache_key:
+                await asyncio.to_thread(self.extraction_cache.set, cache_key, extracted)
+            results[i] = extracted
+        if fallback_indices:
+            EXTRACTION_FAILURES.inc(len(fallback_indices), model_type=model_type, reason="batch_fallback")
+            logger.info(f"Batched extraction fell back to single-post calls for {len(fallback_indices)} of {len(texts)} posts.")
+            fallbacks = await asyncio.gather(*(self._extract_with_groq(texts[i], model_type) for i in fallback_indices))
+            for i, extracted in zip(fallback_indices, fallbacks):
+                results[i] = extracted
+        return results
+
+    def _pack_extraction_batches(self, texts: list[str]) -> list[list[int]]:
+        """Groups text indices into batches bounded by the token budget and the max posts per request."""
+        budget = Config.EXTRACTION_BATCH_TOKEN_BUDGET
+        max_posts = Config.EXTRACTION_BATCH_MAX_POSTS
+        batches, current, current_tokens = [], [], 0
+        for i, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (current_tokens + tokens > budget or len(current) >= max_posts):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _chunk_for_extraction(text: str) -> list[str]:
+        chunks = chunk_text(text, Config.EXTRACTION_CHUNK_TOKENS, Config.EXTRACTION_CHUNK_OVERLAP_TOKENS)
+        if len(chunks) > Config.EXTRACTION_MAX_CHUNKS:
+            logger.warning(f"Text of ~{estimate_tokens(text)} tokens needs {len(chunks)} chunks; extracting the first {Config.EXTRACTION_MAX_CHUNKS}.")
+            chunks = chunks[:Config.EXTRACTION_MAX_CHUNKS]
+        return chunks
+
+    @staticmethod
+    def _merge_chunk_extractions(parts: list[dict]) -> dict:
+        """
+        Unions the chunks' claims and entities, de-duplicated by normalized form in first-seen
+        order (overlapping chunks often repeat a claim). Keywords are ranked by chunk frequency.
+        """
+        merged = {}
+        for field in ("claims", "entities"):
+            seen = {}
+            for part in parts:
+                for value in part.get(field, []):
+                    if isinstance(value, str) and value.strip():
+                        seen.setdefault(normalize_key(value) or value.strip(), value.strip())
+            merged[field] = list(seen.values())
+        keyword_counts, keyword_forms = Counter(), {}
+        for part in parts:
+            keys = set()
+            for value in part.get('keywords', []):
+                if isinstance(value, str) and value.strip():
+                    key = normalize_key(value) or value.strip()
+                    keyword_forms.setdefault(key, value.strip())
+                    keys.add(key)
+            keyword_counts.update(keys)
+        merged['keywords'] = [keyword_forms[key] for key, _ in keyword_counts.most_common(MERGED_KEYWORD_LIMIT)]
+        return merged
+
+    async def _reduce_summaries(self, summaries: list[str]) -> str:
+        """Condenses per-chunk summaries into one with a single fast-model call; falls back to the leading ones."""
+        summaries = [summary.strip() for summary in summaries if isinstance(summary, str) and summary.strip()]
+        if len(summaries) <= 1:
+            return summaries[0] if summaries else ""
+        try:
+            with EXTRACTION_SECONDS.time(model_type="fast", mode="reduce"):
+                reduced = await self.groq.invoke_llm_chain(
+                    system_prompt=SUMMARY_REDUCE_PROMPT,
+                    user_message="\n".join(f"{i + 1}. {summary}" for i, summary in enumerate(summaries)),
+                    model_type="fast",
+                )
+            if isinstance(reduced, str) and reduced.strip():
+                return reduced.strip()
+        except Exception as e:
+            EXTRACTION_FAILURES.inc(model_type="fast", reason="summary_reduce")
+            logger.warning(f"Summary reduction of {len(summaries)} chunks failed, keeping the leading summaries: {e}")
+        return " ".join(summaries[:2])
+
+    async def _merge_chunks(self, text: str, parts: list[dict], model_type: str) -> dict:
+        merged = self._merge_chunk_extractions(parts)
+        merged['summary'] = await self._reduce_summaries([part.get('summary', '') for part in parts])
+        # A chunk that failed would leave a permanent gap, so only complete merges are cached.
+        cache_key = self._cache_key(text, model_type)
+        if cache_key and all(part.get('claims') or part.get('summary') for part in parts):
+            await asyncio.to_thread(self.extraction_cache.set, cache_key, merged)
+        return merged
+
+    async def extract_many(self, texts: list[str], model_type: str = "accurate") -> list[dict]:
+        """
+        Extracts a list of cleaned texts, serving cache hits first and packing the
+        misses (including wrongly shaped cache entries) into multi-post requests. Texts longer than EXTRACTION_CHUNK_TOKENS are
+        split into chunks that are extracted in parallel alongside the other texts and
+        merged afterwards. Returns one extraction dict per input text.
+        """
+        results = [None] * len(texts)
+        misses = {}  # text -> indices, so identical texts in one call cost one extraction
+        for i, text in enumerate(texts):
+            cache_key = self._cache_key(text, model_type)
+            cached = await asyncio.to_thread(self.extraction_cache.get, cache_key) if cache_key else None
+            if cached is not None and self._is_valid_extraction(cached):
+                results[i] = cached
+            else:
+                misses.setdefault(text, []).append(i)
+        if not misses:
+            return results
+
+        miss_texts = list(misses)
+        units, owners = [], []  # extraction units (short texts or chunks) and the miss text each belongs to
+        for owner, text in enumerate(miss_texts):
+            for chunk in self._chunk_for_extraction(text):
+                units.append(chunk)
+                owners.append(owner)
+        batches = self._pack_extraction_batches(units)
+        batch_results = await asyncio.gather(*(
+            self._extract_batch_with_groq([units[i] for i in batch], model_type) if len(batch) > 1
+            else self._extract_with_groq(units[batch[0]], model_type)
+            for batch in batches
+        ))
+        parts = defaultdict(list)
+        for batch, extracted in zip(batches, batch_results):
+            extracted_list = extracted if len(batch) > 1 else [extracted]
+            for unit_index, extraction in zip(batch, extracted_list):
+                parts[owners[unit_index]].append((unit_index, extraction))
+
+        chunked = [owner for owner, owner_parts in parts.items() if len(owner_parts) > 1]
+        merged = await asyncio.gather(*(
+            self._merge_chunks(miss_texts[owner], [extraction for _, extraction in sorted(parts[owner], key=lambda part: part[0])], model_type)
+            for owner in chunked
+        ))
+        extractions = {owner: owner_parts[0][1] for owner, owner_parts in parts.items()}
+        extractions.update(zip(chunked, merged))
+        for owner, text in enumerate(miss_texts):
+            for i in misses[text]:
+                results[i] = extractions[owner]
+        return results
+
+    async def _ensure_seeded(self):
+        """
+        Seeds the canonical name index and the local extractor's gazetteer from existing
+        Entity, Keyword and Claim nodes, once; retried a minute after a failure.
+        """
+        if time.monotonic() < self._next_seed:
+            return
+        self._next_seed = float('inf')
+        seed_limit = Config.CANONICAL_INDEX_SEED_LIMIT if Config.CANONICALIZATION_ENABLED else 0
+        query = """
+        MATCH (e:Entity) RETURN 'Entity' AS label, e.name AS name LIMIT $entityLimit
+        UNION ALL
+        MATCH (k:Keyword) RETURN 'Keyword' AS label, k.text AS name LIMIT $seedLimit
+        UNION ALL
+        MATCH (c:Claim) RETURN 'Claim' AS label, c.text AS name LIMIT $seedLimit
+        """
+        try:
+            records = await self.neo4j.read(query, {
+                "entityLimit": max(seed_limit, Config.EXTRACTION_GAZETTEER_LIMIT), "seedLimit": seed_limit,
+            })
+        except Exception as e:
+            logger.warning(f"Could not seed the canonical name index and gazetteer, retrying later: {e}")
+            self._next_seed = time.monotonic() + 60
+            return
+        by_label = {"Entity": [], "Keyword": [], "Claim": []}
+        for record in records:
+            by_label[record.get('label')].append(record.get('name'))
+        if Config.CANONICALIZATION_ENABLED:
+            for label, names in by_label.items():
+                self.canonical_index.seed(label, names[:seed_limit])
+            self.canonical_index.seeded = True
+        self.local_extractor.add_to_gazetteer(by_label["Entity"][:Config.EXTRACTION_GAZETTEER_LIMIT])
+        logger.info(f"Seeded name indexes from {len(records)} existing nodes: {self.canonical_index.stats()['entries']}.")
+
+    def _canonicalize(self, extraction: dict) -> dict:
+        """Maps extracted entities, keywords and claims to their canonical names, dropping variants that collapse together."""
+        if not Config.CANONICALIZATION_ENABLED:
+            return extraction
+        return {
+            **extraction,
+            "entities": self.canonical_index.resolve_many("Entity", extraction.get('entities', [])),
+            "keywords": self.canonical_index.resolve_many("Keyword", extraction.get('keywords', [])),
+            "claims": self.canonical_index.resolve_many("Claim", extraction.get('claims', [])),
+        }
+
+    @staticmethod
+    def _resolve_policy(policy: dict = None) -> dict:
+        resolved = {
+            "mode": Config.EXTRACTION_TIER_MODE,
+            "local_max_chars": Config.EXTRACTION_LOCAL_MAX_CHARS,
+            "fast_max_chars": Config.EXTRACTION_FAST_MAX_CHARS,
+            "min_local_confidence": Config.EXTRACTION_LOCAL_MIN_CONFIDENCE,
+        }
+        resolved.update({key: value for key, value in (policy or {}).items() if value is not None})
+        return resolved
+
+    @staticmethod
+    def _choose_tier(text: str, policy: dict, local_result: dict = None) -> str:
+        if policy['mode'] != "auto":
+            return policy['mode']
+        if local_result and len(text) <= policy['local_max_chars'] and local_result['confidence'] >= policy['min_local_confidence']:
+            return "local"
+        return "fast" if len(text) <= policy['fast_max_chars'] else "accurate"
+
+    async def extract_tiered(self, texts: list[str], policies: list[dict]) -> tuple[list[dict], list[str]]:
+        """
+        Routes each text to the local extractor, the fast model or the accurate model according
+        to its policy. In auto mode, empty fast-model results are escalated to the accurate model.
+        Returns (extractions, tiers), both in input order.
+        """
+        policies = [self._resolve_policy(policy) for policy in policies]
+
+        results, tiers = [None] * len(texts), [None] * len(texts)
+        llm_indices = {"fast": [], "accurate": []}
+        for i, (text, policy) in enumerate(zip(texts, policies)):
+            wants_local = policy['mode'] == "local" or (policy['mode'] == "auto" and len(text) <= policy['local_max_chars'])
+            local_result = self.local_extractor.extract(text) if wants_local else None
+            tiers[i] = self._choose_tier(text, policy, local_result)
+            if tiers[i] == "local":
+                results[i] = {key: local_result[key] for key in EXTRACTION_DEFAULTS}
+            else:
+                llm_indices[tiers[i]].append(i)
+
+        fast_results, accurate_results = await asyncio.gather(
+            self.extract_many([texts[i] for i in llm_indices["fast"]], "fast"),
+            self.extract_many([texts[i] for i in llm_indices["accurate"]], "accurate"),
+        )
+        for indices, extracted in ((llm_indices["fast"], fast_results), (llm_indices["accurate"], accurate_results)):
+            for i, extraction in zip(indices, extracted):
+                results[i] = extraction
+
+        escalate = [
+            i for i in llm_indices["fast"]
+            if policies[i]['mode'] == "auto" and not (results[i].get('claims') or results[i].get('summary'))
+        ]
+        if escalate:
+            logger.info(f"Escalating {len(escalate)} empty fast-model extractions to the accurate model.")
+            for i, extraction in zip(escalate, await self.extract_many([texts[i] for i in escalate], "accurate")):
+                results[i], tiers[i] = extraction, "accurate"
+        self.tier_counts.update(tiers)
+        return results, tiers
+
+    def extraction_tier_stats(self) -> dict:
+        """Posts extracted per tier since startup, plus the gazetteer size."""
+        return {"posts_by_tier": dict(self.tier_counts), "gazetteer_entities": self.local_extractor.gazetteer_size}
+
+    def _parse_post_input(self, post_data: dict) -> dict:
+        """Validates and cleans a raw item. Returns the cleaned fields, or an error result under "error"."""
         # THE DEFINITIVE FIX 1: Look for the text in the correct 'inputs_pretokenized' column.
-        post_text_raw = post_data.get('inputs_pretokenized')
+        # Posts submitted through /process-post carry their text in 'text' instead.
+        post_text_raw = post_data.get('inputs_pretokenized') or post_data.get('text')
         
         if not post_text_raw or not isinstance(post_text_raw, str):
             post_id_for_error = post_data.get('id', 'unknown_id')
             logger.warning(f"SKIPPING item. Reason: The 'inputs_pretokenized' field is missing or invalid. Data: {post_data}")
-            return {"post_id": post_id_for_error, "status": "error", "message": "Input data is missing a valid text field."}
+            return {"error": {"post_id": post_id_for_error, "status": "error", "message": "Input data is missing a valid text field."}}
         
-        post_id = post_data.get('id') or f"temp_id_{hash(post_text_raw)}"
-        post_text = clean_text(post_text_raw)
-        author_name = post_data.get('author') or "Unknown"
         timestamp_str = post_data.get('date')
-        formatted_timestamp = format_timestamp(timestamp_str) if timestamp_str else None
         
         # THE DEFINITIVE FIX 2: Look for the verdict in the correct 'targets_pretokenized' column.
-        verdict_text = post_data.get('targets_pretokenized')
+        verdict_text = post_data.get('targets_pretokenized') or post_data.get('label')
         external_verdict_value = None
         if isinstance(verdict_text, str):
             if "true" in verdict_text.lower():
@@ -60,97 +605,525 @@ class GraphAgent:
             elif "false" in verdict_text.lower():
                 external_verdict_value = "False"
 
-        verdict_source = "DatasetLabel"
-        groq_extracted_data = await self._extract_with_groq(post_text)
-        
-        params = {
-            "postId": post_id, "postContent": post_text, "postSummary": groq_extracted_data.get('summary', ''),
-            "authorName": author_name, "timestampValue": formatted_timestamp,
-            "claimsList": groq_extracted_data.get('claims', []), "entitiesList": groq_extracted_data.get('entities', []),
-            "keywordsList": groq_extracted_data.get('keywords', []), "hashtagsList": extract_hashtags(post_text),
-            "mentionsList": extract_mentions(post_text), "verdictValue": external_verdict_value, "verdictSource": verdict_source
+        return {
+            "post_id": post_data.get('id') or f"temp_id_{hash(post_text_raw)}",
+            "text": clean_text(post_text_raw),
+            "author": post_data.get('author') or "Unknown",
+            "timestamp": format_timestamp(timestamp_str) if timestamp_str else None,
+            "verdict": external_verdict_value,
+            "verdict_source": "DatasetLabel",
+            "extraction_policy": post_data.get('extraction_policy'),
         }
-        query = """
-        MERGE (p:Post {id: $postId})
-          ON CREATE SET p.content = $postContent, p.summary = $postSummary, p.createdAt = datetime()
-          ON MATCH SET p.content = $postContent, p.summary = $postSummary, p.updatedAt = datetime()
-        MERGE (a:Author {name: $authorName}) MERGE (a)-[:CREATED]->(p)
-        WITH p
-        FOREACH (_ IN CASE WHEN $timestampValue IS NOT NULL THEN [1] ELSE [] END |
-            MERGE (t:Timestamp {value: $timestampValue}) MERGE (p)-[:AT_TIME]->(t)
+
+    @staticmethod
+    def _extraction_succeeded(extraction: dict) -> bool:
+        # Failed extractions come back empty; a real one has at least claims or a summary.
+        return bool(extraction.get('claims') or extraction.get('summary'))
+
+    @staticmethod
+    def _build_post_params(post: dict, groq_extracted_data: dict) -> dict:
+        post_text = post['text']
+        # The fingerprint marks a post as done; a failed extraction must be retried on the next ingest.
+        content_hash = post.get('content_hash') if GraphAgent._extraction_succeeded(groq_extracted_data) else None
+
+        def merge_keys(values):
+            # Sorted and de-duplicated, so each write locks its related nodes in a consistent order.
+            return sorted({value for value in values if isinstance(value, str) and value})
+
+        return {
+            "postId": post['post_id'], "postContent": post_text, "postSummary": groq_extracted_data.get('summary', ''),
+            "authorName": post['author'], "timestampValue": post['timestamp'], "seenAt": parse_timestamp(post['timestamp']),
+            "claimsList": merge_keys(groq_extracted_data.get('claims', [])), "entitiesList": merge_keys(groq_extracted_data.get('entities', [])),
+            "keywordsList": merge_keys(groq_extracted_data.get('keywords', [])), "hashtagsList": merge_keys(extract_hashtags(post_text)),
+            "mentionsList": merge_keys(extract_mentions(post_text)), "verdictValue": post['verdict'], "verdictSource": post['verdict_source'],
+            "duplicateOf": post.get('duplicate_of'), "duplicateSimilarity": post.get('duplicate_similarity'),
+            "extractionTier": post.get('extraction_tier'), "contentHash": content_hash, "removed": None,
+        }
+
+    @staticmethod
+    def _diff_relationships(params: dict, stored: dict = None) -> dict:
+        """
+        For a post that already exists, narrows each relationship list to the targets it does
+        not link to yet and records the ones to unlink under "removed". New posts are left as is.
+        """
+        if stored is None:
+            return params
+        removed = {}
+        for field in DIFFED_LISTS:
+            current = set(stored.get(field) or [])
+            removed[field] = sorted(current.difference(params[field]))
+            params[field] = [value for value in params[field] if value not in current]
+        params['removed'] = removed
+        return params
+
+    async def fetch_post_states(self, post_ids: list[str]) -> dict:
+        """Maps post id -> stored contentHash and relationship lists, for the ids that exist."""
+        if not post_ids:
+            return {}
+        records = await self.neo4j.read(POST_STATE_QUERY, {"postIds": list(dict.fromkeys(post_ids))})
+        return {record['postId']: record.data() for record in records}
+
+    async def _check_unchanged(self, posts: list[dict], check_stored: bool = True) -> dict:
+        """
+        Fingerprints each post and marks those whose stored fingerprint matches as "unchanged".
+        Returns the stored states, which changed posts are diffed against.
+        """
+        for post in posts:
+            post['content_hash'] = content_fingerprint(
+                post['text'], post['author'], post['timestamp'], post['verdict'], post['verdict_source'])
+            post['unchanged'] = False
+        if not (Config.SKIP_UNCHANGED_POSTS and check_stored):
+            return {}
+        try:
+            stored = await self.fetch_post_states([post['post_id'] for post in posts])
+        except Exception as e:
+            # Without the stored state every post is written in full, which is still correct.
+            logger.warning(f"Could not read stored post fingerprints; writing all {len(posts)} posts in full: {e}")
+            return {}
+        for post in posts:
+            state = stored.get(post['post_id'])
+            post['unchanged'] = state is not None and state.get('contentHash') == post['content_hash']
+            self.fingerprint_checks["unchanged" if post['unchanged'] else "changed" if state else "new"] += 1
+        return stored
+
+    async def prepare_post(self, post_data: dict) -> dict:
+        """
+        Cleans a raw item and runs the Groq extraction, returning the parameter map
+        for the graph write under "params". Does not touch Neo4j.
+        """
+        return (await self.prepare_posts([post_data]))[0]
+
+    def _find_near_duplicates(self, posts: list[dict]) -> tuple[dict, dict]:
+        """
+        Returns (matches, batch_matches). `matches` maps index -> (post_id, similarity, extraction) for posts
+        whose text nearly matches an already-extracted post; `batch_matches` maps index -> (index, similarity)
+        for the remaining posts that nearly match an earlier post of the same batch, whose extraction they reuse.
+        """
+        matches = {}
+        for i, post in enumerate(posts):
+            match = self.dedup_index.find(post['text'], exclude_post_id=post['post_id'])
+            if match:
+                matches[i] = match
+        pending = [i for i in range(len(posts)) if i not in matches]
+        batch_matches = {
+            pending[j]: (pending[leader], similarity)
+            for j, (leader, similarity) in self.dedup_index.group([posts[i]['text'] for i in pending]).items()
+        }
+        return matches, batch_matches
+
+    def _index_extractions(self, posts: list[dict], extractions: list[dict]):
+        for post, extraction in zip(posts, extractions):
+            # Empty results (failed extractions) are not worth reusing.
+            if self._extraction_succeeded(extraction):
+                self.dedup_index.add(post['post_id'], post['text'], extraction)
+
+    async def prepare_posts(self, items: list[dict], policy: dict = None, check_stored: bool = True) -> list[dict]:
+        """
+        Batched counterpart of prepare_post: posts stored with the same content fingerprint are
+        reported as "unchanged" and skipped, near-duplicates of already-extracted posts reuse
+        that extraction, the rest go through the extraction tiers. Changed posts only add and
+        remove the relationships that differ. An item's own
+        "extraction_policy" takes precedence over `policy`. With `check_stored=False` Neo4j is not
+        read at all (for offline exports). Returns one result per item, in input order.
+        """
+        if check_stored:
+            await self._ensure_seeded()
+        parsed = [self._parse_post_input(item) for item in items]
+        stored = await self._check_unchanged([post for post in parsed if "error" not in post], check_stored)
+        valid = [post for post in parsed if "error" not in post and not post['unchanged']]
+
+        duplicates, batch_duplicates = await asyncio.to_thread(self._find_near_duplicates, valid) if Config.NEAR_DUP_ENABLED else ({}, {})
+        for i, (original_id, similarity, _) in duplicates.items():
+            valid[i]['duplicate_of'], valid[i]['duplicate_similarity'] = original_id, similarity
+            valid[i]['extraction_tier'] = "duplicate"
+        for i, (leader, similarity) in batch_duplicates.items():
+            if valid[leader]['post_id'] != valid[i]['post_id']:  # the same post twice in one batch is no repost
+                valid[i]['duplicate_of'], valid[i]['duplicate_similarity'] = valid[leader]['post_id'], similarity
+            valid[i]['extraction_tier'] = "duplicate"
+        to_extract_indices = [i for i in range(len(valid)) if i not in duplicates and i not in batch_duplicates]
+        to_extract = [valid[i] for i in to_extract_indices]
+        extracted, tiers = await self.extract_tiered(
+            [post['text'] for post in to_extract], [post['extraction_policy'] or policy for post in to_extract]
         )
-        FOREACH (_ IN CASE WHEN $verdictValue IS NOT NULL THEN [1] ELSE [] END |
-            MERGE (v:FactCheckVerdict {value: $verdictValue})
-            MERGE (s:FactCheckSource {name: $verdictSource})
-            MERGE (p)-[:HAS_VERDICT]->(v) MERGE (v)-[:FROM_SOURCE]->(s)
+        for post, tier in zip(to_extract, tiers):
+            post['extraction_tier'] = tier
+        extraction_of = dict(zip(to_extract_indices, extracted))
+        extraction_of.update((i, match[2]) for i, match in duplicates.items())
+        extraction_of.update((i, extraction_of[leader]) for i, (leader, _) in batch_duplicates.items())
+        if Config.NEAR_DUP_ENABLED:
+            await asyncio.to_thread(self._index_extractions, to_extract, extracted)
+            reused = len(duplicates) + len(batch_duplicates)
+            if reused:
+                await asyncio.to_thread(self.dedup_index.record_reused, reused)
+                logger.info(f"Reused extractions of near-duplicate posts for {reused} of {len(valid)} items "
+                            f"({len(batch_duplicates)} within the batch).")
+
+        valid_index = 0
+        results = []
+        for post in parsed:
+            if "error" in post:
+                results.append(post["error"])
+                continue
+            if post['unchanged']:
+                results.append({"post_id": post['post_id'], "status": "unchanged", "graph_data_inserted": False})
+                continue
+            extraction = extraction_of[valid_index]
+            valid_index += 1
+            params = self._diff_relationships(
+                self._build_post_params(post, self._canonicalize(extraction)), stored.get(post['post_id']))
+            results.append({"post_id": post['post_id'], "status": "prepared", "params": params})
+        return results
+
+    async def _write_rows(self, rows: list[dict]) -> set:
+        """
+        Writes a list of post parameter maps in a single transaction and returns the confirmed post ids.
+        Shared nodes are pre-MERGEd in sorted order and rows are written in post id order, except that
+        near-duplicates of another post in the same chunk come after it, so their DUPLICATE_OF link finds it.
+        """
+        post_ids = {row['postId'] for row in rows}
+        rows = sorted(rows, key=lambda row: (row.get('duplicateOf') in post_ids, row['postId']))
+        try:
+            _, records = await self.neo4j.write_batch([
+                (SHARED_NODES_QUERY, _shared_node_params(rows)),
+                (POST_WRITE_QUERY, {"rows": rows}),
+            ])
+        finally:
+            # Drop cached reads even if the outcome is unknown; a stale entry is worse than a miss.
+            self.invalidate_posts([row['postId'] for row in rows], _written_node_keys(rows))
+        # LLM-extracted entities feed the local extractor's gazetteer; its own guesses do not.
+        self.local_extractor.add_to_gazetteer(
+            name for row in rows if row.get('extractionTier') in ("fast", "accurate") for name in row['entitiesList']
         )
-        FOREACH (claimText IN $claimsList | MERGE (c:Claim {text: claimText}) MERGE (p)-[:CONTAINS_CLAIM]->(c) )
-        FOREACH (entityName IN $entitiesList | MERGE (e:Entity {name: entityName}) MERGE (p)-[:MENTIONS]->(e) )
-        FOREACH (keywordText IN $keywordsList | MERGE (k:Keyword {text: keywordText}) MERGE (p)-[:HAS_KEYWORD]->(k) )
-        FOREACH (hashtagTag IN $hashtagsList | MERGE (h:Hashtag {tag: hashtagTag}) MERGE (p)-[:HAS_HASHTAG]->(h) )
-        FOREACH (mentionName IN $mentionsList | MERGE (m:Entity {name: mentionName}) MERGE (p)-[:MENTIONS_USER]->(m) )
-        RETURN p.id AS postId
+        written_ids = {record.get('postId') for record in records}
+        if Config.CLAIM_INDEX_ENABLED:
+            try:
+                # claimsList only holds links new to each post; claims already indexed are skipped.
+                await asyncio.to_thread(self.claim_index.add, [claim for row in rows if row['postId'] in written_ids for claim in row['claimsList']])
+            except Exception as e:
+                # The graph write succeeded; `python manage.py index-claims` fills any gap later.
+                logger.warning(f"Could not add claims to the similarity index: {e}")
+        return written_ids
+
+    async def write_posts_bulk(self, rows: list[dict], chunk_size: int = None) -> list[dict]:
+        """
+        Writes many prepared posts with one UNWIND transaction per chunk.
+        Returns one result dict per input row, in input order.
         """
+        chunk_size = chunk_size or Config.NEO4J_WRITE_BATCH_SIZE
+        results = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                written_ids = await self._write_rows(chunk)
+            except Exception as e:
+                logger.error(f"Bulk graph write failed for {len(chunk)} posts starting at offset {start}: {e}")
+                results.extend({"post_id": row['postId'], "status": "error", "message": f"Graph write failed: {e}"} for row in chunk)
+                continue
+            for row in chunk:
+                if row['postId'] in written_ids:
+                    results.append({"post_id": row['postId'], "status": "success", "graph_data_inserted": True})
+                else:
+                    results.append({"post_id": row['postId'], "status": "error", "message": "Graph insertion could not be confirmed."})
+        return results
+
+    async def process_post(self, post_data: dict) -> dict:
+        """
+        This is the DEFINITIVE, FINAL version, built specifically for the 'supergoose/.../healthfact_classification' dataset.
+        """
+        prepared = await self.prepare_post(post_data)
+        if prepared['status'] != "prepared":
+            return prepared
+        post_id = prepared['post_id']
         
         try:
-            results = await asyncio.to_thread(self.neo4j.run_query, query, params)
-            if results and results[0].get('postId') == post_id:
-                return {"post_id": post_id, "status": "success", "graph_data_inserted": True}
+            written_ids = await self._write_rows([prepared['params']])
+            if post_id in written_ids:
+                return {"post_id": post_id, "status": "success", "graph_data_inserted": True,
+                        "extraction_tier": prepared['params']['extractionTier']}
             else:
                 return {"post_id": post_id, "status": "error", "message": "Graph insertion could not be confirmed."}
         except Exception as e:
             logger.error(f"Failed to create/update graph for post {post_id}: {e}")
             raise
 
-    async def get_post_graph(self, post_id: str):
-        # This code is correct and does not need to change
-        query = "MATCH (p:Post {id: $postId}) CALL apoc.path.subgraphAll(p, { maxLevel: 2 }) YIELD nodes, relationships RETURN nodes, relationships"
+    def invalidate_posts(self, post_ids, node_keys=()):
+        """
+        Evicts cached responses a write to `post_ids` may have changed: the posts' own graph and
+        summary entries, and any other post's graph page that contains one of the written posts
+        or of `node_keys`, the (label, key) pairs of the shared nodes linked or unlinked. Pages
+        with a cursor before or after them are evicted too, since the rest of their subgraph is unknown.
+        """
+        post_ids = set(post_ids)
+        touched = set(node_keys) | {("Post", post_id) for post_id in post_ids}
+        if not touched:
+            return
+
+        def stale(key, value):
+            if key[1] in post_ids:
+                return True
+            return key[0] == "graph" and (value[1] is None or not touched.isdisjoint(value[1]))
+
+        self.response_cache.delete_items_where(stale)
+
+    async def update_verdict(self, post_id: str, verdict: str, source: str) -> None:
+        params = {"postId": post_id, "verdictValue": verdict, "sourceName": source}
+        try:
+            # Also moves the post's claims to the new verdict in their verdict mix.
+            await self.neo4j.write(UPDATE_VERDICT_QUERY, params)
+        finally:
+            # Graphs showing the post's verdict or source change too.
+            self.invalidate_posts([post_id], [("FactCheckVerdict", verdict), ("FactCheckSource", source)])
+
+    def _post_graph_query(self, depth: int, rel_types: list[str] = None, use_apoc: bool = True) -> str:
+        """
+        Builds the paged subgraph query. The subgraph is capped at POST_GRAPH_MAX_NODES nodes;
+        each page returns nodes in elementId order, each with its outgoing links into the subgraph.
+        Depth and relationship types are validated by the caller before being inlined.
+        """
+        if use_apoc:
+            # subgraphAll already returns the relationships inside the subgraph; grouped by start node,
+            # each page node finds its links with one map lookup instead of a membership test per link.
+            expand = """
+            CALL apoc.path.subgraphAll(p, {maxLevel: $depth, relationshipFilter: $relFilter, limit: $maxNodes})
+            YIELD nodes, relationships
+            WITH nodes, apoc.map.groupByMulti(
+                [r IN relationships | {start: elementId(startNode(r)), rel: r, targetId: coalesce(endNode(r).id, elementId(endNode(r)))}],
+                'start') AS linksByStart
+            UNWIND nodes AS n
+            """
+            carried, out_links = "linksByStart", "[link IN coalesce(linksByStart[elementId(n)], []) | {rel: link.rel, targetId: link.targetId}]"
+        else:
+            # Without APOC the subgraph is expanded breadth-first, one hop per level, keeping only nodes not
+            # reached yet. A variable-length pattern would enumerate every path, which explodes around hub nodes.
+            rel_pattern = ":" + "|".join(rel_types) if rel_types else ""  # types cannot be parameters in a pattern
+            level = f"""
+            CALL {{ WITH sub, frontier
+                UNWIND frontier AS f
+                MATCH (f)-[{rel_pattern}]-(x) WHERE NOT x IN sub
+                WITH DISTINCT x LIMIT $maxNodes
+                RETURN collect(x) AS reached }}
+            WITH sub + reached[..$maxNodes - size(sub)] AS sub, reached[..$maxNodes - size(sub)] AS frontier
+            """
+            expand = f"""
+            WITH [p] AS sub, [p] AS frontier
+            {level * depth}
+            UNWIND sub AS n
+            """
+            carried, out_links = "sub", """[(n)-[r]->(m) WHERE m IN sub AND ($relTypes IS NULL OR type(r) IN $relTypes)
+                   | {rel: r, targetId: coalesce(m.id, elementId(m))}]"""
+        return f"""
+        MATCH (p:Post {{id: $postId}})
+        {expand}
+        WITH n, {carried} WHERE $cursor IS NULL OR elementId(n) > $cursor
+        WITH n, {carried} ORDER BY elementId(n) LIMIT $pageSize
+        RETURN n, {out_links}[..$relLimit] AS outLinks
+        ORDER BY elementId(n)
+        """
+
+    @staticmethod
+    def _post_graph_params(post_id: str, depth: int, limit: int, rel_limit: int, cursor: str, rel_types: list[str]) -> dict:
+        return {
+            "postId": post_id, "depth": depth, "maxNodes": Config.POST_GRAPH_MAX_NODES,
+            "relFilter": "|".join(rel_types) if rel_types else "",
+            "relTypes": list(rel_types) if rel_types else None,
+            "cursor": decode_cursor(cursor) if cursor else None,
+            "pageSize": limit + 1, "relLimit": rel_limit,
+        }
+
+    def _iter_graph_page(self, records, limit: int, rel_limit: int):
+        """
+        Converts page records into ("node", dict) and ("link", dict) items as they are consumed,
+        ending with ("next_cursor", cursor or None). A page stops before the node that would
+        exceed either the node limit or the relationship limit.
+        """
+        serializer = GraphSerializer()
+        node_count, link_count, last_element_id = 0, 0, None
+        for record in records:
+            node, out_links = record['n'], record['outLinks']
+            if node_count >= limit or (node_count and link_count + len(out_links) > rel_limit):
+                yield "next_cursor", encode_cursor(last_element_id)
+                return
+            node_dict = serializer.node(node)
+            yield "node", node_dict
+            for link in out_links:
+                yield "link", serializer.relationship(link['rel'], node_dict['id'], str(link['targetId']))
+            node_count += 1
+            link_count += len(out_links)
+            last_element_id = node.element_id
+        yield "next_cursor", None
+
+    async def get_post_graph(self, post_id: str, depth: int = 2, limit: int = None, rel_limit: int = None,
+                             cursor: str = None, rel_types: list[str] = None):
+        """Read-through cached wrapper around _load_post_graph."""
+        limit = limit or Config.POST_GRAPH_PAGE_SIZE
+        rel_limit = rel_limit or Config.POST_GRAPH_REL_LIMIT
+        cache_key = ("graph", post_id, depth, limit, rel_limit, cursor, tuple(rel_types or ()))
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached[0]
+        graph_data = await self._load_post_graph(post_id, depth, limit, rel_limit, cursor, rel_types)
+        if graph_data and graph_data['nodes']:
+            # Only a whole subgraph tells which writes can change it; a partial page has no node keys.
+            whole = cursor is None and graph_data['next_cursor'] is None
+            self.response_cache.set(cache_key, (graph_data, _graph_node_keys(graph_data['nodes']) if whole else None))
+        return graph_data
+
+    async def _load_post_graph(self, post_id: str, depth: int, limit: int, rel_limit: int, cursor: str, rel_types: list[str]):
+        params = self._post_graph_params(post_id, depth, limit, rel_limit, cursor, rel_types)
         try:
-            records = await asyncio.to_thread(self.neo4j.run_query, query, {"postId": post_id})
-            nodes_map, links = {}, []
-            if not records: return {"nodes": [], "links": []}
-            record = records[0]
-            for node in record.get('nodes', []):
-                node_id = node.get('id', node.element_id)
-                nodes_map[node.element_id] = { "id": str(node_id), "labels": list(node.labels), "properties": serialize_neo4j_value(dict(node)) }
-            for rel in record.get('relationships', []):
-                if rel.start_node.element_id in nodes_map and rel.end_node.element_id in nodes_map:
-                    links.append({ "source": str(nodes_map[rel.start_node.element_id]['id']), "target": str(nodes_map[rel.end_node.element_id]['id']), "type": rel.type, "properties": serialize_neo4j_value(dict(rel)) })
-            return {"nodes": list(nodes_map.values()), "links": links}
+            records = await self.neo4j.read(self._post_graph_query(depth, rel_types), params)
         except Exception as e:
-            if "Unknown function 'apoc.path.subgraphAll'" in str(e):
+            if self._is_apoc_missing(e):
                 logger.warning("APOC not found, using fallback query for get_post_graph.")
-                return await self.get_post_graph_fallback(post_id)
+                return await self.get_post_graph_fallback(post_id, depth, limit, rel_limit, cursor, rel_types)
             logger.error(f"Error retrieving graph for post {post_id}: {e}")
             raise
+        return self._collect_graph_page(records, limit, rel_limit)
 
-    async def get_post_graph_fallback(self, post_id: str):
-        # This code is correct and does not need to change
-        query = "MATCH (p:Post {id: $postId}) OPTIONAL MATCH (p)-[r]-(n) RETURN p, r, n"
-        records = await asyncio.to_thread(self.neo4j.run_query, query, {"postId": post_id})
-        nodes_map, links_set = {}, set()
-        for record in records:
-            p_node = record['p']; n_node = record['n']; rel = record['r']
-            if p_node:
-                p_id = p_node.get('id', p_node.element_id)
-                nodes_map[p_node.element_id] = {"id": str(p_id), "labels": list(p_node.labels), "properties": serialize_neo4j_value(dict(p_node))}
-            if n_node:
-                n_id = n_node.get('id', n_node.element_id)
-                nodes_map[n_node.element_id] = {"id": str(n_id), "labels": list(n_node.labels), "properties": serialize_neo4j_value(dict(n_node))}
-            if rel:
-                source_id, target_id = str(nodes_map[rel.start_node.element_id]['id']), str(nodes_map[rel.end_node.element_id]['id'])
-                links_set.add((source_id, target_id, rel.type))
-        links = [{"source": s, "target": t, "type": typ} for s, t, typ in links_set]
-        return {"nodes": list(nodes_map.values()), "links": links}
+    async def get_post_graph_fallback(self, post_id: str, depth: int = 2, limit: int = None, rel_limit: int = None,
+                                      cursor: str = None, rel_types: list[str] = None):
+        limit = limit or Config.POST_GRAPH_PAGE_SIZE
+        rel_limit = rel_limit or Config.POST_GRAPH_REL_LIMIT
+        params = self._post_graph_params(post_id, depth, limit, rel_limit, cursor, rel_types)
+        records = await self.neo4j.read(self._post_graph_query(depth, rel_types, use_apoc=False), params)
+        return self._collect_graph_page(records, limit, rel_limit)
+
+    def _collect_graph_page(self, records, limit: int, rel_limit: int) -> dict:
+        graph_data = {"nodes": [], "links": [], "next_cursor": None}
+        for kind, item in self._iter_graph_page(records, limit, rel_limit):
+            if kind == "next_cursor":
+                graph_data["next_cursor"] = item
+            else:
+                graph_data[kind + "s"].append(item)
+        return graph_data
+
+    def stream_post_graph(self, post_id: str, depth: int = 2, limit: int = None, rel_limit: int = None,
+                          cursor: str = None, rel_types: list[str] = None):
+        """
+        Synchronous generator of graph items for NDJSON responses. Records are pulled from the
+        driver as the response is written, so nothing is materialized beyond the driver's fetch buffer.
+        APOC is required for streaming; there is no fallback once the first bytes are sent.
+        """
+        limit = limit or Config.POST_GRAPH_PAGE_SIZE
+        rel_limit = rel_limit or Config.POST_GRAPH_REL_LIMIT
+        params = self._post_graph_params(post_id, depth, limit, rel_limit, cursor, rel_types)
+        records = self.neo4j.stream_sync(self._post_graph_query(depth, rel_types), params)
+        try:
+            yield from self._iter_graph_page(records, limit, rel_limit)
+        finally:
+            records.close()
+
+    @staticmethod
+    def _is_apoc_missing(error: Exception) -> bool:
+        message = str(error)
+        # Any APOC name counts: the page query needs apoc.path.subgraphAll and apoc.map.groupByMulti.
+        return "apoc." in message and ("Unknown function" in message or "no procedure" in message)
+
+    async def get_post_graphs(self, post_ids: list[str]) -> dict:
+        """
+        Fetches the subgraphs of several posts with one query and merges them.
+        Nodes and links shared between posts appear once; "memberships" lists, per post,
+        the node ids and link indices that belong to its subgraph. Each subgraph is capped at
+        POST_GRAPH_MAX_NODES nodes and POST_GRAPH_REL_LIMIT links, like /post-graph; "truncated"
+        lists the posts that hit a cap (page through those with /post-graph).
+        """
+        query = """
+        UNWIND $postIds AS postId
+        MATCH (p:Post {id: postId})
+        CALL apoc.path.subgraphAll(p, {maxLevel: 2, limit: $maxNodes}) YIELD nodes, relationships
+        RETURN postId, nodes, relationships[..$relLimit] AS relationships,
+               size(nodes) >= $maxNodes OR size(relationships) > $relLimit AS truncated
+        """
+        params = {"postIds": post_ids, "maxNodes": Config.POST_GRAPH_MAX_NODES, "relLimit": Config.POST_GRAPH_REL_LIMIT}
+        try:
+            records = await self.neo4j.read(query, params)
+            rows = [(record['postId'], record['nodes'], record['relationships'], record['truncated']) for record in records]
+        except Exception as e:
+            if not self._is_apoc_missing(e):
+                logger.error(f"Error retrieving graphs for posts {post_ids}: {e}")
+                raise
+            logger.warning("APOC not found, using fallback query for get_post_graphs.")
+            # Without APOC only direct neighbours are returned, one row per link.
+            fallback_query = """
+            UNWIND $postIds AS postId
+            MATCH (p:Post {id: postId})
+            CALL { WITH p OPTIONAL MATCH (p)-[r]-(n) RETURN r, n LIMIT $relLimit }
+            RETURN postId, p, r, n
+            """
+            params["relLimit"] = min(Config.POST_GRAPH_MAX_NODES - 1, Config.POST_GRAPH_REL_LIMIT)
+            records = await self.neo4j.read(fallback_query, params)
+            grouped = {}
+            for record in records:
+                nodes, rels, count = grouped.setdefault(record['postId'], ({}, {}, [0]))
+                count[0] += 1
+                for node in (record['p'], record['n']):
+                    if node is not None:
+                        nodes[node.element_id] = node
+                if record['r'] is not None:
+                    rels[record['r'].element_id] = record['r']
+            rows = [(post_id, list(nodes.values()), list(rels.values()), count[0] >= params["relLimit"])
+                    for post_id, (nodes, rels, count) in grouped.items()]
+
+        serializer = GraphSerializer()
+        links, link_index = [], {}
+        memberships, truncated = {}, []
+        for post_id, nodes, relationships, capped in rows:
+            if capped:
+                truncated.append(post_id)
+            membership = memberships.setdefault(post_id, {"nodes": [], "links": []})
+            for node in nodes:
+                membership["nodes"].append(serializer.node(node)['id'])
+            for rel in relationships:
+                start_id, end_id = rel.start_node.element_id, rel.end_node.element_id
+                if not serializer.seen(start_id) or not serializer.seen(end_id):
+                    continue
+                if rel.element_id not in link_index:
+                    link_index[rel.element_id] = len(links)
+                    links.append(serializer.relationship(rel, serializer.node_id(start_id), serializer.node_id(end_id)))
+                membership["links"].append(link_index[rel.element_id])
+        return {
+            "nodes": serializer.nodes(),
+            "links": links,
+            "memberships": memberships,
+            "missing": [post_id for post_id in post_ids if post_id not in memberships],
+            "truncated": truncated,
+        }
 
     async def get_summary_and_verdict(self, post_id: str):
-        # This code is correct and does not need to change
+        cache_key = ("summary", post_id)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
         query = "MATCH (p:Post {id: $postId}) OPTIONAL MATCH (p)-[:HAS_VERDICT]->(v:FactCheckVerdict)-[:FROM_SOURCE]->(s:FactCheckSource) RETURN p.summary AS summary, v.value AS verdict, s.name AS verdictSource"
         try:
-            records = await asyncio.to_thread(self.neo4j.run_query, query, {"postId": post_id})
-            return records[0].data() if records else None
+            records = await self.neo4j.read(query, {"postId": post_id})
+            summary_data = records[0].data() if records else None
+            if summary_data:
+                self.response_cache.set(cache_key, summary_data)
+            return summary_data
         except Exception as e:
             logger.error(f"Error retrieving summary/verdict for post {post_id}: {e}")
             raise
 
-graph_agent = GraphAgent()
\ No newline at end of file
+graph_agent = GraphAgent()
+
+def _cache_samples():
+    # Read at scrape time from the caches' own counters, so lookups pay nothing extra.
+    extraction, responses = graph_agent.extraction_cache, graph_agent.response_cache
+    for cache, result, value in (
+        ("extraction", "hit", extraction.hits), ("extraction", "miss", extraction.misses),
+        ("response", "hit", responses.hits), ("response", "miss", responses.misses),
+        ("near_duplicate", "hit", graph_agent.dedup_index.matches),
+        ("near_duplicate", "miss", graph_agent.dedup_index.lookups - graph_agent.dedup_index.matches),
+    ):
+        yield {"cache": cache, "result": result}, value
+
+registry.callback('graphrag_cache_lookups_total', 'Cache lookups by cache and result.', 'counter', _cache_samples)
+registry.callback('graphrag_extraction_posts_total', 'Posts extracted, by tier.', 'counter',
+                  lambda: [({"tier": tier}, count) for tier, count in list(graph_agent.tier_counts.items())])
+registry.callback('graphrag_canonical_variants_merged_total', 'Extracted names resolved onto an existing canonical node.', 'counter',
+                  lambda: [({}, graph_agent.canonical_index.merged)])
+registry.callback('graphrag_near_duplicate_extractions_reused_total', 'Posts that reused a near-duplicate\'s extraction instead of being extracted.', 'counter',
+                  lambda: [({}, graph_agent.dedup_index.extractions_reused)])
+registry.callback('graphrag_post_fingerprint_checks_total', 'Posts checked against their stored content fingerprint, by result.', 'counter',
+                  lambda: [({"result": result}, count) for result, count in list(graph_agent.fingerprint_checks.items())])
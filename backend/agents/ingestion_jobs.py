@@ -0,0 +1,251 @@
+# backend/agents/ingestion_jobs.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from config import Config
+from agents.dataset_loader import dataset_loader
+from agents.ingestion_pipeline import IngestionStats, run_ingestion_pipeline
+from utils.event_loop import run_sync
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class IngestionJob:
+    """
+    State of one dataset ingestion run. `next_index` is the first dataset index that
+    has not been committed to Neo4j yet; it is persisted after every committed chunk.
+    """
+    def __init__(self, job_id: str, dataset_name: str, config_name: str = None, split: str = 'train', limit: int = None,
+                 extraction_policy: dict = None):
+        self.job_id = job_id
+        self.dataset_name = dataset_name
+        self.config_name = config_name
+        self.split = split
+        self.limit = limit
+        self.extraction_policy = extraction_policy
+        self.status = "pending"
+        self.total_items = None
+        self.next_index = 0
+        self.processed = 0
+        self.failed = 0
+        self.unchanged = 0
+        self.resumed_from = 0
+        self.sample_of_processed_ids = []
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.heartbeat_at = None  # refreshed while the job runs; an active job whose heartbeat lapsed was interrupted
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("pending", "running")
+
+    def lease_expired(self, now: float = None) -> bool:
+        return (now or time.time()) - (self.heartbeat_at or 0) > Config.INGEST_LEASE_SECONDS
+
+    def throughput(self) -> float:
+        """Items per second handled by the current (or last) run."""
+        if not self.started_at:
+            return 0.0
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        handled = self.next_index - self.resumed_from
+        return round(handled / elapsed, 3) if elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "dataset_name": self.dataset_name,
+            "config_name": self.config_name,
+            "split": self.split,
+            "limit": self.limit,
+            "extraction_policy": self.extraction_policy,
+            "status": self.status,
+            "total_items": self.total_items,
+            "next_index": self.next_index,
+            "last_committed_index": self.next_index - 1 if self.next_index else None,
+            "processed_successfully": self.processed,
+            "failed_to_process": self.failed,
+            "skipped_unchanged": self.unchanged,
+            "resumed_from": self.resumed_from,
+            "items_per_second": self.throughput(),
+            "sample_of_processed_ids": self.sample_of_processed_ids,
+            "error": self.error,
+            "heartbeat_at": self.heartbeat_at,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IngestionJob":
+        job = cls(data['job_id'], data['dataset_name'], data.get('config_name'), data.get('split', 'train'), data.get('limit'),
+                  data.get('extraction_policy'))
+        job.status = data.get('status', "pending")
+        job.total_items = data.get('total_items')
+        job.next_index = data.get('next_index', 0)
+        job.processed = data.get('processed_successfully', 0)
+        job.failed = data.get('failed_to_process', 0)
+        job.unchanged = data.get('skipped_unchanged', 0)
+        job.resumed_from = data.get('resumed_from', 0)
+        job.sample_of_processed_ids = data.get('sample_of_processed_ids', [])
+        job.error = data.get('error')
+        job.heartbeat_at = data.get('heartbeat_at')
+        job.created_at = data.get('created_at', job.created_at)
+        job.started_at = data.get('started_at')
+        job.finished_at = data.get('finished_at')
+        return job
+
+class IngestionJobManager:
+    """
+    Runs dataset ingestion in background threads, one event loop per job, and keeps a
+    JSON checkpoint per job. Job ids are derived from the request, so re-submitting the
+    same dataset/split after a crash or restart resumes from the last committed index.
+    """
+    def __init__(self, checkpoint_dir: str = None):
+        self.checkpoint_dir = checkpoint_dir or Config.INGEST_CHECKPOINT_DIR
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # the heartbeat and the job's own commits both save
+
+    @staticmethod
+    def job_id_for(dataset_name: str, config_name: str = None, split: str = 'train', limit: int = None) -> str:
+        key = json.dumps([dataset_name, config_name, split, limit])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+    def _checkpoint_path(self, job_id: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{job_id}.json")
+
+    def _save_checkpoint(self, job: IngestionJob):
+        """Writes the job's checkpoint atomically; every save also renews its lease."""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._checkpoint_path(job.job_id)
+        tmp_path = f"{path}.tmp"
+        with self._save_lock:
+            job.heartbeat_at = time.time()
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(job.to_dict(), f)
+            os.replace(tmp_path, path)
+
+    def _load_checkpoint(self, job_id: str):
+        """
+        Reads a job that is not running in this process. A job recorded as active whose lease
+        lapsed (no heartbeat for INGEST_LEASE_SECONDS) died without recording an outcome; it is
+        reported as "interrupted" and resumes when its request is resubmitted. The file is not modified.
+        """
+        try:
+            with open(self._checkpoint_path(job_id), encoding='utf-8') as f:
+                job = IngestionJob.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint for job {job_id}: {e}")
+            return None
+        if job.is_active and job.lease_expired():
+            job.status = "interrupted"
+        return job
+
+    def start(self, dataset_name: str, config_name: str = None, split: str = 'train', limit: int = None, restart: bool = False,
+              extraction_policy: dict = None) -> IngestionJob:
+        """
+        Starts (or resumes) the job for this request and returns it. An already-running job is returned as is.
+        A resumed job uses the extraction policy of the resubmitted request.
+        """
+        job_id = self.job_id_for(dataset_name, config_name, split, limit)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job.is_active:
+                return job
+            checkpoint = None if restart else self._load_checkpoint(job_id)
+            if checkpoint and checkpoint.is_active:
+                # Another worker still holds the lease; starting it here would ingest the same rows twice.
+                return checkpoint
+            if checkpoint and checkpoint.status == "completed":
+                self._jobs[job_id] = checkpoint
+                return checkpoint
+            job = IngestionJob(job_id, dataset_name, config_name, split, limit, extraction_policy)
+            if checkpoint:
+                job.next_index = job.resumed_from = checkpoint.next_index
+                job.processed, job.failed, job.unchanged = checkpoint.processed, checkpoint.failed, checkpoint.unchanged
+                job.sample_of_processed_ids = checkpoint.sample_of_processed_ids
+                job.created_at = checkpoint.created_at
+                logger.info(f"Resuming ingestion job {job_id} from index {job.next_index}.")
+            self._jobs[job_id] = job
+        self._save_checkpoint(job)
+        threading.Thread(target=self._run_in_thread, args=(job,), name=f"ingest-{job_id}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job or self._load_checkpoint(job_id)
+
+    def cancel(self, job_id: str):
+        """
+        Requests cancellation; the job stops after the chunk it is currently writing.
+        Returns the job, or None if it is not active in this process.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not (job and job.is_active):
+                return None
+            job.cancel_event.set()
+        return job
+
+    def _heartbeat(self, job: IngestionJob, stop: threading.Event):
+        # Chunks can take minutes, so the lease is renewed independently of commits.
+        while not stop.wait(Config.INGEST_HEARTBEAT_SECONDS):
+            self._save_checkpoint(job)
+
+    def _run_in_thread(self, job: IngestionJob):
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop_heartbeat), name=f"ingest-heartbeat-{job.job_id}", daemon=True)
+        heartbeat.start()
+        try:
+            if Config.SHARED_EVENT_LOOP:
+                run_sync(self._run, job)
+            else:
+                asyncio.run(self._run(job))
+        except Exception as e:
+            logger.exception(f"Ingestion job {job.job_id} crashed: {e}")
+            job.status, job.error = "failed", str(e)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            job.finished_at = time.time()
+            self._save_checkpoint(job)
+
+    async def _run(self, job: IngestionJob):
+        job.status, job.started_at = "running", time.time()
+        logger.info(f"Loading dataset: {job.dataset_name}...")
+        rows, job.total_items = await asyncio.to_thread(
+            dataset_loader.iter_hf_dataset, job.dataset_name, job.config_name, job.split,
+            job.next_index, job.limit, Config.INGEST_STREAMING,
+        )
+        id_prefix = f"{job.dataset_name.replace('/', '_')}_{job.split}"
+
+        def on_commit(next_index: int, stats: IngestionStats):
+            job.next_index = next_index
+            job.processed, job.failed, job.unchanged = stats.processed, stats.failed, stats.unchanged
+            job.sample_of_processed_ids = stats.sample_of_processed_ids
+            self._save_checkpoint(job)
+            logger.info(f"Job {job.job_id}: committed up to index {next_index - 1} / {job.total_items or '?'} ({job.throughput()} items/s).")
+
+        stats = IngestionStats(job.processed, job.failed, job.sample_of_processed_ids, job.unchanged)
+        await run_ingestion_pipeline(
+            rows, id_prefix, start_index=job.next_index, stats=stats, on_commit=on_commit, cancel_event=job.cancel_event,
+            extraction_policy=job.extraction_policy,
+        )
+        if job.cancel_event.is_set():
+            job.status = "cancelled"
+            logger.info(f"Ingestion job {job.job_id} cancelled at index {job.next_index}.")
+        else:
+            job.status = "completed"
+
+# Global instance
+ingestion_jobs = IngestionJobManager()
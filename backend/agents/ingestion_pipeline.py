@@ -0,0 +1,143 @@
+# backend/agents/ingestion_pipeline.py
+import asyncio
+import collections
+import contextlib
+import logging
+from config import Config
+from agents.graph_agent import graph_agent
+from utils.metrics import PIPELINE_STAGE_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+class IngestionStats:
+    """Incremental aggregate of pipeline results, so no per-item result list is kept."""
+    SAMPLE_SIZE = 10
+
+    def __init__(self, processed: int = 0, failed: int = 0, sample_of_processed_ids: list = None, unchanged: int = 0):
+        self.processed = processed
+        self.failed = failed
+        self.unchanged = unchanged
+        self.sample_of_processed_ids = list(sample_of_processed_ids or [])
+
+    def add(self, result: dict):
+        if isinstance(result, dict) and result.get('status') == 'success':
+            self.processed += 1
+            if len(self.sample_of_processed_ids) < self.SAMPLE_SIZE:
+                self.sample_of_processed_ids.append(result['post_id'])
+        elif isinstance(result, dict) and result.get('status') == 'unchanged':
+            self.unchanged += 1
+        else:
+            self.failed += 1
+            logger.error(f"Failed to process item {result.get('post_id') if isinstance(result, dict) else ''}. Reason: {result}")
+
+async def _buffered(stage, maxsize: int):
+    """
+    Runs an async generator stage in its own task, handing items over through a bounded queue.
+    Closing the consumer early cancels the stage task, which closes the stage.
+    """
+    queue = asyncio.Queue(maxsize=maxsize)
+
+    async def pump():
+        async with contextlib.aclosing(stage):
+            try:
+                async for item in stage:
+                    await queue.put(item)
+                await queue.put(_END)
+            except asyncio.CancelledError:
+                # The consumer is gone; nobody will read the queue, so putting could block forever.
+                raise
+            except BaseException as e:
+                # Items still queued are moot once the stage failed; make room so the error cannot block.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(e)
+                raise
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+async def _read_chunks(raw_items, start_index: int, id_prefix: str, chunk_size: int, cancel_event=None):
+    """Clean stage: pulls raw rows lazily (off the event loop), assigns ids and groups them into chunks."""
+    iterator = iter(raw_items)
+
+    def next_chunk():
+        return [item for _, item in zip(range(chunk_size), iterator)]
+
+    index = start_index
+    while not (cancel_event and cancel_event.is_set()):
+        items = await asyncio.to_thread(next_chunk)
+        if not items:
+            return
+        for offset, item in enumerate(items):
+            item['id'] = f"{id_prefix}_{index + offset}"
+        yield index, items
+        index += len(items)
+
+async def _extract_chunks(chunks, parallel_chunks: int, extraction_policy: dict = None, check_stored: bool = True):
+    """Extract stage: prepares up to `parallel_chunks` chunks at once, yielding them in input order."""
+    in_flight = collections.deque()
+    async def prepare(items):
+        with PIPELINE_STAGE_SECONDS.time(stage="extract"):
+            return await graph_agent.prepare_posts(items, extraction_policy, check_stored)
+
+    try:
+        async for start, items in chunks:
+            in_flight.append((start, len(items), asyncio.create_task(prepare(items))))
+            if len(in_flight) >= parallel_chunks:
+                start_, count, task = in_flight.popleft()
+                yield start_, count, await task
+        while in_flight:
+            start_, count, task = in_flight.popleft()
+            yield start_, count, await task
+    finally:
+        # Closed early (a later stage failed or the job was cancelled): drop the chunks still extracting.
+        for _, _, task in in_flight:
+            task.cancel()
+        await asyncio.gather(*(task for _, _, task in in_flight), return_exceptions=True)
+
+async def _write_chunks(prepared_chunks, writer=None):
+    """Write stage: one bulk graph write per chunk. Yields (next_index, per-item results)."""
+    writer = writer or graph_agent
+    async for start, count, prepared_results in prepared_chunks:
+        prepared_rows = [res['params'] for res in prepared_results if res.get('status') == 'prepared']
+        failures = [res for res in prepared_results if res.get('status') != 'prepared']
+        with PIPELINE_STAGE_SECONDS.time(stage="write"):
+            results = failures + await writer.write_posts_bulk(prepared_rows)
+        yield start + count, results
+
+async def run_ingestion_pipeline(raw_items, id_prefix: str, start_index: int = 0, stats: IngestionStats = None,
+                                 on_commit=None, cancel_event=None, extraction_policy: dict = None,
+                                 writer=None, check_stored: bool = True) -> IngestionStats:
+    """
+    Streams raw dataset rows through clean -> extract -> write stages connected by
+    bounded queues. Memory is bounded by the queue sizes, not by the dataset length.
+    `on_commit(next_index, stats)` is called after each chunk is written, in order.
+    `writer` replaces the graph write (anything with `write_posts_bulk`, e.g. a CSV export);
+    `check_stored=False` skips the stored-fingerprint lookup, for writers that never touch Neo4j.
+    """
+    stats = stats or IngestionStats()
+    queue_size = Config.INGEST_QUEUE_SIZE
+    chunks = _buffered(_read_chunks(raw_items, start_index, id_prefix, Config.INGEST_CHUNK_SIZE, cancel_event), queue_size)
+    prepared = _buffered(_extract_chunks(chunks, Config.INGEST_PARALLEL_CHUNKS, extraction_policy, check_stored), queue_size)
+    # On any early exit, stop the stages downstream first so none of them is left blocked on a full queue.
+    async with contextlib.aclosing(chunks), contextlib.aclosing(prepared):
+        async for next_index, results in _write_chunks(prepared, writer):
+            for result in results:
+                stats.add(result)
+            if on_commit:
+                on_commit(next_index, stats)
+    return stats
@@ -0,0 +1,124 @@
+# backend/agents/local_extractor.py
+import math
+import re
+import threading
+from collections import Counter
+from utils.helpers import extract_hashtags, extract_mentions
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z'\-]+")
+_CAPITALIZED_SPAN_RE = re.compile(r"\b(?:[A-Z][a-zA-Z'\-]*|[A-Z]{2,})(?:\s+(?:of|the|for|and|de)?\s*(?:[A-Z][a-zA-Z'\-]*|[A-Z]{2,}))*")
+_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no nor not now of off on once only or other
+our ours ourselves out over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves also new says said one two many much may might must every
+""".split())
+_CLAIM_SIGNALS = re.compile(r"\b(is|are|was|were|will|can|cause[sd]?|cure[sd]?|prevent[sd]?|prove[sdn]?|shows?|kills?|contains?|leads? to|linked)\b", re.I)
+
+class LocalExtractor:
+    """
+    Rule-based and statistical extraction that runs without any LLM call:
+    entities from capitalized spans and a gazetteer of known Entity names, keywords
+    ranked by TF-IDF against the posts seen so far, and claims from claim-like sentences.
+    Each result carries a heuristic "confidence" used to decide whether to escalate.
+    """
+    def __init__(self, max_keywords: int = 5):
+        self.max_keywords = max_keywords
+        self._gazetteer = {}  # casefolded name -> canonical name
+        self._max_gazetteer_words = 1
+        self._doc_freq = Counter()
+        self._doc_count = 0
+        self._lock = threading.Lock()
+
+    def add_to_gazetteer(self, names):
+        with self._lock:
+            for name in names:
+                if isinstance(name, str) and name.strip():
+                    key = name.strip().casefold()
+                    self._gazetteer.setdefault(key, name.strip())
+                    self._max_gazetteer_words = max(self._max_gazetteer_words, min(len(key.split()), 5))
+
+    @property
+    def gazetteer_size(self) -> int:
+        return len(self._gazetteer)
+
+    def _gazetteer_matches(self, words: list[str]) -> list[str]:
+        folded = [w.casefold() for w in words]
+        found = []
+        for size in range(self._max_gazetteer_words, 0, -1):
+            for i in range(len(folded) - size + 1):
+                name = self._gazetteer.get(" ".join(folded[i:i + size]))
+                if name and name not in found:
+                    found.append(name)
+        return found
+
+    def _keywords(self, words: list[str]) -> list[str]:
+        terms = [w.lower() for w in words if len(w) >= 3 and w.lower() not in _STOPWORDS]
+        if not terms:
+            return []
+        tf = Counter(terms)
+        with self._lock:
+            self._doc_count += 1
+            self._doc_freq.update(tf.keys())
+            doc_count, doc_freq = self._doc_count, dict((t, self._doc_freq[t]) for t in tf)
+        scores = {t: (count / len(terms)) * (math.log((doc_count + 1) / (doc_freq[t] + 1)) + 1.0) for t, count in tf.items()}
+        return [t for t, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:self.max_keywords]]
+
+    @staticmethod
+    def _starts_sentence(text: str, start: int) -> bool:
+        before = text[:start].rstrip(' \t\n"\'(\u201c\u2018')
+        return not before or before[-1] in '.!?:'
+
+    def extract(self, text: str) -> dict:
+        sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s.strip()]
+        words = _WORD_RE.findall(text)
+
+        entities = self._gazetteer_matches(words)
+        gazetteer_hits = len(entities)
+        seen = {e.casefold() for e in entities}
+        for match in _CAPITALIZED_SPAN_RE.finditer(text):
+            span_words = match.group().split()
+            if len(span_words) == 1 and not span_words[0].isupper() and self._starts_sentence(text, match.start()):
+                continue  # "Vaccines are safe": capitalized only because it opens the sentence
+            while span_words and not span_words[0].isupper() and span_words[0].lower() in _STOPWORDS:  # sentence-initial "The", "This", ...
+                span_words.pop(0)
+            span = " ".join(span_words)
+            if len(span) > 1 and span.casefold() not in seen:
+                seen.add(span.casefold())
+                entities.append(span)
+        tagged = set(extract_hashtags(text)) | set(extract_mentions(text))
+        entities = [e for e in entities if e not in tagged]
+        capitalized_entities = len(entities) - gazetteer_hits
+
+        claims = [s for s in sentences if _CLAIM_SIGNALS.search(s) and not s.endswith('?')][:3]
+        summary = sentences[0][:280] if sentences else ""
+
+        # Confidence: short, single-claim, declarative posts with recognizable entities are what
+        # the rules handle well; questions, long multi-sentence texts and claimless posts are not.
+        # A claim alone stays below the default threshold (0.75); it also needs a known entity or two
+        # capitalized names, so an ordinary sentence such as "Vaccines are safe." escalates.
+        confidence = 0.3
+        if claims:
+            confidence += 0.25
+        if gazetteer_hits:
+            confidence += 0.25
+        else:
+            confidence += 0.1 * min(capitalized_entities, 2)
+        if len(sentences) > 3:
+            confidence -= 0.2
+        if '?' in text:
+            confidence -= 0.15
+
+        return {
+            "claims": claims,
+            "entities": entities,
+            "summary": summary,
+            "keywords": self._keywords(words),
+            "confidence": round(max(0.0, min(confidence, 1.0)), 3),
+        }
+
+# Global instance
+local_extractor = LocalExtractor()
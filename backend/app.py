@@ -1,12 +1,27 @@
 # backend/app.py
-from flask import Flask, jsonify
+import time
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from config import Config
 from routes.graph_routes import graph_bp
 from services.neo4j_service import neo4j_service
+from services.neo4j_async_service import neo4j_async_service
+from services.groq_service import groq_service
+from utils.serialization import FastJSONProvider
+from utils.metrics import registry, HTTP_REQUEST_SECONDS
+from utils.event_loop import run_sync
 import asyncio # Required for async Flask routes
 
-app = Flask(__name__)
+class GraphRAGFlask(Flask):
+    def async_to_sync(self, func):
+        # Flask's default runs each async view on a fresh event loop, so nothing async can be
+        # pooled across requests. Views run on the worker's shared loop instead.
+        if not Config.SHARED_EVENT_LOOP:
+            return super().async_to_sync(func)
+        return lambda *args, **kwargs: run_sync(func, *args, **kwargs)
+
+app = GraphRAGFlask(__name__)
+app.json = FastJSONProvider(app) # orjson-backed jsonify for large graph responses
 CORS(app) # Enable CORS for all origins, adjust in production
 
 # Load configuration
@@ -32,7 +47,16 @@ def internal_server_error(error):
 @app.before_request
 def before_request():
     # Example: you could add authentication checks here
-    pass
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # The route template, not the raw path, keeps label cardinality bounded.
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
 
 @app.teardown_appcontext
 def teardown_db(exception=None):
@@ -43,6 +67,26 @@ def teardown_db(exception=None):
         # consider managing driver lifecycle more carefully in very large apps.
         pass # The singleton handles its own connection lifecycle.
 
+@app.route('/metrics')
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/healthz')
+def healthz():
+    # Liveness only: answers as soon as the worker is up, without touching dependencies.
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+async def readyz():
+    checks = {"groq": "ok" if groq_service.is_configured() else "GROQ_API_KEY is not set"}
+    try:
+        await neo4j_async_service.ping()
+        checks["neo4j"] = "ok"
+    except Exception as e:
+        checks["neo4j"] = f"{type(e).__name__}: {e}"
+    ready = all(status == "ok" for status in checks.values())
+    return jsonify({"status": "ready" if ready else "not_ready", "checks": checks}), 200 if ready else 503
+
 @app.route('/')
 def home():
     return jsonify({"message": "GraphRAG Backend API is running!", "version": "1.0.0"})
@@ -51,12 +95,9 @@ def home():
 # If you are on an older Flask version, you'll need to use async with a WSGI server like Gunicorn + Uvicorn worker
 # For development: flask --app app run --debug --no-reload
 if __name__ == '__main__':
-    # Initialize Neo4j service at startup to verify connection
-    try:
-        neo4j_service.get_driver()
-        app.logger.info("Neo4j service initialized successfully at app startup.")
-    except ConnectionError:
-        app.logger.error("Failed to initialize Neo4j service at startup. Check credentials.")
+    # Connect to Neo4j and build the Groq clients in the background; /readyz reports when Neo4j is reachable.
+    neo4j_async_service.warm_up()
+    groq_service.warm_up()
 
     # In development, run directly. For production, use Gunicorn/Uvicorn.
     app.run(debug=Config.DEBUG, host='0.0.0.0', port=5000)
\ No newline at end of file
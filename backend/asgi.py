@@ -0,0 +1,208 @@
+# backend/asgi.py
+import asyncio
+import inspect
+import io
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from flask import request, request_started
+from werkzeug.exceptions import HTTPException
+from config import Config
+from app import app
+from services.groq_service import groq_service
+from services.neo4j_async_service import neo4j_async_service
+from utils.event_loop import bind_loop
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _build_environ(scope: dict, body: bytes) -> dict:
+    """Translates an ASGI HTTP scope and its request body into a WSGI environ."""
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.input_terminated': True,  # the whole body is buffered, so chunked uploads need no Content-Length
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for raw_name, raw_value in scope.get('headers', []):
+        name, value = raw_name.decode('latin-1').lower(), raw_value.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+class FlaskASGI:
+    """
+    Serves the Flask app over ASGI: `uvicorn asgi:application --workers 4` from the backend directory.
+
+    At startup the server's event loop becomes the worker's shared loop, so async views,
+    ingestion jobs, the Neo4j driver and the Groq clients live on one loop for the life of
+    the worker. Requests routed to an async view are dispatched on that loop itself: the
+    request context is pushed in the request's task, Flask's request hooks and error handlers
+    run as usual, and the view is awaited, so a request waiting on Neo4j or Groq holds no thread.
+    Streamed response bodies are iterated on the thread pool, since their generators may block.
+
+    Sync views, OPTIONS requests and unroutable URLs go through the regular WSGI path on a pool
+    of `max_threads` (ASGI_MAX_THREADS) threads. Request hooks must be sync functions: an async
+    hook would need the loop thread to block on itself.
+    """
+    def __init__(self, flask_app, max_threads: int = None):
+        self.flask_app = flask_app
+        self.executor = ThreadPoolExecutor(max_workers=max_threads or Config.ASGI_MAX_THREADS, thread_name_prefix="asgi-request")
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    bind_loop(asyncio.get_running_loop())
+                    # Neither call waits: the worker takes traffic at once and /readyz reports Neo4j.
+                    neo4j_async_service.warm_up()
+                    groq_service.warm_up()
+                except Exception as e:
+                    logger.exception(f"ASGI startup failed: {e}")
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                try:
+                    await neo4j_async_service.close()
+                finally:
+                    self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        environ = _build_environ(scope, bytes(body))
+        loop = asyncio.get_running_loop()
+        view = self._async_view(environ)
+        if view is None:
+            await loop.run_in_executor(self.executor, self._run_wsgi, environ, send, loop)
+            return
+        status, headers, body_iter, streamed = await self._dispatch_async(view, environ)
+        try:
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            if streamed:
+                chunks = iter(body_iter)
+                while (chunk := await loop.run_in_executor(self.executor, next, chunks, None)) is not None:
+                    if chunk:
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            else:
+                await send({'type': 'http.response.body', 'body': b''.join(body_iter), 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if hasattr(body_iter, 'close'):
+                body_iter.close()
+
+    def _async_view(self, environ: dict):
+        """The coroutine view function the request routes to, or None if it takes the WSGI path."""
+        if environ['REQUEST_METHOD'] == 'OPTIONS':
+            return None  # automatic OPTIONS responses and CORS preflights
+        try:
+            endpoint, _ = self.flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return None  # 404, 405 and redirects are rendered by Flask's own error handling
+        view = self.flask_app.view_functions.get(endpoint)
+        return view if inspect.iscoroutinefunction(view) else None
+
+    async def _dispatch_async(self, view, environ: dict):
+        """
+        Flask's full_dispatch_request with the view awaited on the running loop.
+        Returns the status, ASGI headers and body iterable of the response, and whether the body is streamed.
+        """
+        app = self.flask_app
+        ctx = app.request_context(environ)
+        error = None
+        try:
+            ctx.push()
+            try:
+                try:
+                    request_started.send(app, _async_wrapper=app.ensure_sync)
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        rv = await view(**request.view_args)
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                response = app.finalize_request(rv)
+            except Exception as e:
+                error = e
+                response = app.handle_exception(e)
+            body_iter, status, headers = response.get_wsgi_response(environ)
+            return (
+                int(status.split(' ', 1)[0]),
+                [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+                body_iter,
+                response.is_streamed,
+            )
+        finally:
+            ctx.pop(error)
+
+    def _run_wsgi(self, environ: dict, send, loop: asyncio.AbstractEventLoop):
+        """Runs one request through the WSGI app on a pool thread, sending each body chunk as it is produced."""
+        def send_sync(message: dict):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {}
+
+        def start_response(status: str, headers: list, exc_info=None):
+            if exc_info and response.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+            return lambda data: send_body(data)
+
+        def send_body(chunk: bytes, more_body: bool = True):
+            if not response.get('started'):
+                response['started'] = True
+                send_sync({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+            if chunk or not more_body:
+                send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+
+        iterable = self.flask_app(environ, start_response)
+        try:
+            for chunk in iterable:
+                send_body(chunk)
+            send_body(b'', more_body=False)
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+application = FlaskASGI(app)
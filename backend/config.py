@@ -8,13 +8,117 @@ class Config:
     NEO4J_URI = os.getenv('NEO4J_URI')
     NEO4J_USERNAME = os.getenv('NEO4J_USERNAME')
     NEO4J_PASSWORD = os.getenv('NEO4J_PASSWORD')
+    NEO4J_DATABASE = os.getenv('NEO4J_DATABASE')  # None selects the server's default database
+    NEO4J_MAX_POOL_SIZE = int(os.getenv('NEO4J_MAX_POOL_SIZE', '50'))
+    NEO4J_FETCH_SIZE = int(os.getenv('NEO4J_FETCH_SIZE', '1000'))
+    # Writes that fail with deadlocks, lock timeouts or concurrent MERGEs of the same key are retried with jittered backoff
+    NEO4J_WRITE_MAX_RETRIES = int(os.getenv('NEO4J_WRITE_MAX_RETRIES', '4'))
+    NEO4J_RETRY_BASE_DELAY = float(os.getenv('NEO4J_RETRY_BASE_DELAY', '0.2'))  # seconds, doubled per attempt
+    NEO4J_TX_RETRY_SECONDS = float(os.getenv('NEO4J_TX_RETRY_SECONDS', '15'))  # the driver's retry budget for reads; writes use the two settings above
+    NEO4J_READY_TIMEOUT_SECONDS = float(os.getenv('NEO4J_READY_TIMEOUT_SECONDS', '2'))  # connectivity check budget for /readyz
     GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+    GROQ_BASE_URL = os.getenv('GROQ_BASE_URL')  # None uses the public Groq API; set to point at a local stand-in
     HUGGINGFACE_TOKEN = os.getenv('HUGGINGFACE_TOKEN')
 
     # LLM Model choices for Groq
     LLM_MODEL_FAST = "llama3-8b-8192"  # Faster, smaller context
     LLM_MODEL_ACCURATE = "llama3-70b-8192" # More capable, larger context
 
+    # Groq rate limiting: shared scheduler limits (set these to the account's actual quota)
+    GROQ_REQUESTS_PER_MINUTE = int(os.getenv('GROQ_REQUESTS_PER_MINUTE', '30'))
+    GROQ_TOKENS_PER_MINUTE = int(os.getenv('GROQ_TOKENS_PER_MINUTE', '6000'))
+    GROQ_MAX_CONCURRENCY = int(os.getenv('GROQ_MAX_CONCURRENCY', '8'))
+    GROQ_MAX_RETRIES = int(os.getenv('GROQ_MAX_RETRIES', '3'))
+    LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv('LLM_EXPECTED_OUTPUT_TOKENS', '400'))
+    # invoke_llm_chain calls AsyncGroq directly unless disabled, skipping the LangChain layer
+    GROQ_USE_NATIVE_CLIENT = os.getenv('GROQ_USE_NATIVE_CLIENT', 'True').lower() in ('true', '1', 't')
+    GROQ_MAX_CONNECTIONS = int(os.getenv('GROQ_MAX_CONNECTIONS', '32'))  # pooled keep-alive connections per event loop
+    GROQ_KEEPALIVE_SECONDS = float(os.getenv('GROQ_KEEPALIVE_SECONDS', '60'))
+
+    # Graph write batching: posts per UNWIND transaction on the bulk write path
+    NEO4J_WRITE_BATCH_SIZE = int(os.getenv('NEO4J_WRITE_BATCH_SIZE', '100'))
+
+    # Extraction cache: in-memory LRU tier backed by a SQLite file
+    EXTRACTION_CACHE_ENABLED = os.getenv('EXTRACTION_CACHE_ENABLED', 'True').lower() in ('true', '1', 't')
+    EXTRACTION_CACHE_PATH = os.getenv('EXTRACTION_CACHE_PATH', os.path.join(os.path.dirname(__file__), 'data', 'extraction_cache.sqlite3'))
+    EXTRACTION_CACHE_MEMORY_ENTRIES = int(os.getenv('EXTRACTION_CACHE_MEMORY_ENTRIES', '2048'))
+    EXTRACTION_CACHE_DISK_ENTRIES = int(os.getenv('EXTRACTION_CACHE_DISK_ENTRIES', '200000'))
+    EXTRACTION_CACHE_TTL_SECONDS = int(os.getenv('EXTRACTION_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
+
+    # Near-duplicate detection: reuse an earlier post's extraction when SimHash similarity >= threshold
+    NEAR_DUP_ENABLED = os.getenv('NEAR_DUP_ENABLED', 'True').lower() in ('true', '1', 't')
+    NEAR_DUP_THRESHOLD = float(os.getenv('NEAR_DUP_THRESHOLD', '0.9'))  # must be above 0.75
+    NEAR_DUP_MIN_TOKENS = int(os.getenv('NEAR_DUP_MIN_TOKENS', '5'))
+    NEAR_DUP_INDEX_PATH = os.getenv('NEAR_DUP_INDEX_PATH', os.path.join(os.path.dirname(__file__), 'data', 'near_duplicates.sqlite3'))
+
+    # Batched extraction: several short posts per Groq request, bounded by an input token budget
+    EXTRACTION_BATCH_MAX_POSTS = int(os.getenv('EXTRACTION_BATCH_MAX_POSTS', '8'))
+    EXTRACTION_BATCH_TOKEN_BUDGET = int(os.getenv('EXTRACTION_BATCH_TOKEN_BUDGET', '2500'))
+
+    # Long texts: split into overlapping sentence-aligned chunks, extracted in parallel and merged
+    EXTRACTION_CHUNK_TOKENS = int(os.getenv('EXTRACTION_CHUNK_TOKENS', '1500'))
+    EXTRACTION_CHUNK_OVERLAP_TOKENS = int(os.getenv('EXTRACTION_CHUNK_OVERLAP_TOKENS', '100'))
+    EXTRACTION_MAX_CHUNKS = int(os.getenv('EXTRACTION_MAX_CHUNKS', '32'))  # later chunks of longer texts are dropped
+
+    # Background ingestion jobs: items per extract+write chunk, and where checkpoints are kept
+    INGEST_CHUNK_SIZE = int(os.getenv('INGEST_CHUNK_SIZE', '200'))
+    INGEST_STREAMING = os.getenv('INGEST_STREAMING', 'True').lower() in ('true', '1', 't')
+    INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', '2'))  # chunks buffered between pipeline stages
+    INGEST_PARALLEL_CHUNKS = int(os.getenv('INGEST_PARALLEL_CHUNKS', '2'))  # chunks being extracted at once
+    # A running job renews its checkpoint's lease every INGEST_HEARTBEAT_SECONDS; one not renewed for
+    # INGEST_LEASE_SECONDS is reported "interrupted" (its worker died) and resumes when resubmitted.
+    INGEST_HEARTBEAT_SECONDS = float(os.getenv('INGEST_HEARTBEAT_SECONDS', '30'))
+    INGEST_LEASE_SECONDS = float(os.getenv('INGEST_LEASE_SECONDS', '120'))
+    INGEST_CHECKPOINT_DIR = os.getenv('INGEST_CHECKPOINT_DIR', os.path.join(os.path.dirname(__file__), 'data', 'jobs'))
+
+    # Post graph retrieval bounds: subgraph size cap, default page size and links per page
+    POST_GRAPH_MAX_DEPTH = int(os.getenv('POST_GRAPH_MAX_DEPTH', '4'))
+    POST_GRAPH_MAX_NODES = int(os.getenv('POST_GRAPH_MAX_NODES', '5000'))
+    POST_GRAPH_PAGE_SIZE = int(os.getenv('POST_GRAPH_PAGE_SIZE', '500'))
+    POST_GRAPH_REL_LIMIT = int(os.getenv('POST_GRAPH_REL_LIMIT', '2000'))
+
+    # Read-through cache for /post-graph and /post-summary responses. Each worker process has its own cache
+    # and writes only evict entries in the process that made them, so with several workers (or an ingestion
+    # job in another process) a response can be stale for up to the TTL; lower it, or run one worker, if that matters.
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '2048'))
+    RESPONSE_CACHE_TTL_SECONDS = int(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '300'))
+
+    # Tiered extraction: local rules for short high-confidence posts, the "fast" model for medium
+    # posts, the "accurate" model for long or ambiguous ones. Mode is one of auto/local/fast/accurate.
+    EXTRACTION_TIER_MODE = os.getenv('EXTRACTION_TIER_MODE', 'auto')
+    EXTRACTION_LOCAL_MAX_CHARS = int(os.getenv('EXTRACTION_LOCAL_MAX_CHARS', '280'))
+    EXTRACTION_FAST_MAX_CHARS = int(os.getenv('EXTRACTION_FAST_MAX_CHARS', '1200'))
+    EXTRACTION_LOCAL_MIN_CONFIDENCE = float(os.getenv('EXTRACTION_LOCAL_MIN_CONFIDENCE', '0.75'))
+    EXTRACTION_GAZETTEER_LIMIT = int(os.getenv('EXTRACTION_GAZETTEER_LIMIT', '50000'))  # Entity names seeded from Neo4j
+
+    # Canonicalization of Entity/Keyword/Claim names before they are MERGEd, seeded from existing nodes
+    CANONICALIZATION_ENABLED = os.getenv('CANONICALIZATION_ENABLED', 'True').lower() in ('true', '1', 't')
+    CANONICAL_INDEX_SEED_LIMIT = int(os.getenv('CANONICAL_INDEX_SEED_LIMIT', '100000'))  # nodes read per label at seeding
+    CANONICAL_INDEX_MAX_ENTRIES = int(os.getenv('CANONICAL_INDEX_MAX_ENTRIES', '500000'))
+
+    # Incremental re-ingestion: posts whose content fingerprint is unchanged are skipped
+    SKIP_UNCHANGED_POSTS = os.getenv('SKIP_UNCHANGED_POSTS', 'True').lower() in ('true', '1', 't')
+
+    # Serving: async views, ingestion jobs and async clients share one event loop per worker
+    SHARED_EVENT_LOOP = os.getenv('SHARED_EVENT_LOOP', 'True').lower() in ('true', '1', 't')
+    # Threads per ASGI worker for sync views and streamed response bodies; async views run on the loop without one
+    ASGI_MAX_THREADS = int(os.getenv('ASGI_MAX_THREADS', '64'))
+
+    # Claim spread analytics: /claims/top page size cap, and page size of `manage.py rebuild-spread`
+    CLAIMS_TOP_MAX_LIMIT = int(os.getenv('CLAIMS_TOP_MAX_LIMIT', '100'))
+    SPREAD_REBUILD_PAGE_SIZE = int(os.getenv('SPREAD_REBUILD_PAGE_SIZE', '500'))
+
+    # Local claim similarity index (hashing vectorizer, memory-mapped vectors) behind /claims/similar
+    CLAIM_INDEX_ENABLED = os.getenv('CLAIM_INDEX_ENABLED', 'True').lower() in ('true', '1', 't')
+    CLAIM_INDEX_DIR = os.getenv('CLAIM_INDEX_DIR', os.path.join(os.path.dirname(__file__), 'data', 'claim_index'))
+    CLAIM_INDEX_DIM = int(os.getenv('CLAIM_INDEX_DIM', '1024'))  # 4 KB per claim on disk
+    CLAIM_SIMILAR_MAX_K = int(os.getenv('CLAIM_SIMILAR_MAX_K', '50'))
+    CLAIM_SIMILAR_MAX_QUERIES = int(os.getenv('CLAIM_SIMILAR_MAX_QUERIES', '100'))
+
+    # Offline CSV export for bulk import (`manage.py export-csv`): output directory and rows per shard file
+    EXPORT_DIR = os.getenv('EXPORT_DIR', os.path.join(os.path.dirname(__file__), 'data', 'export'))
+    EXPORT_SHARD_ROWS = int(os.getenv('EXPORT_SHARD_ROWS', '1000000'))
+
     # Other configurations
     DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() in ('true', '1', 't')
     SECRET_KEY = os.getenv('SECRET_KEY', 'super-secret-key-replace-me')
\ No newline at end of file
@@ -0,0 +1,81 @@
+# backend/manage.py
+import argparse
+import asyncio
+import logging
+import sys
+from agents.claim_analytics import claim_analytics
+from agents.csv_export import CsvGraphExport, export_dataset
+from services.neo4j_async_service import neo4j_async_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def init_schema():
+    try:
+        await neo4j_async_service.init_schema()
+    finally:
+        await neo4j_async_service.close()
+
+async def rebuild_spread(page_size: int = None):
+    try:
+        counts = await claim_analytics.rebuild(page_size)
+        logger.info(f"Rebuilt spread aggregates: {counts}")
+    finally:
+        await neo4j_async_service.close()
+
+async def index_claims(page_size: int = None):
+    try:
+        added = await claim_analytics.index_claims(page_size)
+        logger.info(f"Added {added} claims to the similarity index.")
+    finally:
+        await neo4j_async_service.close()
+
+async def export_csv(dataset_name: str, config_name: str, split: str, limit: int, directory: str, tier: str):
+    summary = await export_dataset(dataset_name, config_name, split, limit, directory, {"mode": tier} if tier else None)
+    logger.info(f"Export finished: {summary}")
+
+def merge_csv(sources: list[str], directory: str):
+    export = CsvGraphExport(directory)
+    for source in sources:
+        logger.info(f"Merged {source}: {export.merge_from(source)}")
+    logger.info(f"Import with: {export.import_command()}")
+
+def main(argv=None) -> int:
+    """Management commands, run from the backend directory: `python manage.py <command>`."""
+    parser = argparse.ArgumentParser(prog="manage.py", description="GraphRAG backend management commands.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("init-schema", help="Create the Neo4j constraints and indexes in one transaction (idempotent).")
+    rebuild = commands.add_parser("rebuild-spread", help="Recompute the claim and entity spread aggregates from the graph (idempotent).")
+    rebuild.add_argument("--page-size", type=int, default=None, help="Claims or entities per transaction.")
+    index = commands.add_parser("index-claims", help="Add every stored claim to the local similarity index (idempotent).")
+    index.add_argument("--page-size", type=int, default=None, help="Claims read per query.")
+    export = commands.add_parser("export-csv", help="Extract a Hugging Face dataset into CSV shards for neo4j-admin import (resumable, no Neo4j needed).")
+    export.add_argument("--dataset", required=True, help="Hugging Face dataset name.")
+    export.add_argument("--config", default=None, help="Dataset configuration name.")
+    export.add_argument("--split", default="train", help="Dataset split.")
+    export.add_argument("--limit", type=int, default=None, help="Maximum number of rows.")
+    export.add_argument("--out", default=None, help="Export directory; runs accumulate in it (default: EXPORT_DIR).")
+    export.add_argument("--tier", choices=["auto", "local", "fast", "accurate"], default=None, help="Extraction tier mode.")
+    merge = commands.add_parser("merge-csv", help="Merge export directories into one, dropping duplicate nodes and posts.")
+    merge.add_argument("sources", nargs="+", help="Export directories to merge.")
+    merge.add_argument("--out", required=True, help="Destination export directory.")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "init-schema":
+            asyncio.run(init_schema())
+        elif args.command == "rebuild-spread":
+            asyncio.run(rebuild_spread(args.page_size))
+        elif args.command == "index-claims":
+            asyncio.run(index_claims(args.page_size))
+        elif args.command == "export-csv":
+            asyncio.run(export_csv(args.dataset, args.config, args.split, args.limit, args.out, args.tier))
+        elif args.command == "merge-csv":
+            merge_csv(args.sources, args.out)
+    except Exception as e:
+        logger.error(f"{args.command} failed: {e}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,19 @@
 # backend/models/graph_models.py
-from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, HttpUrl, field_validator
+from typing import Optional, List, Dict, Any, Literal
+from config import Config
+import re
+
+class ExtractionPolicy(BaseModel):
+    """
+    Chooses which extraction tier handles each post. In "auto" mode short posts the local
+    extractor is confident about skip the LLM, medium posts use the fast model and the rest
+    use the accurate model; the other modes force a single tier.
+    """
+    mode: Literal["auto", "local", "fast", "accurate"] = Field(Config.EXTRACTION_TIER_MODE, description="Tier selection mode.")
+    local_max_chars: int = Field(Config.EXTRACTION_LOCAL_MAX_CHARS, ge=0, description="Longest text the local extractor may handle in auto mode.")
+    fast_max_chars: int = Field(Config.EXTRACTION_FAST_MAX_CHARS, ge=0, description="Longest text sent to the fast model in auto mode.")
+    min_local_confidence: float = Field(Config.EXTRACTION_LOCAL_MIN_CONFIDENCE, ge=0, le=1, description="Local results below this confidence are escalated.")
 
 class PostData(BaseModel):
     """
@@ -13,6 +26,7 @@ class PostData(BaseModel):
     url: Optional[HttpUrl] = Field(None, description="Original URL of the post/article.")
     # For dataset integration, a 'label' might be present
     label: Optional[str] = Field(None, description="Pre-existing fact-check label (e.g., 'True', 'Fake').")
+    extraction_policy: Optional[ExtractionPolicy] = Field(None, description="Overrides the default extraction tier policy for this post.")
     
     # You can add more fields here relevant to your specific social media inputs
     # e.g., 'platform': Optional[str], 'likes': Optional[int], 'shares': Optional[int]
@@ -24,6 +38,9 @@ class DatasetLoadRequest(BaseModel):
     dataset_name: str = Field(..., description="Name of the Hugging Face dataset (e.g., 'liar_dataset').")
     config_name: Optional[str] = Field(None, description="Specific configuration name for the dataset (if applicable).")
     split: str = Field("train", description="Dataset split to load (e.g., 'train', 'validation', 'test').")
+    limit: Optional[int] = Field(None, ge=1, description="Only ingest the first N items of the split. Ingests the full split if omitted.")
+    restart: bool = Field(False, description="Ignore any existing checkpoint for this dataset/split and start from the first item.")
+    extraction_policy: Optional[ExtractionPolicy] = Field(None, description="Overrides the default extraction tier policy for this job.")
 
 class FactCheckVerdictData(BaseModel):
     """
@@ -34,6 +51,46 @@ class FactCheckVerdictData(BaseModel):
     source: Optional[str] = Field("Manual Update", description="The source of the fact-check verdict.")
     # Potentially add more details like 'confidence_score', 'evidence_url'
 
+class PostGraphQuery(BaseModel):
+    """
+    Query parameters bounding a single post's subgraph retrieval.
+    """
+    depth: int = Field(2, ge=1, le=Config.POST_GRAPH_MAX_DEPTH, description="Maximum traversal depth from the post.")
+    limit: Optional[int] = Field(None, ge=1, le=Config.POST_GRAPH_MAX_NODES, description="Maximum nodes per page.")
+    rel_limit: Optional[int] = Field(None, ge=1, description="Maximum relationships per page.")
+    cursor: Optional[str] = Field(None, description="Opaque cursor from a previous page's 'next_cursor'.")
+    rel_types: Optional[List[str]] = Field(None, description="Only traverse and return these relationship types.")
+
+    @field_validator('rel_types')
+    @classmethod
+    def _check_rel_types(cls, rel_types):
+        # Relationship types are inlined into Cypher on the non-APOC path, so only plain identifiers are accepted.
+        for rel_type in rel_types or []:
+            if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', rel_type):
+                raise ValueError(f"Invalid relationship type: {rel_type}")
+        return rel_types
+
+class PostGraphsRequest(BaseModel):
+    """
+    Model for fetching the merged subgraphs of several posts at once.
+    """
+    post_ids: List[str] = Field(..., min_length=1, max_length=200, description="IDs of the posts whose subgraphs should be returned.")
+
+class TopClaimsQuery(BaseModel):
+    """
+    Query parameters for the most widespread claims.
+    """
+    sort: Literal["posts", "authors", "recent"] = Field("posts", description="Rank by post count, distinct authors, or last seen time.")
+    limit: int = Field(20, ge=1, le=Config.CLAIMS_TOP_MAX_LIMIT, description="Number of claims to return.")
+
+class SimilarClaimsRequest(BaseModel):
+    """
+    Model for looking up the stored claims most similar to one or more claims.
+    """
+    claims: List[str] = Field(..., min_length=1, max_length=Config.CLAIM_SIMILAR_MAX_QUERIES, description="Claim texts to search for.")
+    k: int = Field(5, ge=1, le=Config.CLAIM_SIMILAR_MAX_K, description="Matches to return per claim.")
+    min_score: float = Field(0.0, ge=-1, le=1, description="Minimum cosine similarity of a match.")
+
 # Example for graph visualization response structure
 # (though the agent returns nodes/links directly, this is good for documentation)
 class GraphNode(BaseModel):
@@ -0,0 +1,143 @@
+# backend/services/canonical_index.py
+import logging
+import re
+import threading
+import unicodedata
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A decimal point or comma between digits is part of the number; "9.5%" and "95%" are different claims.
+_PUNCTUATION_RE = re.compile(r"(?P<numeric>(?<=\d)[.,](?=\d))|[^\w\s]", re.UNICODE)
+_NUMERIC_SYMBOLS = frozenset("%‰°+")  # kept, with currency symbols, so quantities keep their unit
+_WHITESPACE_RE = re.compile(r"\s+")
+_ACRONYM_STOPWORDS = frozenset({"of", "the", "and", "for", "on", "in", "at", "to", "de", "la", "del", "des", "du", "&"})
+_KINDS = ("Entity", "Keyword", "Claim")
+
+def _fold_punctuation(match) -> str:
+    char = match.group()
+    if match.group('numeric') or char in _NUMERIC_SYMBOLS or unicodedata.category(char) == 'Sc':
+        return char
+    return "" if char == "." else " "
+
+def normalize_key(text: str) -> str:
+    """
+    Unicode-normalized, case-folded form used to compare names ("W.H.O." -> "who"). Punctuation
+    is dropped, except decimal separators between digits and %, currency and similar unit symbols.
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = text.replace("'", "").replace("’", "")  # "Gates's" and "Gates’s" fold to the same key
+    text = _PUNCTUATION_RE.sub(_fold_punctuation, text)
+    key = _WHITESPACE_RE.sub(" ", text).strip()
+    return key[4:] if key.startswith("the ") and len(key) > 4 else key
+
+def _looks_like_acronym(name: str) -> bool:
+    letters = [c for c in unicodedata.normalize('NFKC', name) if c.isalpha()]
+    return 2 <= len(letters) <= 8 and all(c.isupper() for c in letters) and " " not in name.strip()
+
+def _acronym_of(key: str):
+    words = [word for word in key.split() if word not in _ACRONYM_STOPWORDS]
+    return "".join(word[0] for word in words) if len(words) >= 2 else None
+
+class CanonicalIndex:
+    """
+    In-process map from normalized names to the canonical string written to Neo4j, per label.
+    Variants that differ only in case, punctuation, Unicode form or a leading "the" resolve to
+    the first-seen form, and for entities an acronym resolves to its expansion (or vice versa).
+    Seeded from existing nodes on first use and extended as new names are resolved.
+    """
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or Config.CANONICAL_INDEX_MAX_ENTRIES
+        self._canonical = {kind: {} for kind in _KINDS}  # kind -> normalized key -> canonical name
+        self._acronyms = {}  # acronym key -> canonical entity name it expands to
+        self._ambiguous_acronyms = set()
+        self._lock = threading.Lock()
+        self.seeded = False
+        self.resolved = 0
+        self.merged = 0
+
+    def _size(self) -> int:
+        return sum(len(names) for names in self._canonical.values())
+
+    def _register_entity(self, key: str, name: str) -> str:
+        """Adds a new entity name under `key`, linking it with an existing acronym form if there is one."""
+        names = self._canonical["Entity"]
+        acronym = _acronym_of(key)
+        if acronym and acronym not in self._ambiguous_acronyms:
+            expansion = self._acronyms.get(acronym)
+            if expansion is None and acronym in names and _looks_like_acronym(names[acronym]):
+                # "WHO" was seen first: "World Health Organization" joins it.
+                self._acronyms[acronym] = names[key] = names[acronym]
+                return names[acronym]
+            if expansion is not None and normalize_key(expansion) != key:
+                # Two different expansions share this acronym, so it can no longer be trusted.
+                self._ambiguous_acronyms.add(acronym)
+                self._acronyms.pop(acronym, None)
+            elif expansion is None:
+                self._acronyms[acronym] = name
+        names[key] = name
+        return name
+
+    def _resolve_locked(self, kind: str, name: str) -> str:
+        key = normalize_key(name)
+        if not key:
+            return name.strip()
+        names = self._canonical[kind]
+        canonical = names.get(key)
+        if canonical is None and kind == "Entity" and _looks_like_acronym(name):
+            canonical = self._acronyms.get(key)
+        if canonical is not None:
+            if canonical != name:
+                self.merged += 1
+            return canonical
+        if self._size() >= self.max_entries:
+            return name.strip()
+        if kind == "Entity":
+            canonical = self._register_entity(key, name.strip())
+            if canonical != name.strip():
+                self.merged += 1
+            return canonical
+        names[key] = name.strip()
+        return names[key]
+
+    def resolve(self, kind: str, name: str) -> str:
+        """Returns the canonical form of `name` for the given label, registering it if it is new."""
+        with self._lock:
+            self.resolved += 1
+            return self._resolve_locked(kind, name)
+
+    def resolve_many(self, kind: str, names: list) -> list:
+        """Resolves a list of names, dropping blanks and duplicates that collapse onto the same canonical form."""
+        resolved = []
+        with self._lock:
+            for name in names:
+                if not isinstance(name, str) or not name.strip():
+                    continue
+                self.resolved += 1
+                canonical = self._resolve_locked(kind, name)
+                if canonical not in resolved:
+                    resolved.append(canonical)
+        return resolved
+
+    def seed(self, kind: str, names):
+        """Registers existing node names; existing canonical forms win over later variants."""
+        with self._lock:
+            merged = self.merged
+            for name in names:
+                if isinstance(name, str) and name.strip():
+                    self._resolve_locked(kind, name)
+            self.merged = merged  # only variants seen in new writes count as merged
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "seeded": self.seeded,
+                "entries": {kind: len(names) for kind, names in self._canonical.items()},
+                "acronyms": len(self._acronyms),
+                "resolved": self.resolved,
+                "merged_variants": self.merged,
+            }
+
+# Global instance
+canonical_index = CanonicalIndex()
@@ -0,0 +1,188 @@
+# backend/services/claim_index.py
+import contextlib
+import json
+import logging
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+import numpy as np
+from config import Config
+from services.canonical_index import normalize_key
+from utils.helpers import claim_id
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; there the index is only safe with a single worker process
+    fcntl = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Function words carry no signal about what a claim is about; negations are kept on purpose,
+# so "X is safe" and "X is not safe" still find each other.
+_STOPWORDS = frozenset("a an the and or of to in on at for by with from as is are was were be been it its this that".split())
+_CHAR_NGRAM = 3
+_CHAR_NGRAM_WEIGHT = 0.5  # relative to word features; lets "vaccine" and "vaccines" overlap
+_SEARCH_BLOCK_ROWS = 65536  # rows scored per matrix product, bounding the score buffer
+
+def _hash_feature(feature: str, dim: int):
+    h = zlib.crc32(feature.encode('utf-8'))
+    return h % dim, (1.0 if h & 0x80000000 else -1.0)
+
+def embed(text: str, dim: int) -> np.ndarray:
+    """
+    Hashing-vectorizer embedding: word unigrams and bigrams plus in-word character trigrams,
+    hashed into `dim` signed buckets with crc32, sublinear term frequency, L2-normalized.
+    Needs no vocabulary or model, so any process embeds a text to the same vector.
+    """
+    words = [word for word in normalize_key(text).split() if word not in _STOPWORDS]
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    grams = Counter(f"#{word}#"[i:i + _CHAR_NGRAM] for word in words for i in range(len(word) + 3 - _CHAR_NGRAM))
+    vector = np.zeros(dim, dtype=np.float32)
+    for counts, weight in ((features, 1.0), (grams, _CHAR_NGRAM_WEIGHT)):
+        for feature, count in counts.items():
+            index, sign = _hash_feature(feature, dim)
+            vector[index] += sign * weight * (1.0 + math.log(count))
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+class ClaimVectorIndex:
+    """
+    Local similarity index over claim texts, for "which stored claims resemble this one"
+    without an LLM call. Vectors are rows of a float32 matrix in a memory-mapped file that
+    grows in place (capacity doubles), with the claim texts in a line-aligned JSONL sidecar.
+    Rows are only appended, so a search scores a snapshot of the first `count` rows with one
+    matrix product per block; vectors are unit length, so the dot product is the cosine.
+
+    Several worker processes share the files: every access holds an exclusive lock file and
+    first catches up with the rows other processes appended, so row numbers never collide.
+    """
+    def __init__(self, directory: str = None, dim: int = None):
+        self.directory = directory or Config.CLAIM_INDEX_DIR
+        self.dim = dim or Config.CLAIM_INDEX_DIM
+        self._vectors_path = os.path.join(self.directory, f"claim_vectors_{self.dim}.f32")
+        self._texts_path = os.path.join(self.directory, f"claim_texts_{self.dim}.jsonl")
+        self._lock_path = os.path.join(self.directory, f"claim_index_{self.dim}.lock")
+        self._lock = threading.Lock()
+        self._matrix = None  # np.memmap of shape (capacity, dim)
+        self._texts = []  # row -> (claim text, claim id)
+        self._rows = {}  # claim text -> row
+        self._texts_offset = 0  # bytes of the texts file already read
+        self._loaded = False
+        self.searches = 0
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive access to the index files, across threads and worker processes."""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._lock_path, 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file_rows(self) -> int:
+        return os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+
+    def _sync(self):
+        """Reads the texts appended since the last call (by any process) and maps new capacity. Needs the file lock."""
+        if os.path.exists(self._texts_path):
+            with open(self._texts_path, 'rb') as f:
+                f.seek(self._texts_offset)
+                for line in f:
+                    self._texts_offset += len(line)
+                    entry = json.loads(line)
+                    self._rows.setdefault(entry['text'], len(self._texts))
+                    self._texts.append((entry['text'], entry['id']))
+        capacity = self._file_rows()
+        if not self._loaded and capacity < len(self._texts):
+            # Texts are appended only after their vectors are flushed; a shorter matrix means a damaged file.
+            logger.warning(f"Claim vector file holds {capacity} rows for {len(self._texts)} texts; keeping the first {capacity}.")
+            self._texts = self._texts[:capacity]
+            self._rows = {text: row for row, (text, _) in enumerate(self._texts)}
+            with open(self._texts_path, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps({"text": text, "id": cid}) + "\n" for text, cid in self._texts)
+            self._texts_offset = os.path.getsize(self._texts_path)
+        if self._matrix is None or capacity > self._matrix.shape[0]:
+            self._map(max(capacity, 1024))
+        if not self._loaded:
+            self._loaded = True
+            logger.info(f"Claim vector index loaded with {len(self._texts)} claims ({self.dim} dims).")
+
+    def _map(self, capacity: int):
+        if self._matrix is not None:
+            self._matrix.flush()
+        # Never shrink: another process may already have grown the file further.
+        capacity = max(capacity, self._file_rows())
+        with open(self._vectors_path, 'ab') as f:
+            f.truncate(capacity * 4 * self.dim)
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+
+    def add(self, texts) -> int:
+        """Embeds and appends the claims not indexed yet. Returns how many were added."""
+        with self._file_lock():
+            self._sync()
+            new = [text for text in dict.fromkeys(texts) if isinstance(text, str) and text.strip() and text not in self._rows]
+            if not new:
+                return 0
+            start = len(self._texts)
+            if start + len(new) > self._matrix.shape[0]:
+                self._map(max(self._matrix.shape[0] * 2, start + len(new)))
+            self._matrix[start:start + len(new)] = np.stack([embed(text, self.dim) for text in new])
+            self._matrix.flush()
+            with open(self._texts_path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps({"text": text, "id": claim_id(text)}) + "\n" for text in new)
+            self._texts_offset = os.path.getsize(self._texts_path)
+            for text in new:
+                self._rows[text] = len(self._texts)
+                self._texts.append((text, claim_id(text)))
+            return len(new)
+
+    def search(self, queries: list[str], k: int = 5, min_score: float = 0.0) -> list[list[dict]]:
+        """
+        Batched top-k cosine search. Returns, per query, up to `k` matches with score >=
+        `min_score`, best first. A query identical to a stored claim matches it with score 1.0.
+        """
+        with self._file_lock():
+            self._sync()
+            matrix, texts, count = self._matrix, self._texts, len(self._texts)
+            self.searches += len(queries)
+        if not queries:
+            return []
+        k = min(k, count)
+        if k <= 0:
+            return [[] for _ in queries]
+        query_matrix = np.stack([embed(query, self.dim) for query in queries])
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, count, _SEARCH_BLOCK_ROWS):
+            block = np.asarray(matrix[start:min(start + _SEARCH_BLOCK_ROWS, count)])
+            scores = np.concatenate([best_scores, query_matrix @ block.T], axis=1)
+            rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, start + block.shape[0]), (len(queries), block.shape[0]))], axis=1)
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores, rows = np.take_along_axis(scores, top, axis=1), np.take_along_axis(rows, top, axis=1)
+            best_scores, best_rows = scores, rows
+        results = []
+        for query_scores, query_rows in zip(best_scores, best_rows):
+            order = np.argsort(-query_scores, kind='stable')
+            results.append([
+                {"claimId": texts[row][1], "text": texts[row][0], "score": round(float(score), 4)}
+                for score, row in zip(query_scores[order], query_rows[order]) if score >= min_score
+            ])
+        return results
+
+    def stats(self) -> dict:
+        with self._file_lock():
+            self._sync()
+            return {"indexed_claims": len(self._texts), "dim": self.dim, "searches": self.searches}
+
+# Global instance
+claim_vector_index = ClaimVectorIndex()
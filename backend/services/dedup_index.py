@@ -0,0 +1,195 @@
+# backend/services/dedup_index.py
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_TAG_RE = re.compile(r'[#@]\w+')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+
+def _to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+class NearDuplicateIndex:
+    """
+    SimHash index over normalized post text, used to reuse an earlier post's extraction
+    for reposts that differ only in whitespace, URLs, hashtags or mentions.
+
+    Candidates are found with banded lookups: with `max_distance + 1` bands, any two
+    fingerprints within `max_distance` differing bits share at least one identical band.
+    Bands need at least 4 bits to stay selective, so `max_distance` must be below 16
+    (a threshold above 0.75); lower thresholds are rejected.
+    Fingerprints and extractions persist in SQLite; the band tables are rebuilt in memory
+    on first use.
+    """
+    def __init__(self, path: str = None, threshold: float = None, min_tokens: int = None):
+        self.path = path or Config.NEAR_DUP_INDEX_PATH
+        self.threshold = threshold if threshold is not None else Config.NEAR_DUP_THRESHOLD
+        self.min_tokens = min_tokens if min_tokens is not None else Config.NEAR_DUP_MIN_TOKENS
+        self.max_distance = int((1.0 - self.threshold) * 64)
+        if not 0 <= self.max_distance < 16:
+            raise ValueError(f"Near-duplicate threshold must be above 0.75 and at most 1.0, got {self.threshold}.")
+        self.bands = self.max_distance + 1
+        self._band_bits = 64 // self.bands
+        self._band_mask = (1 << self._band_bits) - 1
+        self._lock = threading.Lock()
+        self._conn = None
+        self._fingerprints = {}  # post_id -> simhash
+        self._buckets = {}  # (band, band_value) -> [post_id, ...]
+        self.lookups = 0
+        self.matches = 0
+        self.extractions_reused = 0  # posts, not LLM calls: one batched call extracts several posts
+
+    @staticmethod
+    def normalize(text: str) -> list[str]:
+        text = _URL_RE.sub(' ', text.lower())
+        text = _TAG_RE.sub(' ', text)
+        return _NON_WORD_RE.sub(' ', text).split()
+
+    @staticmethod
+    def simhash(tokens: list[str]) -> int:
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        weights = [0] * 64
+        for feature in features:
+            h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+            for bit in range(64):
+                weights[bit] += 1 if (h >> bit) & 1 else -1
+        return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+    def _band_keys(self, fingerprint: int):
+        return [(band, (fingerprint >> (band * self._band_bits)) & self._band_mask) for band in range(self.bands)]
+
+    def _index(self, post_id: str, fingerprint: int):
+        self._fingerprints[post_id] = fingerprint
+        for key in self._band_keys(fingerprint):
+            self._buckets.setdefault(key, []).append(post_id)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS fingerprints (post_id TEXT PRIMARY KEY, simhash INTEGER NOT NULL, extraction TEXT NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._conn.commit()
+            for post_id, fingerprint in self._conn.execute("SELECT post_id, simhash FROM fingerprints"):
+                self._index(post_id, _to_unsigned(fingerprint))
+            # 'llm_calls_avoided' is the counter's earlier name; it always counted posts.
+            row = (self._conn.execute("SELECT value FROM meta WHERE key = 'extractions_reused'").fetchone()
+                   or self._conn.execute("SELECT value FROM meta WHERE key = 'llm_calls_avoided'").fetchone())
+            self.extractions_reused = row[0] if row else 0
+            logger.info(f"Near-duplicate index loaded with {len(self._fingerprints)} fingerprints.")
+        return self._conn
+
+    def fingerprint(self, text: str):
+        """Returns the SimHash of the normalized text, or None if it is too short to compare reliably."""
+        tokens = self.normalize(text)
+        return self.simhash(tokens) if len(tokens) >= self.min_tokens else None
+
+    def find(self, text: str, exclude_post_id: str = None):
+        """
+        Returns (post_id, similarity, extraction) for the most similar indexed post at or
+        above the threshold, or None.
+        """
+        fingerprint = self.fingerprint(text)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            conn = self._get_conn()
+            self.lookups += 1
+            best_id, best_distance = None, self.max_distance + 1
+            for key in self._band_keys(fingerprint):
+                for candidate in self._buckets.get(key, ()):
+                    if candidate == exclude_post_id:
+                        continue
+                    distance = bin(fingerprint ^ self._fingerprints[candidate]).count('1')
+                    if distance < best_distance:
+                        best_id, best_distance = candidate, distance
+            if best_id is None:
+                return None
+            row = conn.execute("SELECT extraction FROM fingerprints WHERE post_id = ?", (best_id,)).fetchone()
+            if not row:
+                return None
+            self.matches += 1
+            return best_id, round(1.0 - best_distance / 64, 4), json.loads(row[0])
+
+    def add(self, post_id: str, text: str, extraction: dict):
+        fingerprint = self.fingerprint(text)
+        if fingerprint is None:
+            return
+        with self._lock:
+            conn = self._get_conn()
+            previous = self._fingerprints.get(post_id)
+            if previous is not None:
+                if previous == fingerprint:
+                    return
+                for key in self._band_keys(previous):
+                    self._buckets[key].remove(post_id)
+            self._index(post_id, fingerprint)
+            conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (post_id, simhash, extraction) VALUES (?, ?, ?)",
+                (post_id, _to_signed(fingerprint), json.dumps(extraction)),
+            )
+            conn.commit()
+
+    def group(self, texts: list[str]) -> dict:
+        """
+        Near-duplicates within one batch, which the index cannot match because none of them is
+        extracted yet. Maps the position of each text to (position of the earlier text it nearly
+        matches, similarity). Only texts that are not duplicates themselves are matched against,
+        so each group has exactly one text to extract.
+        """
+        fingerprints, buckets, groups = {}, {}, {}
+        for i, text in enumerate(texts):
+            fingerprint = self.fingerprint(text)
+            if fingerprint is None:
+                continue
+            band_keys = self._band_keys(fingerprint)
+            best, best_distance = None, self.max_distance + 1
+            for key in band_keys:
+                for candidate in buckets.get(key, ()):
+                    distance = bin(fingerprint ^ fingerprints[candidate]).count('1')
+                    if distance < best_distance:
+                        best, best_distance = candidate, distance
+            if best is not None:
+                groups[i] = (best, round(1.0 - best_distance / 64, 4))
+                continue
+            fingerprints[i] = fingerprint
+            for key in band_keys:
+                buckets.setdefault(key, []).append(i)
+        return groups
+
+    def record_reused(self, count: int = 1):
+        """Counts posts that took a near-duplicate's extraction instead of being extracted."""
+        with self._lock:
+            conn = self._get_conn()
+            self.extractions_reused += count
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('extractions_reused', ?)", (self.extractions_reused,))
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._get_conn()
+            return {
+                "indexed_posts": len(self._fingerprints),
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "matches": self.matches,
+                "extractions_reused": self.extractions_reused,
+            }
+
+# Global instance
+near_duplicate_index = NearDuplicateIndex()
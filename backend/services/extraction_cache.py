@@ -0,0 +1,137 @@
+# backend/services/extraction_cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from config import Config
+from utils.lru_cache import LRUCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ExtractionCache:
+    """
+    Content-addressed cache for LLM extraction results.
+    Entries are keyed by a hash of (model, prompt, cleaned text) and live in an
+    in-memory LRU tier backed by a SQLite file, so repeat ingestions skip Groq.
+    """
+    _PRUNE_EVERY_N_WRITES = 256
+
+    def __init__(self, path: str = None, memory_entries: int = None, disk_entries: int = None, ttl_seconds: int = None):
+        self.path = path or Config.EXTRACTION_CACHE_PATH
+        self.disk_entries = disk_entries or Config.EXTRACTION_CACHE_DISK_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.EXTRACTION_CACHE_TTL_SECONDS
+        self._memory = LRUCache(memory_entries or Config.EXTRACTION_CACHE_MEMORY_ENTRIES, self.ttl_seconds)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, prompt: str, model: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, prompt, text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_extraction_cache_accessed ON extraction_cache (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str):
+        value = self._memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                row = conn.execute("SELECT value, created_at FROM extraction_cache WHERE key = ?", (key,)).fetchone()
+                if row and self.ttl_seconds and row[1] + self.ttl_seconds < time.time():
+                    conn.execute("DELETE FROM extraction_cache WHERE key = ?", (key,))
+                    conn.commit()
+                    row = None
+                if row:
+                    conn.execute("UPDATE extraction_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                    conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache read failed, treating as miss: {e}")
+            row = None
+        if not row:
+            self.misses += 1
+            return None
+        value = json.loads(row[0])
+        self._memory.set(key, value)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: dict):
+        self._memory.set(key, value)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                conn.execute(
+                    "INSERT OR REPLACE INTO extraction_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now),
+                )
+                conn.commit()
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= self._PRUNE_EVERY_N_WRITES:
+                    self._writes_since_prune = 0
+                    self._prune(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache write failed: {e}")
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        """Drops expired rows, then the least recently used rows beyond the disk size limit."""
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM extraction_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        conn.execute(
+            "DELETE FROM extraction_cache WHERE key IN ("
+            " SELECT key FROM extraction_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_entries,),
+        )
+        conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        disk_entries = None
+        try:
+            with self._lock:
+                disk_entries = self._get_conn().execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+        except sqlite3.Error:
+            pass
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory": self._memory.stats(),
+            "disk_entries": disk_entries,
+            "disk_max_entries": self.disk_entries,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# Global instance
+extraction_cache = ExtractionCache()
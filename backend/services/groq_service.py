@@ -1,87 +1,230 @@
 # backend/services/groq_service.py
-from groq import Groq
 from config import Config
+import asyncio
 import logging
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+import threading
+import weakref
+from typing import TYPE_CHECKING
+from services.llm_scheduler import LLMScheduler
+from utils.helpers import estimate_tokens
+from utils.metrics import registry, LLM_REQUEST_SECONDS, LLM_TOKENS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    from groq import Groq, AsyncGroq
+    from langchain_groq import ChatGroq
+
+CHAIN_CACHE_SIZE = 64
+
 class GroqService:
+    """
+    Groq access through the shared LLM scheduler. The SDK clients are built on first use:
+    importing `groq` and LangChain and constructing the clients dominated worker boot time.
+    """
     _instance = None
-    _client: Groq = None
-    _llm_fast: ChatGroq = None
-    _llm_accurate: ChatGroq = None
+    _client: "Groq" = None
+    _llm_fast: "ChatGroq" = None
+    _llm_accurate: "ChatGroq" = None
+    _initialized = False
+
+    _scheduler: LLMScheduler = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(GroqService, cls).__new__(cls)
-            cls._instance._init_client()
+            cls._instance._init_lock = threading.Lock()
+            cls._instance._chains = {}  # (system prompt, model type) -> prompt | llm chain
+            cls._instance._async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncGroq
+            cls._instance._scheduler = LLMScheduler(
+                requests_per_minute=Config.GROQ_REQUESTS_PER_MINUTE,
+                tokens_per_minute=Config.GROQ_TOKENS_PER_MINUTE,
+                max_concurrency=Config.GROQ_MAX_CONCURRENCY,
+                max_retries=Config.GROQ_MAX_RETRIES,
+            )
         return cls._instance
 
     def _init_client(self):
-        if Config.GROQ_API_KEY:
-            self._client = Groq(api_key=Config.GROQ_API_KEY)
-            self._llm_fast = ChatGroq(temperature=0, groq_api_key=Config.GROQ_API_KEY, model_name=Config.LLM_MODEL_FAST)
-            self._llm_accurate = ChatGroq(temperature=0, groq_api_key=Config.GROQ_API_KEY, model_name=Config.LLM_MODEL_ACCURATE)
+        with self._init_lock:
+            if self._initialized:
+                return
+            if not Config.GROQ_API_KEY:
+                logger.error("GROQ_API_KEY is not set in config. Groq service will not be available.")
+                self._initialized = True
+                return
+            from groq import Groq
+            from langchain_groq import ChatGroq
+            self._client = Groq(api_key=Config.GROQ_API_KEY, base_url=Config.GROQ_BASE_URL)
+            # Retries are owned by the scheduler so 429s are seen (and their retry-after honored) in one place.
+            self._llm_fast = ChatGroq(temperature=0, groq_api_key=Config.GROQ_API_KEY, groq_api_base=Config.GROQ_BASE_URL,
+                                      model_name=Config.LLM_MODEL_FAST, max_retries=0)
+            self._llm_accurate = ChatGroq(temperature=0, groq_api_key=Config.GROQ_API_KEY, groq_api_base=Config.GROQ_BASE_URL,
+                                          model_name=Config.LLM_MODEL_ACCURATE, max_retries=0)
+            self._initialized = True
             logger.info("Groq client and Langchain models initialized.")
-        else:
-            logger.error("GROQ_API_KEY is not set in config. Groq service will not be available.")
 
-    def get_client(self) -> Groq:
+    def warm_up(self):
+        """Builds the clients on a background thread, so the first request does not pay for it."""
+        if not self._initialized:
+            threading.Thread(target=self._init_client, name="groq-warm-up", daemon=True).start()
+
+    def is_configured(self) -> bool:
+        return bool(Config.GROQ_API_KEY)
+
+    def get_client(self) -> "Groq":
+        if not self._initialized:
+            self._init_client()
         return self._client
 
-    def get_llm_fast(self) -> ChatGroq:
+    def get_llm_fast(self) -> "ChatGroq":
+        if not self._initialized:
+            self._init_client()
         return self._llm_fast
 
-    def get_llm_accurate(self) -> ChatGroq:
+    def get_llm_accurate(self) -> "ChatGroq":
+        if not self._initialized:
+            self._init_client()
         return self._llm_accurate
 
+    def get_async_client(self) -> "AsyncGroq":
+        """
+        Native async client for the running event loop, with a keep-alive connection pool.
+        httpx pools are bound to the loop that opened them, so there is one client per loop
+        (normally just the worker's shared loop); it goes away with its loop.
+        """
+        if not self.is_configured():
+            return None
+        loop = asyncio.get_running_loop()
+        with self._init_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                import httpx
+                from groq import AsyncGroq, DefaultAsyncHttpxClient
+                client = AsyncGroq(
+                    api_key=Config.GROQ_API_KEY, base_url=Config.GROQ_BASE_URL, max_retries=0,
+                    http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(
+                        max_connections=Config.GROQ_MAX_CONNECTIONS, max_keepalive_connections=Config.GROQ_MAX_CONNECTIONS,
+                        keepalive_expiry=Config.GROQ_KEEPALIVE_SECONDS,
+                    )),
+                )
+                self._async_clients[loop] = client
+        return client
+
+    def _get_chain(self, system_prompt: str, model_type: str):
+        """The prompt | llm chain for this system prompt and tier, compiled once and reused."""
+        key = (system_prompt, model_type)
+        chain = self._chains.get(key)
+        if chain is not None:
+            return chain
+        llm = self.get_llm_fast() if model_type == "fast" else self.get_llm_accurate()
+        if not llm:
+            raise ValueError("LLM model not initialized.")
+        from langchain_core.prompts import ChatPromptTemplate  # deferred with the other LangChain imports
+
+        # The system prompt is literal text (the extraction prompts contain JSON examples), so its braces are escaped.
+        chain = ChatPromptTemplate.from_messages([
+            ("system", system_prompt.replace("{", "{{").replace("}", "}}")),
+            ("user", "{input}")
+        ]) | llm
+        with self._init_lock:
+            if len(self._chains) >= CHAIN_CACHE_SIZE:
+                self._chains.pop(next(iter(self._chains)))
+            self._chains[key] = chain
+        return chain
+
+    def get_scheduler(self) -> LLMScheduler:
+        return self._scheduler
+
+    @staticmethod
+    def _estimate_request_tokens(system_prompt: str, user_message: str) -> int:
+        # Groq meters prompt + completion tokens against TPM, so reserve the expected output too.
+        return estimate_tokens(system_prompt) + estimate_tokens(user_message) + Config.LLM_EXPECTED_OUTPUT_TOKENS
+
+    @staticmethod
+    def model_name(model_type: str) -> str:
+        return Config.LLM_MODEL_FAST if model_type == "fast" else Config.LLM_MODEL_ACCURATE
+
+    async def _native_completion(self, system_prompt: str, user_message: str, model: str, model_type: str) -> str:
+        client = self.get_async_client()
+        if not client:
+            raise ValueError("Groq client not initialized.")
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message},
+        ]
+
+        async def call():
+            with LLM_REQUEST_SECONDS.time(model_type=model_type, outcome="ok") as labels:
+                try:
+                    return await client.chat.completions.create(messages=messages, model=model, temperature=0.0)
+                except Exception as e:
+                    labels['outcome'] = "rate_limited" if LLMScheduler._status_code(e) == 429 else "error"
+                    raise
+
+        completion = await self._scheduler.run(call, estimated_tokens=self._estimate_request_tokens(system_prompt, user_message))
+        if completion.usage:
+            LLM_TOKENS.inc(completion.usage.prompt_tokens or 0, model_type=model_type, kind="prompt")
+            LLM_TOKENS.inc(completion.usage.completion_tokens or 0, model_type=model_type, kind="completion")
+        return completion.choices[0].message.content
+
     async def chat_completion(self, prompt: str, user_message: str, model: str = Config.LLM_MODEL_FAST) -> str:
         """
-        Performs a chat completion using Groq's native API.
+        Performs a chat completion using Groq's native async API.
         More direct control over API call.
         """
-        if not self._client:
-            raise ValueError("Groq client not initialized.")
         try:
-            chat_completion = await self._client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": user_message},
-                ],
-                model=model,
-                temperature=0.0,
-            )
-            return chat_completion.choices[0].message.content
+            return await self._native_completion(prompt, user_message, model, "fast" if model == Config.LLM_MODEL_FAST else "accurate")
         except Exception as e:
             logger.error(f"Error with Groq chat completion (model: {model}): {e}")
             raise
 
-    async def invoke_llm_chain(self, system_prompt: str, user_message: str, model_type: str = "fast") -> str:
+    async def invoke_llm_chain(self, system_prompt: str, user_message: str, model_type: str = "fast", use_native: bool = None) -> str:
         """
-        Invokes a Langchain LLM chain for more structured interactions.
-        Uses predefined LLM models (fast or accurate).
+        Runs a system prompt + user message against the fast or accurate model. By default
+        (GROQ_USE_NATIVE_CLIENT) this calls AsyncGroq directly; `use_native=False` goes
+        through a cached LangChain chain instead.
         """
-        llm = self.get_llm_fast() if model_type == "fast" else self.get_llm_accurate()
-        if not llm:
-            raise ValueError("LLM model not initialized.")
+        if Config.GROQ_USE_NATIVE_CLIENT if use_native is None else use_native:
+            try:
+                return await self._native_completion(system_prompt, user_message, self.model_name(model_type), model_type)
+            except Exception as e:
+                logger.error(f"Error invoking LLM chain (model_type: {model_type}): {e}")
+                raise
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("user", "{input}")
-        ])
-        output_parser = StrOutputParser()
-        chain = prompt | llm | output_parser
+        chain = self._get_chain(system_prompt, model_type)
+
+        async def call():
+            with LLM_REQUEST_SECONDS.time(model_type=model_type, outcome="ok") as labels:
+                try:
+                    return await chain.ainvoke({"input": user_message})
+                except Exception as e:
+                    labels['outcome'] = "rate_limited" if LLMScheduler._status_code(e) == 429 else "error"
+                    raise
 
         try:
-            response = await chain.ainvoke({"input": user_message})
-            return response
+            message = await self._scheduler.run(
+                call, estimated_tokens=self._estimate_request_tokens(system_prompt, user_message),
+            )
+            usage = getattr(message, 'usage_metadata', None) or {}
+            if usage:
+                LLM_TOKENS.inc(usage.get('input_tokens', 0), model_type=model_type, kind="prompt")
+                LLM_TOKENS.inc(usage.get('output_tokens', 0), model_type=model_type, kind="completion")
+            return message.content
         except Exception as e:
             logger.error(f"Error invoking LLM chain (model_type: {model_type}): {e}")
             raise
 
 # Global instance for easy access
-groq_service = GroqService()
\ No newline at end of file
+groq_service = GroqService()
+
+def _scheduler_samples(key: str):
+    return [({}, groq_service.get_scheduler().stats()[key])]
+
+registry.callback('graphrag_llm_in_flight', 'Groq requests currently in flight.', 'gauge', lambda: _scheduler_samples('in_flight'))
+registry.callback('graphrag_llm_concurrency_limit', 'Current AIMD concurrency window for Groq requests.', 'gauge',
+                  lambda: _scheduler_samples('concurrency_limit'))
+registry.callback('graphrag_llm_retries_total', 'Groq requests retried after a rate limit.', 'counter', lambda: _scheduler_samples('retries'))
+registry.callback('graphrag_llm_rate_limited_total', 'Groq responses with status 429.', 'counter', lambda: _scheduler_samples('rate_limited'))
+registry.callback('graphrag_llm_errors_total', 'Groq requests that failed with an error other than 429.', 'counter',
+                  lambda: _scheduler_samples('errors'))
\ No newline at end of file
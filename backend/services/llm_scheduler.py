@@ -0,0 +1,176 @@
+# backend/services/llm_scheduler.py
+import asyncio
+import logging
+import random
+import threading
+import time
+from utils.metrics import LLM_QUEUE_SECONDS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `per_minute` units per minute."""
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate_per_second = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self._last_refill = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if available now). Does not consume."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate_per_second
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+class LLMScheduler:
+    """
+    Shared admission control for Groq calls.
+    Combines request- and token-per-minute buckets with a sliding concurrency window
+    whose size follows AIMD: +1 per window of successes, halved on rate limits or errors.
+    429 responses block new admissions until their `retry-after` has passed.
+
+    State is guarded by a threading lock and waiters poll with asyncio.sleep, so one
+    instance can be shared by every event loop in the process (Flask runs each async
+    view on its own loop, and background jobs run on their own threads).
+    """
+    _POLL_INTERVAL_SECONDS = 0.05
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int,
+                 min_concurrency: int = 1, max_retries: int = 3):
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self._concurrency_limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.retries = 0
+
+    @property
+    def concurrency_limit(self) -> int:
+        return int(self._concurrency_limit)
+
+    async def _acquire(self, estimated_tokens: int):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._in_flight >= int(self._concurrency_limit):
+                    wait = self._POLL_INTERVAL_SECONDS
+                else:
+                    wait = max(self._request_bucket.wait_time(1, now), self._token_bucket.wait_time(estimated_tokens, now))
+                    if wait == 0.0:
+                        self._request_bucket.consume(1)
+                        self._token_bucket.consume(estimated_tokens)
+                        self._in_flight += 1
+                        return
+            await asyncio.sleep(min(max(wait, self._POLL_INTERVAL_SECONDS), 1.0))
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _on_success(self):
+        with self._lock:
+            self.completed += 1
+            # Additive increase: about +1 slot after a full window of successful calls.
+            self._concurrency_limit = min(self.max_concurrency, self._concurrency_limit + 1.0 / self._concurrency_limit)
+
+    def _on_failure(self, rate_limited: bool, retry_after: float = None):
+        with self._lock:
+            now = time.monotonic()
+            if rate_limited:
+                self.rate_limited += 1
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+            else:
+                self.errors += 1
+            # Multiplicative decrease, at most once per second so a burst of concurrent
+            # failures from the same overload only halves the window once.
+            if now - self._last_decrease >= 1.0:
+                self._concurrency_limit = max(self.min_concurrency, self._concurrency_limit / 2.0)
+                self._last_decrease = now
+
+    @staticmethod
+    def _status_code(error: Exception):
+        status = getattr(error, 'status_code', None)
+        if status is None:
+            status = getattr(getattr(error, 'response', None), 'status_code', None)
+        return status
+
+    @staticmethod
+    def _retry_after_seconds(error: Exception):
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        for header, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+            value = headers.get(header)
+            if value is None:
+                continue
+            try:
+                return float(value) * scale
+            except (TypeError, ValueError):
+                continue
+        return None
+
+    async def run(self, call, estimated_tokens: int = 1):
+        """
+        Runs `call` (a zero-argument coroutine function) once admitted.
+        Rate-limited (429) calls are retried after `retry-after` (or a jittered backoff);
+        any other error is reported to the AIMD controller and re-raised.
+        """
+        attempt = 0
+        while True:
+            queued_at = time.perf_counter()
+            await self._acquire(estimated_tokens)
+            LLM_QUEUE_SECONDS.observe(time.perf_counter() - queued_at)
+            try:
+                result = await call()
+            except Exception as e:
+                if self._status_code(e) != 429:
+                    self._on_failure(rate_limited=False)
+                    raise
+                retry_after = self._retry_after_seconds(e)
+                self._on_failure(rate_limited=True, retry_after=retry_after)
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+            else:
+                self._on_success()
+                return result
+            finally:
+                # Also on cancellation (a BaseException), or the slot would be lost for good.
+                self._release()
+            if retry_after is None:
+                await asyncio.sleep(min(2 ** attempt, 30) * (0.5 + random.random()))
+            logger.warning(f"Groq rate limit hit, retry {attempt}/{self.max_retries} (retry-after: {retry_after}).")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "concurrency_limit": int(self._concurrency_limit),
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "errors": self.errors,
+                "rate_limited": self.rate_limited,
+                "retries": self.retries,
+                "blocked_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+            }
@@ -0,0 +1,230 @@
+# backend/services/neo4j_async_service.py
+import asyncio
+import logging
+import random
+import re
+from neo4j import AsyncGraphDatabase, AsyncDriver, READ_ACCESS, exceptions
+from config import Config
+from services.schema import SCHEMA_STATEMENTS
+from utils.event_loop import get_loop
+from utils.metrics import track_neo4j_query, track_driver_pool, NEO4J_CONTENTION
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Message of a uniqueness violation: "Node(12) already exists with label `Entity` and property `name` = 'WHO'"
+_UNIQUENESS_VIOLATION_RE = re.compile(r"already exists with label `([^`]+)` and property `([^`]+)`")
+
+def _is_merge_race(error: Exception, statements: list) -> bool:
+    """
+    True if a uniqueness violation is on a key the statements MERGE on: another transaction
+    created the same node first, and a retry will match it. Violations on other properties
+    (e.g. a SET of a unique value) fail the same way on every attempt.
+    """
+    match = _UNIQUENESS_VIOLATION_RE.search(getattr(error, 'message', None) or str(error))
+    if not match or not statements:
+        return False
+    label, key = (re.escape(name) for name in match.groups())
+    merge_on_key = re.compile(rf"MERGE\s*\(\w*:{label}\s*\{{\s*{key}\s*:")
+    return any(merge_on_key.search(query) for query, _ in statements)
+
+def contention_kind(error: Exception, statements: list = None):
+    """
+    Classifies errors worth retrying for idempotent MERGE writes: "deadlock", "merge_race" (two
+    transactions creating the same node, on a key `statements` MERGE on), or "transient".
+    Returns None otherwise.
+    """
+    code = getattr(error, 'code', None) or ""
+    if "DeadlockDetected" in code:
+        return "deadlock"
+    if code == "Neo.ClientError.Schema.ConstraintValidationFailed":
+        return "merge_race" if _is_merge_race(error, statements) else None
+    if isinstance(error, exceptions.TransientError) or (hasattr(error, 'is_retryable') and error.is_retryable()):
+        return "transient"
+    return None
+
+def retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff, so conflicting writers do not retry in lockstep."""
+    return random.uniform(0, Config.NEO4J_RETRY_BASE_DELAY * (2 ** attempt))
+
+class AsyncNeo4jService:
+    """
+    Native async Neo4j access with separate read and write paths.
+
+    The async driver (and its connection pool) belongs to one event loop, its "home"
+    loop: the worker's shared loop (see utils.event_loop), which async views and
+    ingestion jobs normally run on too. Calls made from any other loop are handed to
+    the home loop instead of opening a pool per loop.
+    """
+    _instance = None
+    _driver: AsyncDriver = None
+    _driver_loop: asyncio.AbstractEventLoop = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncNeo4jService, cls).__new__(cls)
+        return cls._instance
+
+    def _home_loop(self) -> asyncio.AbstractEventLoop:
+        return get_loop()
+
+    async def _on_home_loop(self, coro_fn, *args):
+        home = self._home_loop()
+        if asyncio.get_running_loop() is home:
+            return await coro_fn(*args)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro_fn(*args), home))
+
+    def _get_driver(self) -> AsyncDriver:
+        # Only called on the home loop, so no locking is needed around creation.
+        if self._driver is not None and self._driver_loop is not asyncio.get_running_loop():
+            # The previous home loop is gone (e.g. an ASGI server restarted its loop); its pool is unusable.
+            logger.warning("Home event loop changed; creating a new async Neo4j driver.")
+            self._driver = None
+        if self._driver is None:
+            if not Config.NEO4J_URI:
+                raise ConnectionError("Neo4j driver is not available: NEO4J_URI is not set.")
+            self._driver = AsyncGraphDatabase.driver(
+                Config.NEO4J_URI,
+                auth=(Config.NEO4J_USERNAME, Config.NEO4J_PASSWORD),
+                max_connection_lifetime=600,
+                connection_acquisition_timeout=60,
+                max_connection_pool_size=Config.NEO4J_MAX_POOL_SIZE,
+                fetch_size=Config.NEO4J_FETCH_SIZE,
+                max_transaction_retry_time=Config.NEO4J_TX_RETRY_SECONDS,
+            )
+            self._driver_loop = asyncio.get_running_loop()
+            logger.info("Async Neo4j driver created.")
+        return self._driver
+
+    @staticmethod
+    async def _execute_statements(tx, statements, attempts):
+        # The driver re-invokes this function when it retries a read; every extra call is a retry.
+        attempts.append(1)
+        if len(attempts) > 1:
+            NEO4J_CONTENTION.inc(service="async", kind="driver_retry")
+        results = []
+        for query, parameters in statements:
+            result = await tx.run(query, parameters or {})
+            results.append([record async for record in result])
+        return results
+
+    async def _run_batch(self, access_mode: str, statements: list):
+        """
+        Reads are managed transactions, retried by the driver. Writes run in an explicit
+        transaction so the loop below is their only retry layer: wrapping execute_write
+        would multiply its retries and backoff with ours.
+        """
+        driver = self._get_driver()
+        attempt = 0
+        while True:
+            try:
+                with track_neo4j_query("async", access_mode.lower()):
+                    async with driver.session(database=Config.NEO4J_DATABASE) as session:
+                        if access_mode == "READ":
+                            return await session.execute_read(self._execute_statements, statements, [])
+                        async with await session.begin_transaction() as tx:
+                            results = await self._execute_statements(tx, statements, [])
+                            await tx.commit()
+                            return results
+            except (exceptions.Neo4jError, exceptions.DriverError) as e:
+                kind = contention_kind(e, statements) if access_mode == "WRITE" and not isinstance(e, exceptions.ServiceUnavailable) else None
+                if kind is None or attempt >= Config.NEO4J_WRITE_MAX_RETRIES:
+                    raise
+                NEO4J_CONTENTION.inc(service="async", kind=kind)
+                delay = retry_delay(attempt)
+                attempt += 1
+                logger.warning(f"Neo4j write conflict ({kind}), retry {attempt}/{Config.NEO4J_WRITE_MAX_RETRIES} in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+
+    async def _run(self, access_mode: str, query: str, parameters: dict = None, statements: list = None):
+        statements = statements or [(query, parameters)]
+        try:
+            results = await self._run_batch(access_mode, statements)
+            return results if query is None else results[0]
+        except exceptions.ClientError as e:
+            logger.error(f"Neo4j ClientError (Cypher Syntax, etc.): {e}\nQuery: {query}\nParams: {parameters}")
+            raise
+        except exceptions.ServiceUnavailable as e:
+            logger.warning(f"Neo4j service unavailable during query. ({e})")
+            await self._close()
+            raise ConnectionError(f"Service unavailable, connection has been reset. Please retry the operation.")
+        except Exception as e:
+            logger.error(f"General error executing Cypher query: {e}")
+            raise
+
+    async def read(self, query: str, parameters: dict = None):
+        """Runs a read-only query in a read transaction (routable to cluster followers)."""
+        return await self._on_home_loop(self._run, "READ", query, parameters)
+
+    async def write(self, query: str, parameters: dict = None):
+        """Runs a query in a write transaction on the leader. Deadlocks and MERGE races are retried."""
+        return await self._on_home_loop(self._run, "WRITE", query, parameters)
+
+    async def write_batch(self, statements: list) -> list:
+        """
+        Runs several (query, parameters) statements in order inside one write transaction,
+        retried as a whole on conflicts. Returns one record list per statement.
+        """
+        return await self._on_home_loop(self._run, "WRITE", None, None, statements)
+
+    async def init_schema(self):
+        """Creates the constraints and indexes in one write transaction (idempotent)."""
+        await self.write_batch([(statement, None) for statement in SCHEMA_STATEMENTS])
+        logger.info(f"Applied {len(SCHEMA_STATEMENTS)} schema statements.")
+
+    async def _verify(self):
+        await self._get_driver().verify_connectivity()
+
+    async def ping(self, timeout: float = None):
+        """Raises if Neo4j cannot be reached within `timeout` seconds. Used by the readiness check."""
+        await asyncio.wait_for(self._on_home_loop(self._verify), timeout or Config.NEO4J_READY_TIMEOUT_SECONDS)
+
+    def warm_up(self):
+        """Starts connecting on the home loop without waiting for it, so startup never blocks on Neo4j."""
+        if not Config.NEO4J_URI:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._verify(), self._home_loop())
+        future.add_done_callback(
+            lambda done: done.exception() and logger.warning(f"Neo4j is not reachable yet: {done.exception()}"))
+
+    async def _stream(self, query: str, parameters: dict = None):
+        driver = self._get_driver()
+        async with driver.session(database=Config.NEO4J_DATABASE, default_access_mode=READ_ACCESS) as session:
+            result = await session.run(query, parameters or {})
+            async for record in result:
+                yield record
+
+    def stream_sync(self, query: str, parameters: dict = None):
+        """
+        Synchronous generator over a read query's records, pulled from the driver one at a
+        time (in fetch_size batches on the wire). Meant for streaming HTTP responses written
+        from a worker thread; must not be consumed on the home loop itself.
+        Closing the generator early discards the rest of the result.
+        """
+        home = self._home_loop()
+        records = self._stream(query, parameters)
+        try:
+            # Timed until the stream is exhausted or closed, i.e. including the time the consumer takes.
+            with track_neo4j_query("async", "stream"):
+                while True:
+                    try:
+                        record = asyncio.run_coroutine_threadsafe(records.__anext__(), home).result()
+                    except StopAsyncIteration:
+                        return
+                    yield record
+        finally:
+            asyncio.run_coroutine_threadsafe(records.aclose(), home).result()
+
+    async def _close(self):
+        if self._driver:
+            driver, self._driver = self._driver, None
+            await driver.close()
+            logger.info("Async Neo4j driver closed.")
+
+    async def close(self):
+        if self._driver is not None:
+            await self._on_home_loop(self._close)
+
+# Global instance for easy access
+neo4j_async_service = AsyncNeo4jService()
+track_driver_pool("async", lambda: neo4j_async_service._driver, Config.NEO4J_MAX_POOL_SIZE)
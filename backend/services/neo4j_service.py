@@ -1,78 +1,65 @@
 # backend/services/neo4j_service.py
 from neo4j import GraphDatabase, Driver, exceptions
 from config import Config
+from services.neo4j_async_service import contention_kind, retry_delay
+from services.schema import SCHEMA_STATEMENTS
+from utils.metrics import track_neo4j_query, track_driver_pool, NEO4J_CONTENTION
 import logging
+import threading
 import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class Neo4jService:
+    """
+    Synchronous Neo4j access. The driver is created on first use and opens connections
+    lazily, so importing or constructing the service never blocks on the database.
+    """
     _instance = None
     _driver: Driver = None
-    _connection_attempts = 0
-    _max_connection_attempts = 5
-    _retry_delay_seconds = 5
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Neo4jService, cls).__new__(cls)
-            cls._instance._connect()
+            cls._instance._lock = threading.Lock()
         return cls._instance
 
     def _connect(self):
-        if self._driver is None:
-            while self._connection_attempts < self._max_connection_attempts:
-                try:
-                    self._driver = GraphDatabase.driver(
-                        Config.NEO4J_URI,
-                        auth=(Config.NEO4J_USERNAME, Config.NEO4J_PASSWORD),
-                        max_connection_lifetime=600,
-                        connection_acquisition_timeout=60
-                    )
-                    self._driver.verify_connectivity()
-                    logger.info("Successfully connected to Neo4j AuraDB.")
-                    self._create_constraints()
-                    self._connection_attempts = 0
-                    return
-                except exceptions.ServiceUnavailable as e:
-                    logger.warning(f"Neo4j service unavailable, retrying in {self._retry_delay_seconds}s... ({e})")
-                    self._connection_attempts += 1
-                    time.sleep(self._retry_delay_seconds)
-                except Exception as e:
-                    logger.error(f"Failed to connect to Neo4j on attempt {self._connection_attempts+1}: {e}")
-                    self._connection_attempts += 1
-                    time.sleep(self._retry_delay_seconds)
-            
-            logger.error("Exceeded max connection attempts to Neo4j. Driver remains None.")
-            self._driver = None
+        if not Config.NEO4J_URI:
+            logger.error("NEO4J_URI is not set in config. Neo4j service will not be available.")
+            return
+        with self._lock:
+            if self._driver is None:
+                self._driver = GraphDatabase.driver(
+                    Config.NEO4J_URI,
+                    auth=(Config.NEO4J_USERNAME, Config.NEO4J_PASSWORD),
+                    max_connection_lifetime=600,
+                    connection_acquisition_timeout=60,
+                    max_transaction_retry_time=Config.NEO4J_TX_RETRY_SECONDS
+                )
+                logger.info("Neo4j driver created.")
+
+    @staticmethod
+    def _apply_schema(tx):
+        for statement in SCHEMA_STATEMENTS:
+            tx.run(statement).consume()
 
     def _create_constraints(self):
-        if not self._driver:
+        """Applies the schema in a single transaction. Normally run via `python manage.py init-schema`."""
+        driver = self.get_driver()
+        if not driver:
             logger.warning("No Neo4j driver available, skipping constraint creation.")
             return
-        with self._driver.session() as session:
-            try:
-                constraints = [
-                    "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Post) REQUIRE p.id IS UNIQUE",
-                    "CREATE CONSTRAINT IF NOT EXISTS FOR (a:Author) REQUIRE a.name IS UNIQUE",
-                    "CREATE CONSTRAINT IF NOT EXISTS FOR (t:Timestamp) REQUIRE t.value IS UNIQUE",
-                    "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Claim) REQUIRE c.text IS UNIQUE",
-                    "CREATE CONSTRAINT IF NOT EXISTS FOR (e:Entity) REQUIRE e.name IS UNIQUE",
-                    "CREATE CONSTRAINT IF NOT EXISTS FOR (k:Keyword) REQUIRE k.text IS UNIQUE",
-                    "CREATE CONSTRAINT IF NOT EXISTS FOR (h:Hashtag) REQUIRE h.tag IS UNIQUE",
-                    "CREATE CONSTRAINT IF NOT EXISTS FOR (v:FactCheckVerdict) REQUIRE v.value IS UNIQUE",
-                    "CREATE CONSTRAINT IF NOT EXISTS FOR (s:FactCheckSource) REQUIRE s.name IS UNIQUE"
-                ]
-                for constraint in constraints:
-                    session.run(constraint)
-                logger.info("Neo4j constraints created/verified.")
-            except Exception as e:
-                logger.error(f"Failed to create Neo4j constraints: {e}")
+        try:
+            with driver.session(database=Config.NEO4J_DATABASE) as session:
+                session.execute_write(self._apply_schema)
+            logger.info("Neo4j constraints created/verified.")
+        except Exception as e:
+            logger.error(f"Failed to create Neo4j constraints: {e}")
 
     def get_driver(self) -> Driver:
         if self._driver is None:
-            logger.warning("Neo4j driver is None, attempting to reconnect.")
             self._connect()
         return self._driver
 
@@ -81,20 +68,37 @@ class Neo4jService:
             self._driver.close()
             self._driver = None
             logger.info("Neo4j driver closed.")
-            self._connection_attempts = 0
 
     @staticmethod
     def _execute_query(tx, query, parameters=None):
         result = tx.run(query, parameters or {})
         return [record for record in result]
 
+    def _run_with_retry(self, driver: Driver, query: str, parameters: dict = None):
+        attempt = 0
+        while True:
+            try:
+                # An explicit transaction, so this loop is the only retry layer (execute_write retries too).
+                with track_neo4j_query("sync", "write"), driver.session() as session, session.begin_transaction() as tx:
+                    records = self._execute_query(tx, query, parameters)
+                    tx.commit()
+                    return records
+            except (exceptions.Neo4jError, exceptions.DriverError) as e:
+                kind = None if isinstance(e, exceptions.ServiceUnavailable) else contention_kind(e, [(query, parameters)])
+                if kind is None or attempt >= Config.NEO4J_WRITE_MAX_RETRIES:
+                    raise
+                NEO4J_CONTENTION.inc(service="sync", kind=kind)
+                delay = retry_delay(attempt)
+                attempt += 1
+                logger.warning(f"Neo4j write conflict ({kind}), retry {attempt}/{Config.NEO4J_WRITE_MAX_RETRIES} in {delay:.2f}s: {e}")
+                time.sleep(delay)
+
     def run_query(self, query: str, parameters: dict = None):
         driver = self.get_driver()
         if not driver:
             raise ConnectionError("Neo4j driver is not available.")
         try:
-            with driver.session() as session:
-                return session.execute_write(self._execute_query, query, parameters)
+            return self._run_with_retry(driver, query, parameters)
         except exceptions.ClientError as e:
             logger.error(f"Neo4j ClientError (Cypher Syntax, etc.): {e}\nQuery: {query}\nParams: {parameters}")
             raise
@@ -106,4 +110,5 @@ class Neo4jService:
             logger.error(f"General error executing Cypher query: {e}")
             raise
 
-neo4j_service = Neo4jService()
\ No newline at end of file
+neo4j_service = Neo4jService()
+track_driver_pool("sync", lambda: neo4j_service._driver, 100)  # the sync driver uses the library's default pool size
\ No newline at end of file
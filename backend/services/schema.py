@@ -0,0 +1,19 @@
+# backend/services/schema.py
+# Uniqueness constraints (each backed by an index) on the keys every MERGE uses, plus the
+# indexes the claim spread endpoints read from (claimId lookups, top-N by each aggregate).
+# Applied in one transaction by `python manage.py init-schema`; every statement is idempotent.
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Post) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (a:Author) REQUIRE a.name IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (t:Timestamp) REQUIRE t.value IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Claim) REQUIRE c.text IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (e:Entity) REQUIRE e.name IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (k:Keyword) REQUIRE k.text IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (h:Hashtag) REQUIRE h.tag IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (v:FactCheckVerdict) REQUIRE v.value IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (s:FactCheckSource) REQUIRE s.name IS UNIQUE",
+    "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Claim) REQUIRE c.claimId IS UNIQUE",
+    "CREATE INDEX claim_post_count IF NOT EXISTS FOR (c:Claim) ON (c.postCount)",
+    "CREATE INDEX claim_author_count IF NOT EXISTS FOR (c:Claim) ON (c.authorCount)",
+    "CREATE INDEX claim_last_seen IF NOT EXISTS FOR (c:Claim) ON (c.lastSeen)",
+]
@@ -0,0 +1,73 @@
+# backend/utils/event_loop.py
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One event loop per worker process. Async views, ingestion jobs and the async Neo4j
+# driver all run on it, so connection pools and cached async clients outlive a request.
+_loop: asyncio.AbstractEventLoop = None
+_lock = threading.Lock()
+
+def bind_loop(loop: asyncio.AbstractEventLoop):
+    """
+    Makes `loop` the shared loop, e.g. the ASGI server's own loop at startup.
+    Fails if a different shared loop has already been started.
+    """
+    global _loop
+    with _lock:
+        if _loop is not None and _loop is not loop and not _loop.is_closed():
+            raise RuntimeError("A shared event loop is already running; bind_loop must be called before first use.")
+        _loop = loop
+    logger.info("Shared event loop bound to the server loop.")
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Returns the shared loop, starting one on a background thread if none has been bound."""
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="shared-event-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+def run_sync(coro_fn, *args, **kwargs):
+    """
+    Runs `coro_fn(*args, **kwargs)` on the shared loop and blocks the calling thread until it
+    finishes. The caller's context variables (such as Flask's request context) are copied
+    into the task. Must not be called from the shared loop's own thread.
+    """
+    loop = get_loop()
+    if _running_loop() is loop:
+        raise RuntimeError("run_sync cannot block the shared event loop's own thread.")
+    context = contextvars.copy_context()
+    outcome = concurrent.futures.Future()
+
+    def finish(task: asyncio.Task):
+        if task.cancelled():
+            outcome.set_exception(concurrent.futures.CancelledError())
+        elif task.exception() is not None:
+            outcome.set_exception(task.exception())
+        else:
+            outcome.set_result(task.result())
+
+    def start():
+        try:
+            task = loop.create_task(coro_fn(*args, **kwargs), context=context)
+        except BaseException as e:
+            outcome.set_exception(e)
+            return
+        task.add_done_callback(finish)
+
+    loop.call_soon_threadsafe(start)
+    return outcome.result()
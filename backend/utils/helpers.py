@@ -1,7 +1,10 @@
 # backend/utils/helpers.py
 import re
-from datetime import datetime
-from neo4j.time import DateTime as Neo4jDateTime
+import base64
+import hashlib
+import json
+from datetime import datetime, timezone
+from utils.serialization import serialize_neo4j_value  # re-exported for existing callers
 
 def clean_text(text: str) -> str:
     """Basic text cleaning."""
@@ -23,6 +26,33 @@ def extract_mentions(text: str) -> list[str]:
        return []
     return re.findall(r'@(\w+)', text)
 
+def content_fingerprint(*parts) -> str:
+    """Stable SHA-256 hex digest of the given JSON-serializable values."""
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+def claim_id(text: str) -> str:
+    """Short, URL-safe id for a claim; the node itself is keyed by its full text."""
+    return content_fingerprint("claim", text)[:16]
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for Llama-style tokenizers)."""
+    if not isinstance(text, str):
+        return 0
+    return len(text) // 4 + 1
+
+def encode_cursor(value: str) -> str:
+    """Wraps an internal position (e.g. an element id) into an opaque, URL-safe cursor."""
+    if value is None:
+        return None
+    return base64.urlsafe_b64encode(value.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> str:
+    """Inverse of encode_cursor. Raises ValueError on malformed cursors."""
+    try:
+        return base64.b64decode(cursor + '=' * (-len(cursor) % 4), altchars=b'-_', validate=True).decode('utf-8')
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 def format_timestamp(timestamp_str: str) -> str:
     """Attempts to normalize various timestamp formats to ISO 8601."""
     if not isinstance(timestamp_str, str):
@@ -37,22 +67,28 @@ def format_timestamp(timestamp_str: str) -> str:
     except ValueError:
         return timestamp_str
 
-# THIS IS THE NEW, RECURSIVE FUNCTION THAT WILL FIX THE ERROR
-def serialize_neo4j_value(value):
+# Date-only and long-form layouts seen in datasets, tried after ISO 8601.
+_TIMESTAMP_FORMATS = ('%Y/%m/%d', '%B %d, %Y', '%b %d, %Y', '%d %B %Y', '%d %b %Y')
+
+def parse_timestamp(timestamp_str: str) -> str:
     """
-    Recursively converts Neo4j temporal types to JSON-serializable formats.
-    This is the definitive fix for the 'DateTime not JSON serializable' error.
-    It handles values that are dictionaries or lists containing DateTime objects.
+    Normalizes a post timestamp to an ISO 8601 UTC string that Cypher's datetime() accepts,
+    or None if it is not a recognizable date. Naive times are taken as UTC.
     """
-    if isinstance(value, (Neo4jDateTime, datetime)):
-        return value.isoformat() if value else None
-    elif isinstance(value, dict):
-        # If the value is a dictionary, recursively process each of its values
-        return {k: serialize_neo4j_value(v) for k, v in value.items()}
-    elif isinstance(value, list):
-        # If the value is a list, recursively process each of its items
-        return [serialize_neo4j_value(v) for v in value]
-    # You could add other Neo4j types here if needed (e.g., Point)
-    else:
-        # Return the value as is if it's already a serializable type
-        return value
\ No newline at end of file
+    if not isinstance(timestamp_str, str) or not timestamp_str.strip():
+        return None
+    value = timestamp_str.strip()
+    try:
+        parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except ValueError:
+        for fmt in _TIMESTAMP_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
@@ -0,0 +1,231 @@
+# backend/utils/metrics.py
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in items]
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram. Each observation is one bisect and one lock acquisition."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the duration of the block. Labels may be updated inside the block (e.g. an outcome)."""
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        lines = []
+        for key, bucket_counts, total, count in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(float(bound))})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+class CallbackMetric(_Metric):
+    """
+    A metric read from existing state at scrape time (cache hit counters, pool sizes),
+    so hot paths that already keep their own counters pay nothing extra.
+    `callback` returns an iterable of (labels dict, value).
+    """
+    def __init__(self, name: str, documentation: str, type_name: str, callback):
+        super().__init__(name, documentation)
+        self.type_name = type_name
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        try:
+            samples = list(self.callback())
+        except Exception as e:
+            logger.debug(f"Metric callback {self.name} failed: {e}")
+            return []
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples if value is not None]
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # Re-registration (e.g. a module reloaded in tests) replaces the old definition.
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, type_name: str, callback) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, type_name, callback))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            samples = metric.render()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+# Global instance
+registry = MetricsRegistry()
+
+_driver_pools = {}  # service label -> (driver getter, configured max pool size)
+
+def track_driver_pool(service: str, get_driver, max_size: int):
+    """Exposes pool gauges for a Neo4j driver; `get_driver` returns the current driver or None."""
+    _driver_pools[service] = (get_driver, max_size)
+
+def _driver_pool_samples():
+    # The driver has no public pool API, so this reads its internals and skips a driver if they change.
+    for service, (get_driver, max_size) in list(_driver_pools.items()):
+        yield {"service": service, "state": "max"}, max_size
+        connections = getattr(getattr(get_driver(), '_pool', None), 'connections', None)
+        if connections is None:
+            continue
+        in_use = idle = 0
+        try:
+            for address_connections in list(connections.values()):
+                for connection in list(address_connections):
+                    if getattr(connection, 'in_use', False):
+                        in_use += 1
+                    else:
+                        idle += 1
+        except RuntimeError:  # pool mutated while being read
+            continue
+        yield {"service": service, "state": "in_use"}, in_use
+        yield {"service": service, "state": "idle"}, idle
+
+registry.callback('graphrag_neo4j_pool_connections', 'Neo4j driver pool connections by state.', 'gauge', _driver_pool_samples)
+
+# Stage latencies and failure counters shared across modules.
+LLM_REQUEST_SECONDS = registry.histogram(
+    'graphrag_llm_request_duration_seconds', 'Groq request latency, excluding scheduler queueing.', ('model_type', 'outcome'))
+LLM_QUEUE_SECONDS = registry.histogram(
+    'graphrag_llm_queue_wait_seconds', 'Time Groq requests wait for rate-limit and concurrency admission.')
+LLM_TOKENS = registry.counter(
+    'graphrag_llm_tokens_total', 'Tokens reported by Groq responses.', ('model_type', 'kind'))
+EXTRACTION_SECONDS = registry.histogram(
+    'graphrag_extraction_duration_seconds', 'Latency of one extraction request, including parsing.', ('model_type', 'mode'))
+EXTRACTION_PARSE_SECONDS = registry.histogram(
+    'graphrag_extraction_parse_duration_seconds', 'Time spent parsing LLM JSON output.', ('mode',), FAST_BUCKETS)
+EXTRACTION_FAILURES = registry.counter(
+    'graphrag_extraction_failures_total', 'Extractions that failed, by cause.', ('model_type', 'reason'))
+NEO4J_QUERY_SECONDS = registry.histogram(
+    'graphrag_neo4j_query_duration_seconds', 'Neo4j query latency.', ('service', 'access', 'outcome'))
+NEO4J_QUERY_FAILURES = registry.counter(
+    'graphrag_neo4j_query_failures_total', 'Neo4j queries that raised, by exception type.', ('service', 'error'))
+NEO4J_CONTENTION = registry.counter(
+    'graphrag_neo4j_contention_total', 'Neo4j write conflicts (deadlocks, lock timeouts, MERGE races) and retries.', ('service', 'kind'))
+PIPELINE_STAGE_SECONDS = registry.histogram(
+    'graphrag_ingestion_stage_duration_seconds', 'Per-chunk time spent in each ingestion stage.', ('stage',))
+@contextmanager
+def track_neo4j_query(service: str, access: str):
+    """Times one Neo4j call, labelling it with its outcome and counting failures by exception type."""
+    started, outcome = time.perf_counter(), "ok"
+    try:
+        yield
+    except Exception as e:
+        outcome = "error"
+        NEO4J_QUERY_FAILURES.inc(service=service, error=type(e).__name__)
+        raise
+    finally:
+        NEO4J_QUERY_SECONDS.observe(time.perf_counter() - started, service=service, access=access, outcome=outcome)
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'graphrag_http_request_duration_seconds', 'HTTP request latency until the response is returned.', ('endpoint', 'method', 'status'))
@@ -0,0 +1,118 @@
+# backend/utils/serialization.py
+import base64
+import datetime
+import json
+from flask.json.provider import DefaultJSONProvider
+from neo4j import time as neo4j_time
+from neo4j import spatial as neo4j_spatial
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is used without it
+    orjson = None
+
+def _identity(value):
+    return value
+
+def _isoformat(value):
+    return value.isoformat()
+
+def _serialize_duration(value):
+    return value.iso_format()
+
+def _serialize_timedelta(value):
+    return value.total_seconds()
+
+def _serialize_point(value):
+    return {"srid": value.srid, "coordinates": list(value)}
+
+def _serialize_bytes(value):
+    return base64.b64encode(value).decode('ascii')
+
+def _serialize_dict(value):
+    return {k: serialize_neo4j_value(v) for k, v in value.items()}
+
+def _serialize_sequence(value):
+    return [serialize_neo4j_value(v) for v in value]
+
+# Converters for the base types Neo4j can return. Lookups for a concrete type walk its MRO
+# once and are then cached in _DISPATCH, so the hot path is a single dict lookup per value.
+_BASE_SERIALIZERS = {
+    str: _identity, int: _identity, float: _identity, bool: _identity, type(None): _identity,
+    dict: _serialize_dict, list: _serialize_sequence, tuple: _serialize_sequence,
+    neo4j_time.DateTime: _isoformat, neo4j_time.Date: _isoformat, neo4j_time.Time: _isoformat,
+    neo4j_time.Duration: _serialize_duration,
+    datetime.datetime: _isoformat, datetime.date: _isoformat, datetime.time: _isoformat,
+    datetime.timedelta: _serialize_timedelta,
+    neo4j_spatial.Point: _serialize_point,
+    bytes: _serialize_bytes, bytearray: _serialize_bytes,
+}
+_DISPATCH = dict(_BASE_SERIALIZERS)
+
+def _resolve(value_type):
+    for cls in value_type.__mro__:
+        converter = _BASE_SERIALIZERS.get(cls)
+        if converter is not None:
+            break
+    else:
+        converter = _identity
+    _DISPATCH[value_type] = converter
+    return converter
+
+def serialize_neo4j_value(value):
+    """
+    Converts Neo4j temporal, duration and spatial values (at any nesting depth) into
+    JSON-serializable ones in a single pass. Unknown types are returned unchanged.
+    """
+    converter = _DISPATCH.get(type(value)) or _resolve(type(value))
+    return converter(value)
+
+class GraphSerializer:
+    """
+    Converts nodes and relationships for one response. Node conversions are memoized by
+    element_id, so a node that appears in many records is only serialized once.
+    """
+    def __init__(self):
+        self._nodes = {}
+
+    def node(self, node) -> dict:
+        node_dict = self._nodes.get(node.element_id)
+        if node_dict is None:
+            node_dict = {"id": str(node.get('id', node.element_id)), "labels": list(node.labels), "properties": serialize_neo4j_value(dict(node))}
+            self._nodes[node.element_id] = node_dict
+        return node_dict
+
+    def seen(self, element_id: str) -> bool:
+        return element_id in self._nodes
+
+    def node_id(self, element_id: str) -> str:
+        return self._nodes[element_id]['id']
+
+    def nodes(self) -> list:
+        return list(self._nodes.values())
+
+    @staticmethod
+    def relationship(rel, source_id: str, target_id: str, with_properties: bool = True) -> dict:
+        link = {"source": source_id, "target": target_id, "type": rel.type}
+        if with_properties:
+            link["properties"] = serialize_neo4j_value(dict(rel))
+        return link
+
+def _default(value):
+    converted = serialize_neo4j_value(value)
+    if converted is value:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return converted
+
+def dumps(payload) -> str:
+    """Compact JSON encoding, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(payload, default=_default, separators=(',', ':'))
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes responses with orjson (falls back to the default provider)."""
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj)
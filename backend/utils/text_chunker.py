@@ -0,0 +1,56 @@
+# backend/utils/text_chunker.py
+import re
+from utils.helpers import estimate_tokens
+
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+')
+
+def split_sentences(text: str) -> list[str]:
+    """Splits text after sentence-ending punctuation."""
+    return [sentence for sentence in (part.strip() for part in _SENTENCE_BOUNDARY_RE.split(text)) if sentence]
+
+def _split_long_sentence(sentence: str, max_tokens: int, count_tokens) -> list[str]:
+    """Falls back to word boundaries for a single sentence that does not fit in a chunk."""
+    pieces, current, current_tokens = [], [], 0
+    for word in sentence.split():
+        tokens = count_tokens(word)
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+def chunk_text(text: str, max_tokens: int, overlap_tokens: int = 0, count_tokens=estimate_tokens) -> list[str]:
+    """
+    Splits text into chunks of at most ~`max_tokens` on sentence boundaries. Each chunk after
+    the first repeats up to `overlap_tokens` of the previous chunk's trailing sentences, so a
+    claim spanning a boundary is seen whole by at least one chunk. Short texts come back as is.
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    units = []
+    for sentence in split_sentences(text):
+        if count_tokens(sentence) > max_tokens:
+            units.extend(_split_long_sentence(sentence, max_tokens, count_tokens))
+        else:
+            units.append(sentence)
+    sizes = [count_tokens(unit) for unit in units]
+
+    chunks, start = [], 0
+    while start < len(units):
+        end, total = start, 0
+        while end < len(units) and (end == start or total + sizes[end] <= max_tokens):
+            total += sizes[end]
+            end += 1
+        chunks.append(" ".join(units[start:end]))
+        if end >= len(units):
+            break
+        # Step back over trailing sentences within the overlap budget, always moving forward.
+        next_start, overlap = end, 0
+        while next_start - 1 > start and overlap + sizes[next_start - 1] <= overlap_tokens:
+            next_start -= 1
+            overlap += sizes[next_start]
+        start = next_start
+    return chunks
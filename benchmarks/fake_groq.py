@@ -0,0 +1,181 @@
+# benchmarks/fake_groq.py
+"""
+Local stand-in for the Groq chat completions API. Point the backend at it with
+GROQ_BASE_URL=http://127.0.0.1:<port> so benchmarks spend no quota.
+
+    python benchmarks/fake_groq.py --port 8099 --latency-ms 300 --rate-429 0.05 --malformed-rate 0.02
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z'\-]+")
+_ENTITY_RE = re.compile(r"\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*")
+
+def _fake_extraction(text: str) -> dict:
+    """A plausible, deterministic extraction so downstream graph writes have realistic shape."""
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+    words = [w.lower() for w in _WORD_RE.findall(text) if len(w) > 4]
+    return {
+        "claims": sentences[:2],
+        "entities": list(dict.fromkeys(_ENTITY_RE.findall(text)))[:5],
+        "summary": (sentences[0] if sentences else text)[:200],
+        "keywords": list(dict.fromkeys(words))[:5],
+    }
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that give up mid-response (timeouts, closed event loops) are expected under load.
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+class FakeGroqServer:
+    """
+    Threaded HTTP server answering POST .../chat/completions. Each request sleeps for
+    `latency_ms` (+/- `jitter_ms`), then fails with 429 with probability `rate_429`, or returns
+    truncated JSON with probability `malformed_rate`, otherwise a well-formed extraction.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 200.0, jitter_ms: float = 50.0,
+                 rate_429: float = 0.0, malformed_rate: float = 0.0, retry_after_s: float = 1.0, seed: int = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.malformed_rate = malformed_rate
+        self.retry_after_s = retry_after_s
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "rate_limited": 0, "malformed": 0, "ok": 0, "prompt_chars": 0}
+        self._httpd = _QuietHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGroqServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-groq", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _roll(self):
+        """Returns (delay seconds, outcome) for one request."""
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self._random.random()
+        if roll < self.rate_429:
+            return delay, "rate_limited"
+        if roll < self.rate_429 + self.malformed_rate:
+            return delay, "malformed"
+        return delay, "ok"
+
+    @staticmethod
+    def _completion_content(user_message: str) -> str:
+        if user_message.startswith("Texts to analyze:"):
+            try:
+                items = json.loads(user_message[len("Texts to analyze:"):])
+                return json.dumps([{"id": item["id"], **_fake_extraction(item["text"])} for item in items])
+            except (ValueError, KeyError, TypeError):
+                pass
+        text = user_message[len("Text to analyze:"):] if user_message.startswith("Text to analyze:") else user_message
+        return json.dumps(_fake_extraction(text.strip()))
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict, headers: dict = None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                try:
+                    request = json.loads(body)
+                    messages = request.get("messages", [])
+                except ValueError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                    return
+                server._count("requests")
+                user_message = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+                server._count("prompt_chars", sum(len(m.get("content", "")) for m in messages))
+
+                delay, outcome = server._roll()
+                time.sleep(delay)
+                if outcome == "rate_limited":
+                    server._count("rate_limited")
+                    self._send_json(429, {"error": {"message": "Rate limit reached (fake)", "type": "tokens", "code": "rate_limit_exceeded"}},
+                                    {"retry-after": f"{server.retry_after_s:g}"})
+                    return
+                content = server._completion_content(user_message)
+                if outcome == "malformed":
+                    server._count("malformed")
+                    content = content[: max(1, len(content) // 2)]
+                else:
+                    server._count("ok")
+                prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4 + 1
+                completion_tokens = len(content) // 4 + 1
+                self._send_json(200, {
+                    "id": f"chatcmpl-fake-{time.time_ns()}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Groq chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+    server = FakeGroqServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.rate_429, args.malformed_rate, args.retry_after)
+    print(f"Fake Groq server listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+# benchmarks/graph_store.py
+"""
+In-memory stand-in for the Neo4j services used by GraphAgent. It implements the
+read/write/stream_sync interface of AsyncNeo4jService and understands the handful of
+queries the agent issues (post writes and state checks, verdict updates, subgraph pages, summaries,
+claim spread aggregates),
+so benchmarks measure the backend rather than a database round trip.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+class MemoryNode(dict):
+    def __init__(self, element_id: str, labels, properties: dict):
+        super().__init__(properties)
+        self.element_id = element_id
+        self.labels = frozenset(labels)
+
+class MemoryRelationship(dict):
+    def __init__(self, element_id: str, rel_type: str, start_node: MemoryNode, end_node: MemoryNode, properties: dict = None):
+        super().__init__(properties or {})
+        self.element_id = element_id
+        self.type = rel_type
+        self.start_node = start_node
+        self.end_node = end_node
+
+class MemoryRecord(dict):
+    """Mimics neo4j.Record for the accessors the agent uses (item access, .get, .data)."""
+    def data(self) -> dict:
+        return dict(self)
+
+class _RecordStream:
+    def __init__(self, records):
+        self._records = iter(records)
+
+    def __iter__(self):
+        return self._records
+
+    def close(self):
+        pass
+
+# Label -> property that identifies the node, as in the uniqueness constraints.
+_NODE_KEYS = {
+    "Post": "id", "Author": "name", "Timestamp": "value", "Claim": "text", "Entity": "name",
+    "Keyword": "text", "Hashtag": "tag", "FactCheckVerdict": "value", "FactCheckSource": "name",
+}
+
+class InMemoryGraphStore:
+    """
+    Thread-safe property graph keyed like the real schema. `latency_ms` adds a simulated
+    round trip to every call so scenarios can model a remote database.
+    """
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._nodes = {}  # (label, key) -> MemoryNode
+        self._out = {}  # element_id -> {(type, target element_id): MemoryRelationship}
+        self._in = {}  # element_id -> {(type, source element_id): MemoryRelationship}
+        self.calls = {"read": 0, "write": 0, "stream": 0}
+
+    # --- graph primitives -------------------------------------------------
+
+    def _next_id(self) -> str:
+        # Zero-padded so string order matches creation order, like elementId paging expects.
+        return f"4:mem:{next(self._ids):012d}"
+
+    def _merge_node(self, label: str, key, **properties) -> MemoryNode:
+        node = self._nodes.get((label, key))
+        if node is None:
+            node = MemoryNode(self._next_id(), [label], {_NODE_KEYS[label]: key})
+            self._nodes[(label, key)] = node
+            self._out[node.element_id], self._in[node.element_id] = {}, {}
+        node.update(properties)
+        return node
+
+    def _merge_rel(self, start: MemoryNode, rel_type: str, end: MemoryNode, **properties) -> MemoryRelationship:
+        rel = self._out[start.element_id].get((rel_type, end.element_id))
+        if rel is None:
+            rel = MemoryRelationship(self._next_id(), rel_type, start, end)
+            self._out[start.element_id][(rel_type, end.element_id)] = rel
+            self._in[end.element_id][(rel_type, start.element_id)] = rel
+        rel.update(properties)
+        return rel
+
+    def node_count(self) -> int:
+        with self._lock:
+            return len(self._nodes)
+
+    def post_ids(self) -> list:
+        with self._lock:
+            return [key for label, key in self._nodes if label == "Post"]
+
+    # --- query handlers ---------------------------------------------------
+
+    def _write_posts(self, rows: list) -> list:
+        records = []
+        for row in rows:
+            post = self._merge_node("Post", row["postId"], content=row["postContent"], summary=row["postSummary"],
+                                    extractionTier=row.get("extractionTier"), contentHash=row.get("contentHash"))
+            post.setdefault("createdAt", datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"))
+            previous_verdict = post.get("verdict")
+            if row.get("verdictValue") is not None:
+                post["verdict"] = row["verdictValue"]
+            author = self._merge_node("Author", row["authorName"])
+            self._merge_rel(author, "CREATED", post)
+            if row.get("timestampValue") is not None:
+                self._merge_rel(post, "AT_TIME", self._merge_node("Timestamp", row["timestampValue"]))
+            if row.get("verdictValue") is not None:
+                self._write_verdict(post, row["verdictValue"], row["verdictSource"])
+            self._move_verdict_mix(post, previous_verdict)
+            for rel_type, values in self._removed_targets(row.get("removed")):
+                for rel in list(self._out[post.element_id].values()):
+                    if rel.type == rel_type and rel.end_node.get(_NODE_KEYS[self._rel_label(rel_type)]) in values:
+                        self._count_link(post, author, rel.end_node, rel_type, -1)
+                        self._delete_rel(rel)
+            seen_at = row.get("timestampValue") or post["createdAt"]
+            for label, rel_type, values in (
+                ("Claim", "CONTAINS_CLAIM", row["claimsList"]), ("Entity", "MENTIONS", row["entitiesList"]),
+                ("Keyword", "HAS_KEYWORD", row["keywordsList"]), ("Hashtag", "HAS_HASHTAG", row["hashtagsList"]),
+                ("Entity", "MENTIONS_USER", row["mentionsList"]),
+            ):
+                for value in values:
+                    target = self._merge_node(label, value)
+                    if (rel_type, target.element_id) not in self._out[post.element_id]:
+                        self._merge_rel(post, rel_type, target)
+                        self._count_link(post, author, target, rel_type, 1, seen_at)
+            original = self._nodes.get(("Post", row.get("duplicateOf")))
+            if original is not None:
+                self._merge_rel(post, "DUPLICATE_OF", original, similarity=row.get("duplicateSimilarity"))
+            records.append(MemoryRecord(postId=row["postId"]))
+        return records
+
+    def _bump(self, start: MemoryNode, rel_type: str, end: MemoryNode, delta: int):
+        """Adds `delta` to a counter relationship's `posts`, deleting it at zero. Returns the new count, or None if absent."""
+        rel = self._out[start.element_id].get((rel_type, end.element_id))
+        if rel is None:
+            if delta < 0:
+                return None
+            rel = self._merge_rel(start, rel_type, end, posts=0)
+        rel["posts"] += delta
+        if rel["posts"] <= 0:
+            self._delete_rel(rel)
+            return 0
+        return rel["posts"]
+
+    def _count_link(self, post: MemoryNode, author: MemoryNode, target: MemoryNode, rel_type: str, delta: int, seen_at: str = None):
+        """Spread aggregates for a created (+1) or deleted (-1) CONTAINS_CLAIM or MENTIONS link, as in POST_WRITE_QUERY."""
+        if rel_type not in ("CONTAINS_CLAIM", "MENTIONS"):
+            return
+        target["postCount"] = target.get("postCount", 0) + delta
+        if seen_at is not None:
+            target["firstSeen"] = min(target.get("firstSeen") or seen_at, seen_at)
+            target["lastSeen"] = max(target.get("lastSeen") or seen_at, seen_at)
+        if rel_type != "CONTAINS_CLAIM":
+            return
+        spread = self._bump(author, "SPREAD", target, delta)
+        if (delta > 0 and spread == 1) or (delta < 0 and spread == 0):
+            target["authorCount"] = target.get("authorCount", 0) + delta
+        verdict = self._nodes.get(("FactCheckVerdict", post.get("verdict")))
+        if verdict is not None:
+            self._bump(target, "VERDICT_MIX", verdict, delta)
+
+    def _move_verdict_mix(self, post: MemoryNode, previous_verdict: str):
+        if (previous_verdict or "") == (post.get("verdict") or ""):
+            return
+        old, new = self._nodes.get(("FactCheckVerdict", previous_verdict)), self._nodes.get(("FactCheckVerdict", post.get("verdict")))
+        for rel in list(self._out[post.element_id].values()):
+            if rel.type == "CONTAINS_CLAIM":
+                if old is not None:
+                    self._bump(rel.end_node, "VERDICT_MIX", old, -1)
+                if new is not None:
+                    self._bump(rel.end_node, "VERDICT_MIX", new, 1)
+
+    @staticmethod
+    def _claim_fields(claim: MemoryNode) -> dict:
+        return {"claimId": claim.get("claimId"), "text": claim["text"], "postCount": claim.get("postCount", 0),
+                "authorCount": claim.get("authorCount", 0), "firstSeen": claim.get("firstSeen"), "lastSeen": claim.get("lastSeen")}
+
+    def _top_claims(self, query: str, limit: int) -> list:
+        prop = next(prop for prop in ("postCount", "authorCount", "lastSeen") if f"ORDER BY c.{prop}" in query)
+        claims = [node for (label, _), node in self._nodes.items()
+                  if label == "Claim" and node.get("postCount", 0) > 0 and node.get(prop) is not None]
+        claims.sort(key=lambda claim: claim[prop], reverse=True)
+        return [MemoryRecord(self._claim_fields(claim)) for claim in claims[:limit]]
+
+    def _claim_spread(self, claim_id: str) -> list:
+        claim = next((node for (label, _), node in self._nodes.items() if label == "Claim" and node.get("claimId") == claim_id), None)
+        if claim is None:
+            return []
+        verdicts = [{"verdict": rel.end_node["value"], "posts": rel["posts"]}
+                    for rel in self._out[claim.element_id].values() if rel.type == "VERDICT_MIX"]
+        return [MemoryRecord(self._claim_fields(claim), verdicts=verdicts)]
+
+    @staticmethod
+    def _removed_targets(removed: dict):
+        if not removed:
+            return []
+        return [("CONTAINS_CLAIM", set(removed["claimsList"])), ("MENTIONS", set(removed["entitiesList"])),
+                ("HAS_KEYWORD", set(removed["keywordsList"])), ("HAS_HASHTAG", set(removed["hashtagsList"])),
+                ("MENTIONS_USER", set(removed["mentionsList"]))]
+
+    @staticmethod
+    def _rel_label(rel_type: str) -> str:
+        return {"CONTAINS_CLAIM": "Claim", "HAS_KEYWORD": "Keyword", "HAS_HASHTAG": "Hashtag"}.get(rel_type, "Entity")
+
+    def _delete_rel(self, rel: MemoryRelationship):
+        self._out[rel.start_node.element_id].pop((rel.type, rel.end_node.element_id), None)
+        self._in[rel.end_node.element_id].pop((rel.type, rel.start_node.element_id), None)
+
+    def _post_states(self, post_ids: list) -> list:
+        records = []
+        for post_id in post_ids:
+            post = self._nodes.get(("Post", post_id))
+            if post is None:
+                continue
+            lists = {field: [] for field in ("claimsList", "entitiesList", "keywordsList", "hashtagsList", "mentionsList")}
+            fields = {"CONTAINS_CLAIM": "claimsList", "MENTIONS": "entitiesList", "HAS_KEYWORD": "keywordsList",
+                      "HAS_HASHTAG": "hashtagsList", "MENTIONS_USER": "mentionsList"}
+            for rel in self._out[post.element_id].values():
+                if rel.type in fields:
+                    lists[fields[rel.type]].append(rel.end_node.get(_NODE_KEYS[self._rel_label(rel.type)]))
+            records.append(MemoryRecord(postId=post_id, contentHash=post.get("contentHash"), **lists))
+        return records
+
+    def _write_verdict(self, post: MemoryNode, verdict: str, source: str):
+        verdict_node = self._merge_node("FactCheckVerdict", verdict)
+        self._merge_rel(post, "HAS_VERDICT", verdict_node)
+        self._merge_rel(verdict_node, "FROM_SOURCE", self._merge_node("FactCheckSource", source))
+
+    def _subgraph(self, post: MemoryNode, depth: int, max_nodes: int, rel_types=None) -> list:
+        """Undirected breadth-first expansion, like apoc.path.subgraphNodes with a relationship filter."""
+        seen, order, frontier = {post.element_id}, [post], deque([(post, 0)])
+        while frontier and len(order) < max_nodes:
+            node, level = frontier.popleft()
+            if level >= depth:
+                continue
+            neighbours = itertools.chain(
+                (rel.end_node for rel in self._out[node.element_id].values() if not rel_types or rel.type in rel_types),
+                (rel.start_node for rel in self._in[node.element_id].values() if not rel_types or rel.type in rel_types),
+            )
+            for neighbour in neighbours:
+                if neighbour.element_id not in seen and len(order) < max_nodes:
+                    seen.add(neighbour.element_id)
+                    order.append(neighbour)
+                    frontier.append((neighbour, level + 1))
+        return order
+
+    def _post_graph_page(self, params: dict) -> list:
+        post = self._nodes.get(("Post", params["postId"]))
+        if post is None:
+            return []
+        rel_types = params.get("relTypes")
+        sub = self._subgraph(post, params["depth"], params["maxNodes"], rel_types)
+        members = {node.element_id for node in sub}
+        cursor = params.get("cursor")
+        page = sorted((n for n in sub if cursor is None or n.element_id > cursor), key=lambda n: n.element_id)[:params["pageSize"]]
+        records = []
+        for node in page:
+            out_links = [
+                {"rel": rel, "targetId": rel.end_node.get("id", rel.end_node.element_id)}
+                for rel in self._out[node.element_id].values()
+                if rel.end_node.element_id in members and (not rel_types or rel.type in rel_types)
+            ][:params["relLimit"]]
+            records.append(MemoryRecord(n=node, outLinks=out_links))
+        return records
+
+    def _post_graphs(self, params: dict) -> list:
+        records = []
+        for post_id in params["postIds"]:
+            post = self._nodes.get(("Post", post_id))
+            if post is None:
+                continue
+            nodes = self._subgraph(post, 2, params["maxNodes"])
+            members = {node.element_id for node in nodes}
+            rels = [rel for node in nodes for rel in self._out[node.element_id].values() if rel.end_node.element_id in members]
+            records.append(MemoryRecord(postId=post_id, nodes=nodes, relationships=rels[:params["relLimit"]],
+                                        truncated=len(nodes) >= params["maxNodes"] or len(rels) > params["relLimit"]))
+        return records
+
+    def _summary(self, post_id: str) -> list:
+        post = self._nodes.get(("Post", post_id))
+        if post is None:
+            return []
+        verdict = next((rel.end_node for rel in self._out[post.element_id].values() if rel.type == "HAS_VERDICT"), None)
+        source = next((rel.end_node for rel in self._out[verdict.element_id].values() if rel.type == "FROM_SOURCE"), None) if verdict else None
+        return [MemoryRecord(summary=post.get("summary"), verdict=verdict and verdict["value"], verdictSource=source and source["name"])]
+
+    def execute(self, query: str, params: dict = None) -> list:
+        """Dispatches a Cypher statement issued by GraphAgent to the matching in-memory handler."""
+        params = params or {}
+        with self._lock:
+            if "CALL { UNWIND $authors" in query:
+                # Shared-node pre-MERGE; the post write below merges the same nodes again.
+                shared = {"authors": "Author", "timestamps": "Timestamp", "verdicts": "FactCheckVerdict", "sources": "FactCheckSource",
+                          "claims": "Claim", "entities": "Entity", "keywords": "Keyword", "hashtags": "Hashtag"}
+                for param, label in shared.items():
+                    for key in params.get(param, []):
+                        if label == "Claim":
+                            claim = self._merge_node(label, key["text"])
+                            claim.setdefault("claimId", key["id"])
+                        else:
+                            self._merge_node(label, key)
+                return []
+            if "UNWIND $rows" in query:
+                return self._write_posts(params["rows"])
+            if "MERGE (v:FactCheckVerdict" in query and "postId" in params:
+                post = self._nodes.get(("Post", params["postId"]))
+                if post is not None:
+                    previous_verdict, post["verdict"] = post.get("verdict"), params["verdictValue"]
+                    self._write_verdict(post, params["verdictValue"], params["sourceName"])
+                    self._move_verdict_mix(post, previous_verdict)
+                return []
+            if "c.postCount > 0" in query:
+                return self._top_claims(query, params["limit"])
+            if "claimId" in params:
+                return self._claim_spread(params["claimId"])
+            if "$pageSize" in query:
+                return self._post_graph_page(params)
+            if "contentHash AS contentHash" in query:
+                return self._post_states(params["postIds"])
+            if "postIds" in params:
+                return self._post_graphs(params)
+            if "p.summary AS summary" in query:
+                return self._summary(params["postId"])
+            if "MATCH (e:Entity)" in query:
+                # Name index seeding: existing Entity, Keyword and Claim names.
+                limits = {"Entity": params["entityLimit"], "Keyword": params["seedLimit"], "Claim": params["seedLimit"]}
+                names = [(label, key) for label, key in self._nodes if label in limits]
+                return [MemoryRecord(label=label, name=key)
+                        for wanted in limits for label, key in [n for n in names if n[0] == wanted][:limits[wanted]]]
+        raise NotImplementedError(f"InMemoryGraphStore does not understand this query: {' '.join(query.split())[:120]}")
+
+    # --- AsyncNeo4jService interface -------------------------------------
+
+    async def read(self, query: str, params: dict = None) -> list:
+        self.calls["read"] += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self.execute(query, params)
+
+    async def write(self, query: str, params: dict = None) -> list:
+        self.calls["write"] += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self.execute(query, params)
+
+    async def write_batch(self, statements: list) -> list:
+        self.calls["write"] += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return [self.execute(query, params) for query, params in statements]
+
+    def stream_sync(self, query: str, params: dict = None):
+        self.calls["stream"] += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return _RecordStream(self.execute(query, params))
+
+    async def close(self):
+        pass
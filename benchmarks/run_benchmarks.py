@@ -0,0 +1,311 @@
+# benchmarks/run_benchmarks.py
+"""
+Offline benchmark harness. Starts a fake Groq server, swaps the graph store for an
+in-memory stand-in, serves the Flask app on a local port and drives the API at a
+controlled concurrency. Each scenario reports p50/p95/p99 latency and posts per second
+and is saved as JSON under benchmarks/results/ for regression comparison.
+
+    python benchmarks/run_benchmarks.py --scenario all --requests 200 --concurrency 16
+    python benchmarks/run_benchmarks.py --scenario process-post --compare benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, 'backend'))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_groq import FakeGroqServer
+from graph_store import InMemoryGraphStore
+
+SCENARIOS = ("process-post", "load-dataset", "post-graph", "claims-similar")
+
+_SUBJECTS = ["The World Health Organization", "NASA", "Bill Gates", "The CDC", "A new Harvard study", "Doctors in Italy",
+             "The European Union", "Pfizer", "Local officials in Texas", "The FDA", "Researchers at Oxford"]
+_PREDICATES = ["confirmed that", "denied reports that", "warned that", "quietly admitted that", "published data showing that"]
+_OBJECTS = ["vitamin C cures the flu", "5G towers spread viruses", "the vaccine alters DNA", "masks reduce transmission",
+            "drinking hot water kills the virus", "the moon landing footage was edited", "garlic prevents infection",
+            "the new variant is less severe", "hospital admissions fell by half", "tap water contains nanobots"]
+_FILLER = ("Experts reviewing the evidence said the findings were preliminary and had not been peer reviewed. "
+           "Social media users shared the claim thousands of times within hours of it first appearing. ")
+
+def synthetic_posts(count: int, seed: int = 7, duplicate_rate: float = 0.1, long_rate: float = 0.3) -> list:
+    """Dataset-shaped rows: a mix of tweet-sized and article-sized posts, with some near-duplicate reposts."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        if rows and rng.random() < duplicate_rate:
+            text = rng.choice(rows)["inputs_pretokenized"] + f" https://t.co/{rng.randrange(10**6)} #repost"
+        else:
+            text = f"{rng.choice(_SUBJECTS)} {rng.choice(_PREDICATES)} {rng.choice(_OBJECTS)}. #health @user{rng.randrange(50)}"
+            if rng.random() < long_rate:
+                text += " " + _FILLER * rng.randint(2, 8)
+        rows.append({
+            "inputs_pretokenized": text,
+            "targets_pretokenized": rng.choice(["true", "false", "mixture"]),
+            "date": f"2023-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+            "author": f"user{rng.randrange(200)}",
+        })
+    return rows
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize_latencies(latencies: list) -> dict:
+    values = sorted(latency * 1000 for latency in latencies)
+    return {
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "mean": round(sum(values) / len(values), 2) if values else 0.0,
+        "max": round(values[-1], 2) if values else 0.0,
+    }
+
+class BenchmarkEnvironment:
+    """Owns the fake Groq server, the in-memory graph store and the app server for one run."""
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix="graphrag-bench-")
+        self.groq = FakeGroqServer(latency_ms=args.groq_latency_ms, jitter_ms=args.groq_jitter_ms, rate_429=args.groq_429_rate,
+                                   malformed_rate=args.groq_malformed_rate, retry_after_s=args.groq_retry_after, seed=args.seed).start()
+        # Configuration is read at import time, so the environment must be set before the app is imported.
+        os.environ.update({
+            "GROQ_API_KEY": "bench-key",
+            "GROQ_BASE_URL": self.groq.url,
+            "NEO4J_URI": "",
+            "GROQ_REQUESTS_PER_MINUTE": str(args.groq_rpm),
+            "GROQ_TOKENS_PER_MINUTE": str(args.groq_tpm),
+            "EXTRACTION_TIER_MODE": args.tier_mode,
+            "EXTRACTION_CACHE_PATH": os.path.join(self.workdir, "extraction_cache.sqlite3"),
+            "NEAR_DUP_INDEX_PATH": os.path.join(self.workdir, "near_duplicates.sqlite3"),
+            "INGEST_CHECKPOINT_DIR": os.path.join(self.workdir, "jobs"),
+            "CLAIM_INDEX_DIR": os.path.join(self.workdir, "claim_index"),
+        })
+        from werkzeug.serving import make_server
+        from app import app
+        from agents.graph_agent import graph_agent
+        from agents.dataset_loader import dataset_loader
+        from agents.claim_analytics import claim_analytics
+        from services.groq_service import groq_service
+
+        self.store = InMemoryGraphStore(latency_ms=args.graph_latency_ms)
+        self.graph_agent = graph_agent
+        self.groq_service = groq_service
+        graph_agent.neo4j = self.store
+        claim_analytics.neo4j = self.store
+        groq_service.get_client()  # build the lazily created clients before anything is timed, as a warmed-up server would
+        self._dataset_rows = []
+        # /load-dataset reads from the synthetic rows instead of the Hugging Face hub.
+        dataset_loader.iter_hf_dataset = lambda name, config=None, split='train', start=0, limit=None, streaming=True: (
+            iter(self._dataset_rows[start:limit]), len(self._dataset_rows[:limit])
+        )
+        self.app_server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=self.app_server.serve_forever, name="bench-app", daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.app_server.server_port}/api/graph"
+
+    def close(self):
+        self.app_server.shutdown()
+        self.groq.stop()
+
+    def request(self, method: str, path: str, payload: dict = None, timeout: float = 120.0):
+        """Returns (status, latency seconds, parsed body or None)."""
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers={"Content-Type": "application/json"})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                body = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            body, status = e.read(), e.code
+        except (urllib.error.URLError, TimeoutError) as e:
+            return 0, time.perf_counter() - started, {"error": str(e)}
+        latency = time.perf_counter() - started
+        try:
+            return status, latency, json.loads(body) if body else None
+        except ValueError:
+            return status, latency, None  # NDJSON and other non-JSON bodies
+
+    def drive(self, calls: list, concurrency: int) -> dict:
+        """Runs (method, path, payload) calls on `concurrency` client threads and aggregates the outcomes."""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(lambda call: self.request(*call), calls))
+        wall = time.perf_counter() - started
+        return {"outcomes": outcomes, "wall_seconds": wall}
+
+def _result(env, scenario: str, driven: dict, successes: int, extra: dict = None) -> dict:
+    outcomes, wall = driven["outcomes"], driven["wall_seconds"]
+    statuses = Counter(str(status) for status, _, _ in outcomes)
+    return {
+        "scenario": scenario,
+        "requests": len(outcomes),
+        "concurrency": env.args.concurrency,
+        "status_counts": dict(statuses),
+        "errors": sum(count for status, count in statuses.items() if not status.startswith("2")),
+        "latency_ms": summarize_latencies([latency for _, latency, _ in outcomes]),
+        "posts_per_second": round(successes / wall, 2) if wall > 0 else 0.0,
+        "wall_seconds": round(wall, 3),
+        **(extra or {}),
+    }
+
+def run_process_post(env) -> dict:
+    rows = synthetic_posts(env.args.requests, env.args.seed, env.args.duplicate_rate)
+    calls = [("POST", "/process-post", {"id": f"bench_post_{i}", "text": row["inputs_pretokenized"], "author": row["author"],
+                                         "date": row["date"], "label": row["targets_pretokenized"]})
+             for i, row in enumerate(rows)]
+    driven = env.drive(calls, env.args.concurrency)
+    successes = sum(1 for status, _, body in driven["outcomes"] if status == 200 and body and body.get("status") == "success")
+    tiers = Counter(body.get("extraction_tier") for status, _, body in driven["outcomes"] if status == 200 and body)
+    return _result(env, "process-post", driven, successes, {"extraction_tiers": dict(tiers)})
+
+def run_load_dataset(env) -> dict:
+    env._dataset_rows = synthetic_posts(env.args.requests, env.args.seed + 1, env.args.duplicate_rate)
+    started = time.perf_counter()
+    status, latency, body = env.request("POST", "/load-dataset", {"dataset_name": "bench/synthetic", "limit": len(env._dataset_rows),
+                                                                  "restart": True})
+    job = body or {}
+    while status == 202 and job.get("status") in ("pending", "running", None):
+        time.sleep(0.1)
+        _, _, job = env.request("GET", f"/jobs/{body['job_id']}")
+        job = job or {}
+    wall = time.perf_counter() - started
+    driven = {"outcomes": [(status, latency, body)], "wall_seconds": wall}
+    return _result(env, "load-dataset", driven, job.get("processed_successfully", 0), {
+        "job_status": job.get("status"),
+        "failed_to_process": job.get("failed_to_process"),
+        "job_items_per_second": job.get("items_per_second"),
+    })
+
+def _seed_store(env) -> list:
+    """Post ids in the store, seeding it through the normal extraction + bulk write path if it is empty."""
+    post_ids = env.store.post_ids()
+    if not post_ids:
+        import asyncio
+        rows = synthetic_posts(max(env.args.requests // 4, 10), env.args.seed + 2, 0.0)
+        items = [{**row, "id": f"bench_graph_{i}"} for i, row in enumerate(rows)]
+        prepared = asyncio.run(env.graph_agent.prepare_posts(items))
+        asyncio.run(env.graph_agent.write_posts_bulk([res["params"] for res in prepared if res["status"] == "prepared"]))
+        post_ids = env.store.post_ids()
+    return post_ids
+
+def run_post_graph(env) -> dict:
+    post_ids = _seed_store(env)
+    rng = random.Random(env.args.seed)
+    query = "?depth=2&format=ndjson" if env.args.ndjson else "?depth=2"
+    calls = [("GET", f"/post-graph/{rng.choice(post_ids)}{query}", None) for _ in range(env.args.requests)]
+    driven = env.drive(calls, env.args.concurrency)
+    successes = sum(1 for status, _, _ in driven["outcomes"] if status == 200)
+    return _result(env, "post-graph", driven, successes, {
+        "graph_nodes": env.store.node_count(),
+        "response_cache": env.graph_agent.response_cache.stats(),
+    })
+
+def run_claims_similar(env) -> dict:
+    _seed_store(env)
+    rng = random.Random(env.args.seed)
+    # Paraphrase-like queries: a subject/object pairing that may or may not have been posted.
+    calls = [("POST", "/claims/similar", {"claims": [f"{rng.choice(_SUBJECTS)} says {rng.choice(_OBJECTS)}" for _ in range(5)], "k": 5})
+             for _ in range(env.args.requests)]
+    driven = env.drive(calls, env.args.concurrency)
+    successes = sum(1 for status, _, _ in driven["outcomes"] if status == 200)
+    return _result(env, "claims-similar", driven, successes, {"claim_index": env.graph_agent.claim_index.stats()})
+
+RUNNERS = {"process-post": run_process_post, "load-dataset": run_load_dataset, "post-graph": run_post_graph,
+           "claims-similar": run_claims_similar}
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def compare(current: dict, baseline: dict) -> list:
+    """Lines describing how each scenario moved relative to the baseline run."""
+    lines = []
+    previous = {result["scenario"]: result for result in baseline.get("results", [])}
+    for result in current["results"]:
+        old = previous.get(result["scenario"])
+        if not old:
+            continue
+        for label, new_value, old_value in (
+            ("p50 ms", result["latency_ms"]["p50"], old["latency_ms"]["p50"]),
+            ("p95 ms", result["latency_ms"]["p95"], old["latency_ms"]["p95"]),
+            ("p99 ms", result["latency_ms"]["p99"], old["latency_ms"]["p99"]),
+            ("posts/s", result["posts_per_second"], old["posts_per_second"]),
+        ):
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            lines.append(f"  {result['scenario']:<13} {label:<8} {old_value:>10} -> {new_value:>10} ({change:+.1f}%)")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline GraphRAG backend benchmarks.")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario (posts for load-dataset).")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Share of synthetic posts that repost an earlier one.")
+    parser.add_argument("--tier-mode", default="auto", choices=("auto", "local", "fast", "accurate"))
+    parser.add_argument("--ndjson", action="store_true", help="Request /post-graph as NDJSON streams.")
+    parser.add_argument("--groq-latency-ms", type=float, default=200.0)
+    parser.add_argument("--groq-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--groq-429-rate", type=float, default=0.0)
+    parser.add_argument("--groq-malformed-rate", type=float, default=0.0)
+    parser.add_argument("--groq-retry-after", type=float, default=0.5)
+    parser.add_argument("--groq-rpm", type=int, default=6000, help="Scheduler request budget; the fake server itself has no quota.")
+    parser.add_argument("--groq-tpm", type=int, default=10_000_000)
+    parser.add_argument("--graph-latency-ms", type=float, default=2.0, help="Simulated round trip per graph store call.")
+    parser.add_argument("--output-dir", default=os.path.join(BENCH_DIR, "results"))
+    parser.add_argument("--compare", help="A previous results JSON file to compare against.")
+    args = parser.parse_args()
+
+    env = BenchmarkEnvironment(args)
+    try:
+        scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+        results = []
+        for scenario in scenarios:
+            result = RUNNERS[scenario](env)
+            results.append(result)
+            latency = result["latency_ms"]
+            print(f"{scenario:<14} requests={result['requests']:<5} errors={result['errors']:<4} "
+                  f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms posts/s={result['posts_per_second']}")
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "parameters": vars(args),
+            "results": results,
+            "fake_groq": env.groq.stats(),
+            "llm_scheduler": env.groq_service.get_scheduler().stats(),
+            "graph_store_calls": env.store.calls,
+        }
+    finally:
+        env.close()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Results saved to {path}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            lines = compare(report, json.load(f))
+        print("Compared with " + args.compare + (":\n" + "\n".join(lines) if lines else ": no common scenarios."))
+
+if __name__ == "__main__":
+    main()
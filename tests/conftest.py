@@ -1,6 +1,11 @@
+import os
+import sys
 import pytest
 import asyncio
 
+# Backend modules import each other as top-level packages (`from agents... import`), as when run from backend/.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for each test case."""
@@ -0,0 +1,85 @@
+import asyncio
+import json
+from flask import Flask, Response, g, jsonify
+from asgi import FlaskASGI
+
+def make_app():
+    app = Flask(__name__)
+    gate = {}
+
+    @app.before_request
+    def before():
+        g.seen = "hook"
+
+    @app.after_request
+    def after(response):
+        response.headers['X-Hook'] = g.seen
+        return response
+
+    @app.route('/wait')
+    async def wait():
+        # Completes only once every concurrent request is waiting here at the same time.
+        gate['waiting'] += 1
+        if gate['waiting'] == gate['expected']:
+            gate['event'].set()
+        await gate['event'].wait()
+        return jsonify({"ok": True})
+
+    @app.route('/boom')
+    async def boom():
+        raise ValueError("boom")
+
+    @app.route('/stream')
+    async def stream():
+        return Response((line for line in ("a\n", "b\n")), mimetype='text/plain')
+
+    @app.route('/sync')
+    def sync_view():
+        return jsonify({"sync": True})
+
+    return app, gate
+
+async def call(application, path: str) -> dict:
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'headers': [], 'query_string': b''}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    return {
+        "status": sent[0]['status'],
+        "headers": dict(sent[0]['headers']),
+        "body": b''.join(message.get('body', b'') for message in sent[1:]),
+    }
+
+def test_async_views_do_not_hold_a_thread_while_awaiting():
+    app, gate = make_app()
+    application = FlaskASGI(app, max_threads=1)
+
+    async def run_concurrently():
+        gate.update(waiting=0, expected=3, event=asyncio.Event())
+        return await asyncio.wait_for(asyncio.gather(*(call(application, '/wait') for _ in range(3))), 5)
+
+    responses = asyncio.run(run_concurrently())
+    assert [response["status"] for response in responses] == [200, 200, 200]
+    assert all(response["headers"][b'x-hook'] == b'hook' for response in responses)
+
+def test_async_view_errors_go_through_flask_error_handling():
+    app, _ = make_app()
+    response = asyncio.run(call(FlaskASGI(app, max_threads=1), '/boom'))
+
+    assert response["status"] == 500
+
+def test_streamed_and_sync_responses_are_served():
+    app, _ = make_app()
+    application = FlaskASGI(app, max_threads=1)
+
+    streamed = asyncio.run(call(application, '/stream'))
+    assert (streamed["status"], streamed["body"]) == (200, b"a\nb\n")
+    sync = asyncio.run(call(application, '/sync'))
+    assert (sync["status"], sync["headers"][b'x-hook'], json.loads(sync["body"])) == (200, b'hook', {"sync": True})
+    assert asyncio.run(call(application, '/missing'))["status"] == 404
@@ -0,0 +1,64 @@
+from services.canonical_index import CanonicalIndex, normalize_key
+
+def test_normalize_key_folds_case_punctuation_and_leading_article():
+    assert normalize_key("W.H.O.") == "who"
+    assert normalize_key("The  World-Health Organization") == "world health organization"
+    assert normalize_key("Gates's") == normalize_key("Gates’s") == "gatess"
+
+def test_variants_resolve_to_the_first_seen_form():
+    index = CanonicalIndex(max_entries=100)
+
+    assert index.resolve_many("Keyword", ["Vaccines", "vaccines", "VACCINES!"]) == ["Vaccines"]
+    assert index.resolve("Keyword", "vaccines") == "Vaccines"
+    assert index.stats()["merged_variants"] == 3
+
+def test_acronym_resolves_to_its_expansion_and_back():
+    index = CanonicalIndex(max_entries=100)
+
+    assert index.resolve("Entity", "World Health Organization") == "World Health Organization"
+    assert index.resolve("Entity", "WHO") == "World Health Organization"
+
+    reverse = CanonicalIndex(max_entries=100)
+    assert reverse.resolve("Entity", "WHO") == "WHO"
+    assert reverse.resolve("Entity", "World Health Organization") == "WHO"
+
+def test_ambiguous_acronym_is_not_merged():
+    index = CanonicalIndex(max_entries=100)
+    index.resolve("Entity", "World Health Organization")
+    index.resolve("Entity", "Western Hockey Outfit")
+
+    assert index.resolve("Entity", "WHO") == "WHO"
+
+def test_labels_do_not_share_names():
+    index = CanonicalIndex(max_entries=100)
+    index.resolve("Keyword", "Health")
+
+    assert index.resolve("Entity", "health") == "health"
+
+def test_seeded_names_win_and_do_not_count_as_merged():
+    index = CanonicalIndex(max_entries=100)
+    index.seed("Entity", ["CDC", "cdc"])
+
+    assert index.resolve("Entity", "Cdc") == "CDC"
+    assert index.stats()["merged_variants"] == 1
+
+def test_full_index_passes_new_names_through():
+    index = CanonicalIndex(max_entries=1)
+    index.resolve("Keyword", "first")
+
+    assert index.resolve("Keyword", " Second ") == "Second"
+    assert index.stats()["entries"]["Keyword"] == 1
+
+def test_numeric_claims_are_not_merged():
+    index = CanonicalIndex(max_entries=100)
+
+    assert index.resolve_many("Claim", ["Vaccine is 9.5% effective", "Vaccine is 95% effective"]) == \
+        ["Vaccine is 9.5% effective", "Vaccine is 95% effective"]
+    assert index.resolve_many("Claim", ["Inflation is 3.5%", "Inflation is 35%", "Inflation is 3.5"]) == \
+        ["Inflation is 3.5%", "Inflation is 35%", "Inflation is 3.5"]
+    assert index.resolve_many("Claim", ["It costs $5", "It costs €5", "It costs 5"]) == ["It costs $5", "It costs €5", "It costs 5"]
+
+def test_numeric_keys_keep_decimal_points_and_units():
+    assert normalize_key("Inflation is 3.5%.") == "inflation is 3.5%"
+    assert normalize_key("U.S. debt hit $31.4 trillion") == "us debt hit $31.4 trillion"
+    assert normalize_key("COVID-19") == "covid 19"
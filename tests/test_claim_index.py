@@ -0,0 +1,22 @@
+from services.claim_index import ClaimVectorIndex
+
+def test_instances_sharing_a_directory_do_not_overwrite_each_others_rows(tmp_path):
+    first, second = ClaimVectorIndex(str(tmp_path), dim=64), ClaimVectorIndex(str(tmp_path), dim=64)
+
+    assert first.add(["vaccines cause autism"]) == 1
+    assert second.add(["the earth is flat"]) == 1
+    assert first.add(["the moon landing was staged", "the earth is flat"]) == 1
+
+    fresh = ClaimVectorIndex(str(tmp_path), dim=64)
+    assert fresh.stats()["indexed_claims"] == 3
+    for text in ("vaccines cause autism", "the earth is flat", "the moon landing was staged"):
+        best = fresh.search([text], k=1)[0][0]
+        assert (best["text"], best["score"]) == (text, 1.0)
+
+def test_damaged_vector_file_drops_texts_without_vectors(tmp_path):
+    index = ClaimVectorIndex(str(tmp_path), dim=64)
+    index.add(["vaccines cause autism"])
+    with open(index._vectors_path, 'r+b') as f:
+        f.truncate(0)
+
+    assert ClaimVectorIndex(str(tmp_path), dim=64).stats()["indexed_claims"] == 0
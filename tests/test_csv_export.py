@@ -0,0 +1,114 @@
+import asyncio
+import json
+import os
+from agents.csv_export import CsvGraphExport, load_csv_statements
+
+def make_row(post_id, claims=(), entities=(), author="alice", verdict="True", duplicate_of=None):
+    return {
+        "postId": post_id, "postContent": f"content of {post_id}", "postSummary": "", "authorName": author,
+        "timestampValue": "2024-01-01T00:00:00Z", "claimsList": list(claims), "entitiesList": list(entities),
+        "keywordsList": [], "hashtagsList": [], "mentionsList": [], "verdictValue": verdict, "verdictSource": "DatasetLabel",
+        "duplicateOf": duplicate_of, "duplicateSimilarity": 0.95 if duplicate_of else None,
+        "extractionTier": "local", "contentHash": "h", "removed": None,
+    }
+
+def export_rows(export, rows, next_index=None):
+    results = asyncio.run(export.write_posts_bulk(rows))
+    export.checkpoint(next_index)
+    return results
+
+def rows_of(export, kind, name):
+    shard_sets = export.nodes if kind == "nodes" else export.relationships
+    return list(shard_sets[name].read())
+
+def test_shared_nodes_are_written_once(tmp_path):
+    export = CsvGraphExport(str(tmp_path), shard_rows=100)
+    export.start_run({"dataset_name": "test"})
+    export_rows(export, [make_row("p1", claims=["c1"], entities=["WHO"]), make_row("p2", claims=["c1"], entities=["WHO", "CDC"])])
+    export.finish_run()
+
+    assert [row[0] for row in rows_of(export, "nodes", "Claim")] == ["c1"]
+    assert sorted(row[0] for row in rows_of(export, "nodes", "Entity")) == ["CDC", "WHO"]
+    assert [row[0] for row in rows_of(export, "nodes", "Author")] == ["alice"]
+    assert len(rows_of(export, "relationships", "CONTAINS_CLAIM")) == 2
+    assert len(rows_of(export, "relationships", "FROM_SOURCE")) == 1
+
+def test_posts_exported_by_an_earlier_run_are_unchanged(tmp_path):
+    export = CsvGraphExport(str(tmp_path), shard_rows=100)
+    export.start_run({})
+    export_rows(export, [make_row("p1", claims=["c1"])])
+    export.finish_run()
+
+    again = CsvGraphExport(str(tmp_path), shard_rows=100)
+    again.start_run({})
+    results = export_rows(again, [make_row("p1", claims=["c1"]), make_row("p2", claims=["c1"])])
+    again.finish_run()
+
+    assert [result["status"] for result in results] == ["unchanged", "success"]
+    assert [row[0] for row in rows_of(again, "nodes", "Post")] == ["p1", "p2"]
+    assert [row[0] for row in rows_of(again, "nodes", "Claim")] == ["c1"]
+
+def test_shards_rotate_and_headers_use_import_syntax(tmp_path):
+    export = CsvGraphExport(str(tmp_path), shard_rows=2)
+    export.start_run({})
+    export_rows(export, [make_row(f"p{i}") for i in range(5)])
+    export.finish_run()
+
+    assert len(export.manifest["nodes"]["Post"]["files"]) == 3
+    with open(tmp_path / "nodes" / "Post.header.csv") as f:
+        assert f.read().startswith("id:ID(Post),")
+    with open(tmp_path / "relationships" / "CREATED.header.csv") as f:
+        assert f.read().strip() == ":START_ID(Author),:END_ID(Post)"
+    assert "--nodes=Post=nodes/Post.header.csv,nodes/Post-run0001-00001.csv" in export.manifest["neo4j_admin_import"]
+
+def test_interrupted_run_resumes_from_its_last_checkpoint(tmp_path):
+    export = CsvGraphExport(str(tmp_path), shard_rows=100)
+    export.start_run({}, run_key="job")
+    export_rows(export, [make_row("p0")], next_index=1)
+    asyncio.run(export.write_posts_bulk([make_row("p1")]))  # written but never checkpointed
+    export.finish_run("interrupted")
+
+    resumed = CsvGraphExport(str(tmp_path), shard_rows=100)
+
+    assert resumed.start_run({}, run_key="job") == 1
+    assert [row[0] for row in rows_of(resumed, "nodes", "Post")] == ["p0"]
+    results = export_rows(resumed, [make_row("p1")], next_index=2)
+    resumed.finish_run()
+    assert results[0]["status"] == "success"
+    assert [run["status"] for run in json.load(open(tmp_path / "manifest.json"))["runs"]] == ["completed"]
+
+def test_unlisted_shards_are_removed_on_open(tmp_path):
+    CsvGraphExport(str(tmp_path), shard_rows=100)
+    stray = tmp_path / "nodes" / "Post-run0009-00001.csv"
+    stray.write_text("p9,x\n")
+
+    CsvGraphExport(str(tmp_path), shard_rows=100)
+
+    assert not os.path.exists(stray)
+
+def test_merge_keeps_the_first_export_of_each_post(tmp_path):
+    first = CsvGraphExport(str(tmp_path / "a"), shard_rows=100)
+    first.start_run({})
+    export_rows(first, [make_row("p1", claims=["c1"])])
+    first.finish_run()
+    second = CsvGraphExport(str(tmp_path / "b"), shard_rows=100)
+    second.start_run({})
+    export_rows(second, [make_row("p1", claims=["c2"]), make_row("p2", claims=["c1"], author="bob")])
+    second.finish_run()
+
+    merged = CsvGraphExport(str(tmp_path / "merged"), shard_rows=100)
+    merged.merge_from(str(tmp_path / "a"))
+    counts = merged.merge_from(str(tmp_path / "b"))
+
+    assert counts["posts"] == 1
+    assert sorted(row[0] for row in rows_of(merged, "nodes", "Post")) == ["p1", "p2"]
+    assert sorted(rows_of(merged, "relationships", "CONTAINS_CLAIM")) == [["p1", "c1"], ["p2", "c1"]]
+    assert sorted(row[0] for row in rows_of(merged, "nodes", "Claim")) == ["c1", "c2"]
+    assert len(rows_of(merged, "relationships", "FROM_SOURCE")) == 1
+
+def test_load_csv_statements_convert_typed_columns():
+    statements = load_csv_statements()
+
+    assert "n.createdAt = datetime(row[6])" in statements["nodes"]["Post"]
+    assert "n.seenAt = datetime(row[7])" in statements["nodes"]["Post"]
+    assert "r.similarity = toFloat(row[2])" in statements["relationships"]["DUPLICATE_OF"]
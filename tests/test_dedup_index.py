@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import patch
+from services.dedup_index import NearDuplicateIndex
+
+EXTRACTION = {"claims": ["Vaccines are safe"], "entities": ["WHO"], "summary": "s", "keywords": []}
+TEXT = "The World Health Organization says the new vaccines are safe and effective for adults and children"
+
+@pytest.fixture
+def index(tmp_path):
+    return NearDuplicateIndex(path=str(tmp_path / "dedup.sqlite3"), threshold=0.9, min_tokens=5)
+
+def test_repost_with_urls_and_tags_matches(index):
+    index.add("p1", TEXT, EXTRACTION)
+
+    match = index.find(TEXT + " https://t.co/abc #vaccines @who")
+
+    assert match == ("p1", 1.0, EXTRACTION)
+
+def test_unrelated_text_does_not_match(index):
+    index.add("p1", TEXT, EXTRACTION)
+
+    assert index.find("Stock markets fell sharply on Monday after the central bank raised interest rates again") is None
+
+def test_post_does_not_match_itself(index):
+    index.add("p1", TEXT, EXTRACTION)
+
+    assert index.find(TEXT, exclude_post_id="p1") is None
+
+def test_short_texts_are_not_fingerprinted(index):
+    index.add("p1", "too short", EXTRACTION)
+
+    assert index.find("too short") is None
+    assert index.stats()["indexed_posts"] == 0
+
+def test_fingerprints_persist(tmp_path, index):
+    index.add("p1", TEXT, EXTRACTION)
+    index.record_reused(2)
+
+    reopened = NearDuplicateIndex(path=index.path, threshold=0.9, min_tokens=5)
+
+    assert reopened.find(TEXT)[0] == "p1"
+    assert reopened.stats()["extractions_reused"] == 2
+
+def test_readding_a_post_replaces_its_fingerprint(index):
+    index.add("p1", TEXT, EXTRACTION)
+    index.add("p1", "Stock markets fell sharply on Monday after the central bank raised interest rates again", EXTRACTION)
+
+    assert index.find(TEXT) is None
+
+@pytest.mark.parametrize("threshold", [0.75, 0.5, 1.5])
+def test_thresholds_outside_the_banding_guarantee_are_rejected(tmp_path, threshold):
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(path=str(tmp_path / "dedup.sqlite3"), threshold=threshold)
+
+def test_every_fingerprint_within_max_distance_is_found_at_the_threshold(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path / "dedup.sqlite3"), threshold=0.76, min_tokens=1)
+    assert (index.max_distance, index.bands) == (15, 16)
+    original = 0x0123456789ABCDEF
+    # One flipped bit in each of the first 15 bands: only the last band still matches.
+    near = original ^ sum(1 << (band * 4) for band in range(15))
+    far = near ^ (1 << 60)
+
+    with patch.object(index, 'fingerprint', side_effect=[original, near, far]):
+        index.add("p1", "text", EXTRACTION)
+        assert index.find("text") == ("p1", round(1 - 15 / 64, 4), EXTRACTION)
+        assert index.find("text") is None
+
+def test_group_matches_near_duplicates_within_a_batch(index):
+    texts = [TEXT, "Stock markets fell sharply on Monday after the central bank raised interest rates again",
+             TEXT + " https://t.co/abc #vaccines", "short", TEXT]
+
+    assert index.group(texts) == {2: (0, 1.0), 4: (0, 1.0)}
+    assert index.stats()["indexed_posts"] == 0  # nothing in the batch is indexed before extraction
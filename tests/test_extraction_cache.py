@@ -0,0 +1,51 @@
+import time
+from services.extraction_cache import ExtractionCache
+
+def make_cache(tmp_path, **kwargs):
+    return ExtractionCache(path=str(tmp_path / "cache.sqlite3"), memory_entries=kwargs.pop("memory_entries", 8),
+                           disk_entries=kwargs.pop("disk_entries", 100), ttl_seconds=kwargs.pop("ttl_seconds", 0))
+
+def test_key_depends_on_model_prompt_and_text():
+    key = ExtractionCache.make_key("text", "prompt", "model")
+
+    assert key == ExtractionCache.make_key("text", "prompt", "model")
+    assert key != ExtractionCache.make_key("text", "prompt", "other-model")
+    assert key != ExtractionCache.make_key("text", "other prompt", "model")
+    # Parts are delimited, so moving a boundary changes the key.
+    assert ExtractionCache.make_key("ab", "c", "m") != ExtractionCache.make_key("b", "ac", "m")
+
+def test_set_then_get_counts_hits_and_misses(tmp_path):
+    cache = make_cache(tmp_path)
+    value = {"claims": ["c"], "entities": [], "summary": "s", "keywords": []}
+
+    assert cache.get("k") is None
+    cache.set("k", value)
+
+    assert cache.get("k") == value
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_entries_survive_a_new_instance(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set("k", {"summary": "persisted"})
+    cache.close()
+
+    assert make_cache(tmp_path).get("k") == {"summary": "persisted"}
+
+def test_expired_disk_entries_are_misses(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.set("k", {"summary": "old"})
+    cache.close()
+    conn = make_cache(tmp_path)._get_conn()
+    conn.execute("UPDATE extraction_cache SET created_at = ?", (time.time() - 120,))
+    conn.commit()
+
+    assert make_cache(tmp_path, ttl_seconds=60).get("k") is None
+
+def test_prune_keeps_the_most_recently_used_rows(tmp_path):
+    cache = make_cache(tmp_path, disk_entries=2)
+    conn = cache._get_conn()
+    for i, key in enumerate(("a", "b", "c")):
+        conn.execute("INSERT INTO extraction_cache VALUES (?, '{}', ?, ?)", (key, i, i))
+    cache._prune(conn, time.time())
+
+    assert sorted(row[0] for row in conn.execute("SELECT key FROM extraction_cache")) == ["b", "c"]
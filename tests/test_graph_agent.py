@@ -0,0 +1,304 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from agents.graph_agent import GraphAgent, POST_WRITE_QUERY, SHARED_NODES_QUERY, _shared_node_params
+from services.dedup_index import NearDuplicateIndex
+from services.extraction_cache import ExtractionCache
+
+class FakeNeo4j:
+    """Records write batches and confirms every post id unless told to fail."""
+    def __init__(self, fail_on_call: int = None):
+        self.batches = []
+        self.fail_on_call = fail_on_call
+
+    async def write_batch(self, statements):
+        self.batches.append(statements)
+        if self.fail_on_call == len(self.batches):
+            raise RuntimeError("deadlock")
+        rows = statements[-1][1]["rows"]
+        return [[], [{"postId": row['postId']} for row in rows]]
+
+@pytest.fixture
+def agent():
+    agent = GraphAgent()
+    agent.neo4j = FakeNeo4j()
+    agent.claim_index = MagicMock()
+    agent.local_extractor = MagicMock()
+    return agent
+
+def make_row(post_id, **fields):
+    row = {
+        "postId": post_id, "postContent": "text", "postSummary": "", "authorName": "Unknown", "timestampValue": None,
+        "claimsList": [], "entitiesList": [], "keywordsList": [], "hashtagsList": [], "mentionsList": [],
+        "verdictValue": None, "verdictSource": "DatasetLabel", "duplicateOf": None, "duplicateSimilarity": None,
+        "extractionTier": "local", "contentHash": "h", "removed": None,
+    }
+    row.update(fields)
+    return row
+
+def test_shared_node_params_are_sorted_and_deduplicated():
+    rows = [
+        make_row("p2", authorName="bob", entitiesList=["WHO", "CDC"], mentionsList=["alice"], verdictValue="True"),
+        make_row("p1", authorName="alice", entitiesList=["CDC"], claimsList=["b claim", "a claim"]),
+    ]
+    params = _shared_node_params(rows)
+
+    assert params["authors"] == ["alice", "bob"]
+    assert params["entities"] == ["CDC", "WHO", "alice"]
+    assert [claim["text"] for claim in params["claims"]] == ["a claim", "b claim"]
+    assert params["verdicts"] == ["True"]
+    assert params["sources"] == ["DatasetLabel"]  # only for rows that carry a verdict
+    assert params["timestamps"] == []
+
+def test_build_post_params_drops_non_string_and_duplicate_names():
+    post = {"post_id": "p1", "text": "Hello #Health @who", "author": "a", "timestamp": None, "verdict": None, "verdict_source": "x"}
+    params = GraphAgent._build_post_params(post, {"claims": ["b", "a", "b", None, ""], "entities": [3, "WHO"], "keywords": [], "summary": "s"})
+
+    assert params["claimsList"] == ["a", "b"]
+    assert params["entitiesList"] == ["WHO"]
+    assert params["hashtagsList"] and params["mentionsList"]
+
+@pytest.mark.parametrize("timestamp, seen_at", [
+    ("2024-01-01T10:00:00Z", "2024-01-01T10:00:00+00:00"),
+    ("2024-01-01T12:00:00+02:00", "2024-01-01T10:00:00+00:00"),
+    ("2024-01-01 10:00:00", "2024-01-01T10:00:00+00:00"),
+    ("April 12, 2017", "2017-04-12T00:00:00+00:00"),
+    ("last tuesday", None),
+    (None, None),
+])
+def test_build_post_params_normalizes_the_seen_time(timestamp, seen_at):
+    post = {"post_id": "p1", "text": "t", "author": "a", "timestamp": timestamp, "verdict": None, "verdict_source": "x"}
+
+    assert GraphAgent._build_post_params(post, {"claims": ["c"]})["seenAt"] == seen_at
+
+def test_post_write_moves_spread_off_a_replaced_author_and_recomputes_seen_times():
+    assert "MATCH (old:Author)-[created:CREATED]->(p) WHERE old <> a" in POST_WRITE_QUERY
+    assert "DELETE created" in POST_WRITE_QUERY
+    assert "previousSeenAt IN [n.firstSeen, n.lastSeen]" in POST_WRITE_QUERY
+    assert "toString(p.createdAt)" not in POST_WRITE_QUERY  # seen times are datetimes, never strings
+
+def test_write_posts_bulk_chunks_rows_into_one_transaction_each(agent):
+    rows = [make_row(f"p{i}") for i in range(5)]
+
+    results = asyncio.run(agent.write_posts_bulk(rows, chunk_size=2))
+
+    assert len(agent.neo4j.batches) == 3
+    for statements in agent.neo4j.batches:
+        assert [query for query, _ in statements] == [SHARED_NODES_QUERY, POST_WRITE_QUERY]
+    assert [result["post_id"] for result in results] == [f"p{i}" for i in range(5)]
+    assert all(result["status"] == "success" for result in results)
+
+def test_write_posts_bulk_writes_rows_in_post_id_order(agent):
+    asyncio.run(agent.write_posts_bulk([make_row("p3"), make_row("p1"), make_row("p2")]))
+
+    assert [row["postId"] for row in agent.neo4j.batches[0][1][1]["rows"]] == ["p1", "p2", "p3"]
+
+def test_write_posts_bulk_reports_failed_chunk_and_continues(agent):
+    agent.neo4j.fail_on_call = 1
+    rows = [make_row(f"p{i}") for i in range(4)]
+
+    results = asyncio.run(agent.write_posts_bulk(rows, chunk_size=2))
+
+    assert [result["status"] for result in results] == ["error", "error", "success", "success"]
+    assert "deadlock" in results[0]["message"]
+
+@pytest.fixture
+def cached_agent(agent, tmp_path):
+    agent.extraction_cache = ExtractionCache(path=str(tmp_path / "cache.sqlite3"), memory_entries=8, disk_entries=100, ttl_seconds=0)
+    agent.groq = MagicMock()
+    agent.groq.model_name.return_value = "test-model"
+    with patch('agents.graph_agent.Config.EXTRACTION_CACHE_ENABLED', True):
+        yield agent
+
+def test_wrongly_shaped_extraction_is_not_cached(cached_agent):
+    cached_agent.groq.invoke_llm_chain = AsyncMock(return_value='{"claims": "foo", "summary": "s"}')
+
+    result = asyncio.run(cached_agent._extract_with_groq("some text", "fast"))
+
+    assert result == {"claims": [], "entities": [], "summary": "", "keywords": []}
+    assert cached_agent.extraction_cache.get(cached_agent._cache_key("some text", "fast")) is None
+
+def test_valid_extraction_is_normalized_and_cached(cached_agent):
+    cached_agent.groq.invoke_llm_chain = AsyncMock(return_value='Sure! {"claims": ["c"], "summary": "s", "extra": 1}')
+
+    result = asyncio.run(cached_agent._extract_with_groq("some text", "fast"))
+
+    assert result == {"claims": ["c"], "entities": [], "summary": "s", "keywords": []}
+    assert cached_agent.extraction_cache.get(cached_agent._cache_key("some text", "fast")) == result
+
+def test_wrongly_shaped_cache_entry_is_ignored(cached_agent):
+    cached_agent.extraction_cache.set(cached_agent._cache_key("some text", "fast"), {"claims": "foo"})
+    cached_agent.groq.invoke_llm_chain = AsyncMock(return_value='{"claims": ["c"], "entities": [], "summary": "s", "keywords": []}')
+
+    assert asyncio.run(cached_agent._extract_with_groq("some text", "fast"))["claims"] == ["c"]
+
+def test_extract_many_treats_wrongly_shaped_cache_entries_as_misses(cached_agent):
+    valid = {"claims": ["v"], "entities": [], "summary": "s", "keywords": []}
+    cached_agent.extraction_cache.set(cached_agent._cache_key("valid text", "fast"), valid)
+    cached_agent.extraction_cache.set(cached_agent._cache_key("some text", "fast"), {"claims": "foo"})
+    cached_agent.groq.invoke_llm_chain = AsyncMock(return_value='{"claims": ["c"], "entities": [], "summary": "s", "keywords": []}')
+
+    results = asyncio.run(cached_agent.extract_many(["valid text", "some text"], "fast"))
+
+    assert [result["claims"] for result in results] == [["v"], ["c"]]
+    assert cached_agent.groq.invoke_llm_chain.await_count == 1
+
+class FakeNode(dict):
+    def __init__(self, element_id, labels, **properties):
+        super().__init__(properties)
+        self.element_id, self.labels = element_id, labels
+
+class FakeRel(dict):
+    def __init__(self, element_id, rel_type, start_node, end_node):
+        super().__init__()
+        self.element_id, self.type, self.start_node, self.end_node = element_id, rel_type, start_node, end_node
+
+class FakeGraphReader:
+    def __init__(self, responses):
+        self.responses, self.calls = list(responses), []
+
+    async def read(self, query, params):
+        self.calls.append((query, params))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+def test_post_graphs_are_capped_and_report_truncation(agent):
+    post, entity = FakeNode("e1", ["Post"], id="p1"), FakeNode("e2", ["Entity"], name="WHO")
+    link = FakeRel("r1", "MENTIONS", post, entity)
+    agent.neo4j = FakeGraphReader([[{"postId": "p1", "nodes": [post, entity], "relationships": [link], "truncated": True}]])
+
+    with patch('agents.graph_agent.Config.POST_GRAPH_MAX_NODES', 2), patch('agents.graph_agent.Config.POST_GRAPH_REL_LIMIT', 10):
+        graphs = asyncio.run(agent.get_post_graphs(["p1", "p2"]))
+
+    query, params = agent.neo4j.calls[0]
+    assert "limit: $maxNodes" in query and "[..$relLimit]" in query
+    assert (params["maxNodes"], params["relLimit"]) == (2, 10)
+    assert graphs["truncated"] == ["p1"] and graphs["missing"] == ["p2"]
+    assert graphs["links"] == [{"source": "p1", "target": "e2", "type": "MENTIONS", "properties": {}}]
+
+def test_post_graph_query_takes_links_from_the_apoc_subgraph(agent):
+    query = agent._post_graph_query(2)
+
+    assert "apoc.path.subgraphAll" in query and "apoc.map.groupByMulti" in query
+    assert " IN sub" not in query
+
+def test_post_graph_fallback_expands_level_by_level(agent):
+    query = agent._post_graph_query(3, ["MENTIONS", "HAS_CLAIM"], use_apoc=False)
+
+    assert "*" not in query.replace("[..", "")  # no variable-length pattern
+    assert query.count("MATCH (f)-[:MENTIONS|HAS_CLAIM]-(x) WHERE NOT x IN sub") == 3
+    assert "LIMIT $maxNodes" in query
+
+@pytest.mark.parametrize("message", [
+    "There is no procedure with the name `apoc.path.subgraphAll` registered",
+    "There is no procedure with the name `apoc.path.subgraphNodes` registered",
+    "Unknown function 'apoc.map.groupByMulti'",
+])
+def test_missing_apoc_is_detected_for_every_procedure_and_function(message):
+    assert GraphAgent._is_apoc_missing(Exception(message))
+
+def test_other_apoc_errors_are_not_mistaken_for_missing_apoc():
+    assert not GraphAgent._is_apoc_missing(Exception("apoc.path.subgraphAll failed: out of memory"))
+
+def test_post_graph_falls_back_when_the_apoc_grouping_function_is_missing(agent):
+    agent.neo4j = FakeGraphReader([Exception("Unknown function 'apoc.map.groupByMulti'"), []])
+
+    graph = asyncio.run(agent.get_post_graph("p1"))
+
+    assert graph == {"nodes": [], "links": [], "next_cursor": None}
+    assert "apoc." not in agent.neo4j.calls[1][0]
+
+def test_post_graphs_fall_back_to_a_bounded_query_without_apoc(agent):
+    post, entity = FakeNode("e1", ["Post"], id="p1"), FakeNode("e2", ["Entity"], name="WHO")
+    agent.neo4j = FakeGraphReader([
+        Exception("There is no procedure with the name `apoc.path.subgraphAll` registered"),
+        [{"postId": "p1", "p": post, "r": FakeRel("r1", "MENTIONS", post, entity), "n": entity}],
+    ])
+
+    with patch('agents.graph_agent.Config.POST_GRAPH_MAX_NODES', 2):
+        graphs = asyncio.run(agent.get_post_graphs(["p1"]))
+
+    query, params = agent.neo4j.calls[1]
+    assert "LIMIT $relLimit" in query and params["relLimit"] == 1
+    assert graphs["memberships"]["p1"]["nodes"] == ["p1", "e2"]
+    assert graphs["truncated"] == ["p1"]
+
+def test_parse_post_input_reads_text_and_label_of_submitted_posts(agent):
+    parsed = agent._parse_post_input({"id": "p1", "text": "Vaccines are safe", "label": "True"})
+
+    assert parsed["post_id"] == "p1" and parsed["text"] and parsed["verdict"] == "True"
+    assert "error" in agent._parse_post_input({"id": "p2", "label": "False"})
+
+def test_parse_post_input_prefers_dataset_columns(agent):
+    parsed = agent._parse_post_input({"id": "p1", "inputs_pretokenized": "from dataset", "targets_pretokenized": "false", "text": "x", "label": "true"})
+
+    assert parsed["text"] == "from dataset" and parsed["verdict"] == "False"
+
+def graph_page(*nodes, next_cursor=None):
+    return {"nodes": [{"id": node_id, "labels": [label], "properties": properties} for node_id, label, properties in nodes],
+            "links": [], "next_cursor": next_cursor}
+
+def cache_graph(agent, post_id, page):
+    with patch.object(agent, '_load_post_graph', AsyncMock(return_value=page)):
+        asyncio.run(agent.get_post_graph(post_id))
+
+def cached_graph_posts(agent):
+    return sorted(key[1] for key in agent.response_cache._data if key[0] == "graph")
+
+def test_write_evicts_cached_graphs_sharing_a_node_with_the_written_posts(agent):
+    cache_graph(agent, "a", graph_page(("a", "Post", {"id": "a"}), ("e1", "Entity", {"name": "WHO"})))
+    cache_graph(agent, "c", graph_page(("c", "Post", {"id": "c"}), ("e2", "Entity", {"name": "CDC"})))
+    cache_graph(agent, "d", graph_page(("d", "Post", {"id": "d"}), ("k1", "Keyword", {"text": "masks"}), next_cursor="next"))
+    agent.response_cache.set(("summary", "c"), {"summary": "s"})
+
+    asyncio.run(agent.write_posts_bulk([make_row("b", entitiesList=["WHO"])]))
+
+    assert cached_graph_posts(agent) == ["c"]  # "a" shares WHO; "d" is a partial page
+    assert agent.response_cache.get(("summary", "c")) == {"summary": "s"}
+
+def test_write_evicts_graphs_containing_the_written_post_or_unlinked_nodes(agent):
+    cache_graph(agent, "a", graph_page(("a", "Post", {"id": "a"}), ("b", "Post", {"id": "b"})))
+    cache_graph(agent, "c", graph_page(("c", "Post", {"id": "c"}), ("h1", "Hashtag", {"tag": "#old"})))
+    cache_graph(agent, "e", graph_page(("e", "Post", {"id": "e"})))
+
+    asyncio.run(agent.write_posts_bulk([make_row("b", removed={"hashtagsList": ["#old"]})]))
+
+    assert cached_graph_posts(agent) == ["e"]
+    assert asyncio.run(agent.get_post_graph("e"))["nodes"][0]["id"] == "e"
+
+def test_failed_extraction_does_not_store_the_content_fingerprint():
+    post = {"post_id": "p1", "text": "Hello", "author": "a", "timestamp": None, "verdict": None, "verdict_source": "x", "content_hash": "h"}
+
+    assert GraphAgent._build_post_params(post, {"claims": [], "entities": [], "keywords": [], "summary": ""})["contentHash"] is None
+    assert GraphAgent._build_post_params(post, {"claims": ["c"], "entities": [], "keywords": [], "summary": ""})["contentHash"] == "h"
+
+def test_post_stored_without_fingerprint_is_extracted_again(agent):
+    agent.fetch_post_states = AsyncMock(return_value={"p1": {"contentHash": None, "claimsList": []}})
+    posts = [{"post_id": "p1", "text": "Hello", "author": "a", "timestamp": None, "verdict": None, "verdict_source": "x"}]
+
+    with patch('agents.graph_agent.Config.SKIP_UNCHANGED_POSTS', True):
+        asyncio.run(agent._check_unchanged(posts))
+
+    assert posts[0]['unchanged'] is False
+
+def test_near_duplicates_within_a_batch_are_extracted_once(agent, tmp_path):
+    text = "The World Health Organization says the new vaccines are safe and effective for adults and children"
+    extraction = {"claims": ["Vaccines are safe"], "entities": ["WHO"], "keywords": [], "summary": "s"}
+    agent.dedup_index = NearDuplicateIndex(path=str(tmp_path / "dedup.sqlite3"), threshold=0.9, min_tokens=5)
+    agent.extract_tiered = AsyncMock(return_value=([extraction], ["fast"]))
+    items = [{"id": "p2", "inputs_pretokenized": text + " #vaccines"}, {"id": "p1", "inputs_pretokenized": text}]
+
+    with patch('agents.graph_agent.Config.NEAR_DUP_ENABLED', True):
+        results = asyncio.run(agent.prepare_posts(items, check_stored=False))
+
+    agent.extract_tiered.assert_awaited_once()
+    assert agent.extract_tiered.await_args.args[0] == [text + " #vaccines"]
+    leader, follower = (result["params"] for result in results)
+    assert (leader["duplicateOf"], leader["extractionTier"]) == (None, "fast")
+    assert (follower["duplicateOf"], follower["extractionTier"], follower["claimsList"]) == ("p2", "duplicate", ["Vaccines are safe"])
+    assert agent.dedup_index.stats()["extractions_reused"] == 1
+    # The follower sorts before its leader by post id but is written after it.
+    asyncio.run(agent._write_rows([follower, leader]))
+    assert [row["postId"] for row in agent.neo4j.batches[0][1][1]["rows"]] == ["p2", "p1"]
@@ -2,7 +2,7 @@ import pytest
 from flask import Flask
 from backend.routes.graph_routes import graph_bp
 import json
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 @pytest.fixture
 def app():
@@ -19,7 +19,7 @@ def client(app):
 def sample_post_data():
     return {
         "id": "test_post_1",
-        "content": "Test content",
+        "text": "Test content",
         "source": "twitter",
         "timestamp": "2024-01-01T00:00:00Z"
     }
@@ -33,11 +33,11 @@ def sample_dataset_request():
     }
 
 # Test process-post endpoint
-async def test_process_post(client, sample_post_data):
+def test_process_post(client, sample_post_data):
     with patch('backend.routes.graph_routes.graph_agent') as mock_agent:
-        mock_agent.process_post.return_value = {"status": "success", "post_id": "test_post_1"}
+        mock_agent.process_post = AsyncMock(return_value={"status": "success", "post_id": "test_post_1"})
         
-        response = await client.post('/process-post',
+        response = client.post('/process-post',
                                    json=sample_post_data,
                                    content_type='application/json')
         
@@ -45,52 +45,92 @@ async def test_process_post(client, sample_post_data):
         assert response.json['status'] == 'success'
 
 # Test load-dataset endpoint
-async def test_load_dataset(client, sample_dataset_request):
-    with patch('backend.routes.graph_routes.dataset_loader') as mock_loader, \
-         patch('backend.routes.graph_routes.graph_agent') as mock_agent:
+def test_load_dataset(client, sample_dataset_request):
+    with patch('backend.routes.graph_routes.ingestion_jobs') as mock_jobs, \
+         patch('backend.routes.graph_routes.Config.GROQ_API_KEY', 'test-key'):
+        mock_job = MagicMock(job_id="job123", status="pending", resumed_from=0)
+        mock_jobs.start.return_value = mock_job
         
-        mock_loader.load_hf_dataset.return_value = [{"id": "1", "content": "test"}]
-        mock_agent.process_post.return_value = {"status": "success", "post_id": "1"}
-        
-        response = await client.post('/load-dataset',
+        response = client.post('/load-dataset',
                                    json=sample_dataset_request,
                                    content_type='application/json')
         
+        assert response.status_code == 202
+        assert response.json['job_id'] == "job123"
+
+def test_load_dataset_with_extraction_policy(client, sample_dataset_request):
+    with patch('backend.routes.graph_routes.ingestion_jobs') as mock_jobs, \
+         patch('backend.routes.graph_routes.Config.GROQ_API_KEY', 'test-key'):
+        mock_jobs.start.return_value = MagicMock(job_id="job123", status="pending", resumed_from=0)
+        
+        response = client.post('/load-dataset',
+                                   json={**sample_dataset_request, "extraction_policy": {"mode": "fast"}},
+                                   content_type='application/json')
+        
+        assert response.status_code == 202
+        assert mock_jobs.start.call_args.kwargs['extraction_policy']['mode'] == "fast"
+
+# Test ingestion job endpoints
+def test_get_ingestion_job(client):
+    with patch('backend.routes.graph_routes.ingestion_jobs') as mock_jobs:
+        mock_jobs.get.return_value.to_dict.return_value = {"job_id": "job123", "status": "running", "processed_successfully": 5}
+        
+        response = client.get('/jobs/job123')
+        
         assert response.status_code == 200
-        assert response.json['total_items'] == 1
+        assert response.json['processed_successfully'] == 5
+
+def test_cancel_missing_ingestion_job(client):
+    with patch('backend.routes.graph_routes.ingestion_jobs') as mock_jobs:
+        mock_jobs.cancel.return_value = None
+        mock_jobs.get.return_value = None
+        
+        response = client.post('/jobs/nonexistent/cancel')
+        
+        assert response.status_code == 404
+
+def test_cancel_finished_ingestion_job(client):
+    with patch('backend.routes.graph_routes.ingestion_jobs') as mock_jobs:
+        mock_jobs.cancel.return_value = None
+        mock_jobs.get.return_value = MagicMock(status="completed")
+
+        response = client.post('/jobs/job123/cancel')
+
+        assert response.status_code == 409
+        assert response.json['status'] == "completed"
 
 # Test get-post-graph endpoint
-async def test_get_post_graph(client):
+def test_get_post_graph(client):
     test_graph_data = {
         "nodes": [{"id": "1", "label": "Post"}],
         "links": []
     }
     
     with patch('backend.routes.graph_routes.graph_agent') as mock_agent:
-        mock_agent.get_post_graph.return_value = test_graph_data
+        mock_agent.get_post_graph = AsyncMock(return_value=test_graph_data)
         
-        response = await client.get('/post-graph/test_post_1')
+        response = client.get('/post-graph/test_post_1')
         
         assert response.status_code == 200
         assert response.json == test_graph_data
 
 # Test post-summary endpoint
-async def test_get_post_summary(client):
+def test_get_post_summary(client):
     test_summary = {
         "summary": "Test summary",
         "verdict": "TRUE"
     }
     
     with patch('backend.routes.graph_routes.graph_agent') as mock_agent:
-        mock_agent.get_summary_and_verdict.return_value = test_summary
+        mock_agent.get_summary_and_verdict = AsyncMock(return_value=test_summary)
         
-        response = await client.get('/post-summary/test_post_1')
+        response = client.get('/post-summary/test_post_1')
         
         assert response.status_code == 200
         assert response.json == test_summary
 
 # Test update-verdict endpoint
-async def test_update_verdict(client):
+def test_update_verdict(client):
     verdict_data = {
         "post_id": "test_post_1",
         "verdict": "FALSE",
@@ -98,9 +138,9 @@ async def test_update_verdict(client):
     }
     
     with patch('backend.routes.graph_routes.graph_agent') as mock_agent:
-        mock_agent.neo4j.run_query = MagicMock()
+        mock_agent.update_verdict = AsyncMock()
         
-        response = await client.post('/update-verdict',
+        response = client.post('/update-verdict',
                                    json=verdict_data,
                                    content_type='application/json')
         
@@ -108,19 +148,109 @@ async def test_update_verdict(client):
         assert "success" in response.json['status']
 
 # Test error cases
-async def test_invalid_post_data(client):
+def test_invalid_post_data(client):
     invalid_data = {"wrong_field": "test"}
     
-    response = await client.post('/process-post',
+    response = client.post('/process-post',
                                json=invalid_data,
                                content_type='application/json')
     
     assert response.status_code == 400
 
-async def test_missing_post_graph(client):
+def test_missing_post_graph(client):
     with patch('backend.routes.graph_routes.graph_agent') as mock_agent:
-        mock_agent.get_post_graph.return_value = {"nodes": [], "links": []}
+        mock_agent.get_post_graph = AsyncMock(return_value={"nodes": [], "links": []})
         
-        response = await client.get('/post-graph/nonexistent_post')
+        response = client.get('/post-graph/nonexistent_post')
         
         assert response.status_code == 404
+
+def test_cache_stats(client):
+    with patch('backend.routes.graph_routes.graph_agent') as mock_agent:
+        mock_agent.extraction_cache.stats.return_value = {"hits": 3, "misses": 1, "hit_rate": 0.75}
+        for component in (mock_agent.response_cache, mock_agent.dedup_index, mock_agent.canonical_index, mock_agent.claim_index):
+            component.stats.return_value = {}
+        mock_agent.extraction_tier_stats.return_value = {}
+        
+        response = client.get('/cache-stats')
+        
+        assert response.status_code == 200
+        assert response.json['extraction']['hits'] == 3
+
+# Test batch post-graphs endpoint
+def test_get_post_graphs(client):
+    test_graph_data = {
+        "nodes": [{"id": "1", "labels": ["Post"]}, {"id": "2", "labels": ["Post"]}, {"id": "e1", "labels": ["Entity"]}],
+        "links": [{"source": "1", "target": "e1", "type": "MENTIONS"}, {"source": "2", "target": "e1", "type": "MENTIONS"}],
+        "memberships": {"1": {"nodes": ["1", "e1"], "links": [0]}, "2": {"nodes": ["2", "e1"], "links": [1]}},
+        "missing": []
+    }
+    
+    with patch('backend.routes.graph_routes.graph_agent') as mock_agent:
+        mock_agent.get_post_graphs = AsyncMock(return_value=test_graph_data)
+        
+        response = client.post('/post-graphs',
+                                   json={"post_ids": ["1", "2", "1"]},
+                                   content_type='application/json')
+        
+        assert response.status_code == 200
+        assert response.json == test_graph_data
+        mock_agent.get_post_graphs.assert_awaited_once_with(["1", "2"])
+
+def test_get_post_graphs_requires_ids(client):
+    response = client.post('/post-graphs',
+                               json={"post_ids": []},
+                               content_type='application/json')
+    
+    assert response.status_code == 400
+
+def test_post_graph_rejects_invalid_depth(client):
+    response = client.get('/post-graph/test_post_1?depth=99')
+    
+    assert response.status_code == 400
+
+def test_get_top_claims(client):
+    test_claims = [{"claimId": "c1", "text": "Claim 1", "postCount": 5, "authorCount": 3, "firstSeen": "2024-01-01T00:00:00Z", "lastSeen": "2024-02-01T00:00:00Z"}]
+    
+    with patch('backend.routes.graph_routes.claim_analytics') as mock_analytics:
+        mock_analytics.top_claims = AsyncMock(return_value=test_claims)
+        
+        response = client.get('/claims/top?sort=authors&limit=5')
+        
+        assert response.status_code == 200
+        assert response.json == {"sort": "authors", "claims": test_claims}
+        mock_analytics.top_claims.assert_awaited_once_with("authors", 5)
+
+def test_top_claims_rejects_invalid_sort(client):
+    response = client.get('/claims/top?sort=likes')
+    
+    assert response.status_code == 400
+
+def test_missing_claim_spread(client):
+    with patch('backend.routes.graph_routes.claim_analytics') as mock_analytics:
+        mock_analytics.claim_spread = AsyncMock(return_value=None)
+        
+        response = client.get('/claims/unknown/spread')
+        
+        assert response.status_code == 404
+
+def test_similar_claims(client):
+    test_results = [{"query": "Vaccines are safe", "matches": [{"claimId": "c1", "text": "The WHO says vaccines are safe.", "score": 0.66}]}]
+    
+    with patch('backend.routes.graph_routes.claim_analytics') as mock_analytics:
+        mock_analytics.similar_claims = AsyncMock(return_value=test_results)
+        
+        response = client.post('/claims/similar',
+                                   json={"claims": ["Vaccines are safe"], "k": 3},
+                                   content_type='application/json')
+        
+        assert response.status_code == 200
+        assert response.json == {"results": test_results}
+        mock_analytics.similar_claims.assert_awaited_once_with(["Vaccines are safe"], 3, 0.0)
+
+def test_similar_claims_requires_claims(client):
+    response = client.post('/claims/similar',
+                               json={"claims": []},
+                               content_type='application/json')
+    
+    assert response.status_code == 400
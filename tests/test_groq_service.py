@@ -0,0 +1,21 @@
+import asyncio
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from services.groq_service import groq_service
+
+def test_langchain_path_treats_system_prompt_braces_as_literal_text():
+    prompts = []
+
+    def fake_llm(prompt_value):
+        prompts.append(prompt_value.to_messages())
+        return AIMessage(content='{"claims": []}')
+
+    system_prompt = 'Return JSON like {"claims": ["..."], "summary": "..."} and nothing else.'
+    groq_service._chains.clear()
+    with patch.object(groq_service, 'get_llm_fast', return_value=RunnableLambda(fake_llm)):
+        reply = asyncio.run(groq_service.invoke_llm_chain(system_prompt, "a {post}", "fast", use_native=False))
+    groq_service._chains.clear()
+
+    assert reply == '{"claims": []}'
+    assert [message.content for message in prompts[0]] == [system_prompt, "a {post}"]
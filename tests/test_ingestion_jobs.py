@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from agents.ingestion_jobs import IngestionJob, IngestionJobManager
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = IngestionJobManager(checkpoint_dir=str(tmp_path))
+    with patch.object(IngestionJobManager, '_run_in_thread'):
+        yield manager
+
+def write_checkpoint(manager, status, heartbeat_age, next_index=40):
+    job = IngestionJob(manager.job_id_for("ds"), "ds")
+    job.status, job.next_index = status, next_index
+    manager._save_checkpoint(job)
+    with open(manager._checkpoint_path(job.job_id), encoding='utf-8') as f:
+        data = json.load(f)
+    data['heartbeat_at'] = time.time() - heartbeat_age
+    with open(manager._checkpoint_path(job.job_id), 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return job.job_id
+
+def test_cancel_only_accepts_active_jobs(manager):
+    job = manager.start("ds")
+
+    assert manager.cancel("unknown") is None
+    assert manager.cancel(job.job_id) is job and job.cancel_event.is_set()
+
+    job.status = "completed"
+    assert manager.cancel(job.job_id) is None
+
+def test_job_whose_lease_lapsed_is_interrupted_and_resumable(manager):
+    job_id = write_checkpoint(manager, "running", heartbeat_age=3600)
+    path = manager._checkpoint_path(job_id)
+    mtime = os.stat(path).st_mtime_ns
+
+    assert manager.get(job_id).status == "interrupted"
+    assert os.stat(path).st_mtime_ns == mtime  # reading a job never rewrites its checkpoint
+
+    job = manager.start("ds")
+
+    assert job.is_active and job.resumed_from == 40
+    manager._run_in_thread.assert_called_once()
+
+def test_job_holding_its_lease_elsewhere_is_not_started_twice(manager):
+    write_checkpoint(manager, "running", heartbeat_age=1)
+
+    job = manager.start("ds")
+
+    assert job.status == "running"
+    manager._run_in_thread.assert_not_called()
+
+def test_restart_overrides_a_job_holding_its_lease(manager):
+    write_checkpoint(manager, "running", heartbeat_age=1)
+
+    job = manager.start("ds", restart=True)
+
+    assert job.status == "pending" and job.resumed_from == 0
+    manager._run_in_thread.assert_called_once()
+
+def test_running_job_renews_its_lease(tmp_path):
+    manager = IngestionJobManager(checkpoint_dir=str(tmp_path))
+    job = IngestionJob(manager.job_id_for("ds"), "ds")
+    job.status = "running"
+
+    async def slow_run(job):
+        await asyncio.sleep(0.2)
+
+    with patch('agents.ingestion_jobs.Config.INGEST_HEARTBEAT_SECONDS', 0.02), \
+         patch('agents.ingestion_jobs.Config.SHARED_EVENT_LOOP', False), \
+         patch.object(manager, '_run', slow_run), \
+         patch.object(manager, '_save_checkpoint', wraps=manager._save_checkpoint) as save:
+        manager._run_in_thread(job)
+
+    assert save.call_count > 3
+    assert not job.lease_expired()
+
+def test_job_is_marked_failed_when_the_pipeline_raises(tmp_path):
+    manager = IngestionJobManager(checkpoint_dir=str(tmp_path))
+    job = IngestionJob(manager.job_id_for("ds"), "ds")
+    with patch('agents.ingestion_jobs.Config.SHARED_EVENT_LOOP', False), \
+         patch('agents.ingestion_jobs.dataset_loader.iter_hf_dataset', return_value=(iter([]), 0)), \
+         patch('agents.ingestion_jobs.run_ingestion_pipeline', AsyncMock(side_effect=RuntimeError("neo4j down"))):
+        manager._run_in_thread(job)
+
+    assert (job.status, job.error) == ("failed", "neo4j down")
+    assert manager.get(job.job_id).status == "failed"
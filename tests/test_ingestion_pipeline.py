@@ -0,0 +1,97 @@
+import asyncio
+import itertools
+import pytest
+from unittest.mock import patch
+from agents.ingestion_pipeline import IngestionStats, _buffered, run_ingestion_pipeline
+
+def run(coroutine, timeout: float = 2.0):
+    async def bounded():
+        return await asyncio.wait_for(coroutine, timeout)
+    return asyncio.run(bounded())
+
+def test_closing_early_with_a_full_queue_does_not_hang():
+    closed = []
+
+    async def source():
+        try:
+            for i in itertools.count():
+                yield i
+        finally:
+            closed.append(True)
+
+    async def consume_one():
+        stage = _buffered(source(), 1)
+        first = await stage.__anext__()
+        await asyncio.sleep(0.01)  # let the stage fill the queue and block on put
+        await stage.aclose()
+        return first
+
+    assert run(consume_one()) == 0
+    assert closed == [True]
+
+def test_stage_error_reaches_the_consumer_through_a_full_queue():
+    async def source():
+        yield 1
+        yield 2
+        raise ValueError("bad row")
+
+    async def consume():
+        seen = []
+        async for item in _buffered(source(), 1):
+            await asyncio.sleep(0.01)
+            seen.append(item)
+        return seen
+
+    with pytest.raises(ValueError, match="bad row"):
+        run(consume())
+
+class FailingWriter:
+    def __init__(self):
+        self.calls = 0
+
+    async def write_posts_bulk(self, rows):
+        self.calls += 1
+        raise RuntimeError("graph unavailable")
+
+def test_write_failure_stops_the_pipeline_instead_of_hanging():
+    extracted, cancelled = [], []
+
+    async def prepare_posts(items, policy=None, check_stored=True):
+        extracted.append(len(items))
+        try:
+            if len(extracted) > 1:
+                await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return [{"post_id": item['id'], "status": "prepared", "params": {"postId": item['id']}} for item in items]
+
+    endless_rows = ({"text": f"post {i}"} for i in itertools.count())
+    writer = FailingWriter()
+    with patch('agents.ingestion_pipeline.graph_agent.prepare_posts', prepare_posts), \
+         patch('agents.ingestion_pipeline.Config.INGEST_QUEUE_SIZE', 1), \
+         patch('agents.ingestion_pipeline.Config.INGEST_CHUNK_SIZE', 2), \
+         patch('agents.ingestion_pipeline.Config.INGEST_PARALLEL_CHUNKS', 2):
+        with pytest.raises(RuntimeError, match="graph unavailable"):
+            run(run_ingestion_pipeline(endless_rows, "test", writer=writer))
+
+    assert writer.calls == 1
+    assert cancelled  # chunks still extracting were cancelled, not left running
+
+def test_pipeline_commits_chunks_in_order():
+    async def prepare_posts(items, policy=None, check_stored=True):
+        return [{"post_id": item['id'], "status": "prepared", "params": {"postId": item['id']}} for item in items]
+
+    class Writer:
+        async def write_posts_bulk(self, rows):
+            return [{"post_id": row['postId'], "status": "success"} for row in rows]
+
+    commits = []
+    with patch('agents.ingestion_pipeline.graph_agent.prepare_posts', prepare_posts), \
+         patch('agents.ingestion_pipeline.Config.INGEST_CHUNK_SIZE', 2):
+        stats = run(run_ingestion_pipeline([{"text": str(i)} for i in range(5)], "test", start_index=10, writer=Writer(),
+                                           on_commit=lambda next_index, stats: commits.append(next_index)))
+
+    assert commits == [12, 14, 15]
+    assert isinstance(stats, IngestionStats) and stats.processed == 5
+    assert stats.sample_of_processed_ids[0] == "test_10"
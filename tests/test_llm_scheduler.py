@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from services.llm_scheduler import LLMScheduler, TokenBucket
+
+class RateLimited(Exception):
+    def __init__(self, retry_after_ms: str = None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = type("Response", (), {"headers": {"retry-after-ms": retry_after_ms} if retry_after_ms else {}})()
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=60)  # one unit per second
+    now = bucket._last_refill
+
+    assert bucket.wait_time(60, now) == 0.0
+    bucket.consume(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+
+def test_token_bucket_caps_requests_at_capacity():
+    bucket = TokenBucket(per_minute=60)
+
+    assert bucket.wait_time(1000, bucket._last_refill) == 0.0
+
+def test_rate_limited_call_is_retried_after_retry_after():
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=4)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RateLimited(retry_after_ms="10")
+        return "ok"
+
+    assert asyncio.run(scheduler.run(call)) == "ok"
+    stats = scheduler.stats()
+    assert (stats["rate_limited"], stats["retries"], stats["completed"], stats["in_flight"]) == (1, 1, 1, 0)
+
+def test_rate_limit_gives_up_after_max_retries():
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=4, max_retries=1)
+
+    async def call():
+        raise RateLimited(retry_after_ms="1")
+
+    with pytest.raises(RateLimited):
+        asyncio.run(scheduler.run(call))
+    assert scheduler.stats()["retries"] == 1
+
+def test_other_errors_halve_the_window_and_are_not_retried():
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=8)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(call))
+    assert len(attempts) == 1
+    assert scheduler.concurrency_limit == 4
+    assert scheduler.stats()["in_flight"] == 0
+
+def test_successes_grow_the_window_up_to_the_maximum():
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=4)
+    scheduler._concurrency_limit = 1.0
+
+    async def call():
+        return None
+
+    async def run_many():
+        for _ in range(20):
+            await scheduler.run(call)
+
+    asyncio.run(run_many())
+    assert scheduler.concurrency_limit == 4
+
+def test_concurrency_never_exceeds_the_window():
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=2)
+    in_flight, peak = [0], [0]
+
+    async def call():
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+
+    async def run_many():
+        await asyncio.gather(*(scheduler.run(call) for _ in range(6)))
+
+    asyncio.run(run_many())
+    assert peak[0] == 2
+
+def test_cancelled_call_releases_its_slot():
+    scheduler = LLMScheduler(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=1)
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def cancel_then_call():
+        task = asyncio.create_task(scheduler.run(hang))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert scheduler.stats()["in_flight"] == 0
+        assert await asyncio.wait_for(scheduler.run(lambda: asyncio.sleep(0, "ok")), 1.0) == "ok"
+
+    asyncio.run(cancel_then_call())
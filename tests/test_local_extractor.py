@@ -0,0 +1,31 @@
+from agents.local_extractor import LocalExtractor
+from config import Config
+
+THRESHOLD = Config.EXTRACTION_LOCAL_MIN_CONFIDENCE
+
+def test_ordinary_sentence_escalates():
+    result = LocalExtractor().extract("Vaccines are safe.")
+
+    assert result["claims"] == ["Vaccines are safe."]
+    assert result["entities"] == []  # capitalized only because it opens the sentence
+    assert result["confidence"] < THRESHOLD
+
+def test_claim_about_a_known_entity_stays_local():
+    extractor = LocalExtractor()
+    extractor.add_to_gazetteer(["World Health Organization"])
+
+    result = extractor.extract("The World Health Organization says vaccines are safe.")
+    assert "World Health Organization" in result["entities"]
+    assert result["confidence"] >= THRESHOLD
+
+def test_one_capitalized_name_is_not_enough():
+    result = LocalExtractor().extract("Experts say Pfizer is hiding data.")
+
+    assert result["entities"] == ["Pfizer"]
+    assert result["confidence"] < THRESHOLD
+    assert LocalExtractor().extract("Experts say Pfizer is hiding data from the FDA.")["confidence"] >= THRESHOLD
+
+def test_sentence_initial_acronyms_and_multiword_names_are_entities():
+    result = LocalExtractor().extract("WHO confirms it. Bill Gates funds vaccines.")
+
+    assert result["entities"] == ["WHO", "Bill Gates"]
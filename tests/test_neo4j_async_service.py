@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from neo4j import exceptions
+from services.neo4j_async_service import AsyncNeo4jService, contention_kind
+
+MERGE_ENTITY = "UNWIND $names AS name MERGE (:Entity {name: name})"
+SET_CLAIM_ID = "UNWIND $claims AS claim MERGE (c:Claim {text: claim.text}) SET c.claimId = claim.id"
+
+def neo4j_error(code, message="conflict"):
+    return exceptions.Neo4jError._hydrate_neo4j(code=code, message=message)
+
+def uniqueness_violation(label, key):
+    return neo4j_error("Neo.ClientError.Schema.ConstraintValidationFailed", f"Node(7) already exists with label `{label}` and property `{key}` = 'x'")
+
+class FakeTransaction:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def run(self, query, parameters):
+        async def records():
+            yield {"ok": 1}
+        return records()
+
+    async def commit(self):
+        failures = self.session.driver.failures
+        if failures:
+            raise failures.pop(0)
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def begin_transaction(self):
+        self.driver.transactions += 1
+        return FakeTransaction(self)
+
+    async def execute_write(self, *args):
+        raise AssertionError("writes must not use the driver's retrying execute_write")
+
+class FakeDriver:
+    def __init__(self, failures):
+        self.failures, self.transactions = list(failures), 0
+
+    def session(self, **kwargs):
+        return FakeSession(self)
+
+def run_write(failures, statements):
+    service = AsyncNeo4jService()
+    driver = FakeDriver(failures)
+    with patch.object(service, '_get_driver', return_value=driver), \
+         patch('services.neo4j_async_service.Config.NEO4J_RETRY_BASE_DELAY', 0):
+        try:
+            return asyncio.run(service._run_batch("WRITE", statements)), driver
+        except exceptions.Neo4jError as e:
+            return e, driver
+
+def test_write_conflicts_are_retried_once_per_attempt_in_explicit_transactions():
+    deadlock = neo4j_error("Neo.TransientError.Transaction.DeadlockDetected")
+
+    results, driver = run_write([deadlock, uniqueness_violation("Entity", "name")], [(MERGE_ENTITY, {})])
+
+    assert results == [[{"ok": 1}]]
+    assert driver.transactions == 3
+
+def test_uniqueness_violation_outside_merge_keys_is_not_retried():
+    error, driver = run_write([uniqueness_violation("Claim", "claimId")], [(SET_CLAIM_ID, {})])
+
+    assert isinstance(error, exceptions.ConstraintError)
+    assert driver.transactions == 1
+
+@pytest.mark.parametrize("label,key,expected", [
+    ("Entity", "name", "merge_race"),
+    ("Claim", "text", "merge_race"),
+    ("Claim", "claimId", None),
+    ("Keyword", "text", None),
+])
+def test_constraint_failures_are_merge_races_only_on_merged_keys(label, key, expected):
+    statements = [(MERGE_ENTITY, {}), (SET_CLAIM_ID, {})]
+
+    assert contention_kind(uniqueness_violation(label, key), statements) == expected
+    assert contention_kind(uniqueness_violation(label, key)) is None
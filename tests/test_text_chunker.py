@@ -0,0 +1,42 @@
+from utils.text_chunker import chunk_text, split_sentences
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+def test_split_sentences_on_terminal_punctuation():
+    assert split_sentences("One. Two! Three? Four") == ["One.", "Two!", "Three?", "Four"]
+
+def test_short_text_is_returned_as_is():
+    assert chunk_text("A short text.", max_tokens=10, count_tokens=count_words) == ["A short text."]
+
+def test_chunks_respect_the_token_budget_on_sentence_boundaries():
+    text = " ".join(f"Sentence number {i} here." for i in range(10))  # 4 words each
+
+    chunks = chunk_text(text, max_tokens=10, count_tokens=count_words)
+
+    assert all(count_words(chunk) <= 10 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == text
+
+def test_overlap_repeats_trailing_sentences():
+    text = " ".join(f"Sentence number {i} here." for i in range(6))
+
+    chunks = chunk_text(text, max_tokens=8, overlap_tokens=4, count_tokens=count_words)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split(". ")[0] + "." in previous
+    assert chunks[-1].endswith("Sentence number 5 here.")
+
+def test_overlap_always_moves_forward():
+    text = " ".join(f"Sentence number {i} here." for i in range(6))
+
+    chunks = chunk_text(text, max_tokens=4, overlap_tokens=100, count_tokens=count_words)
+
+    assert len(chunks) == 6
+
+def test_long_sentence_falls_back_to_word_boundaries():
+    text = " ".join(f"w{i}" for i in range(25))
+
+    chunks = chunk_text(text, max_tokens=10, count_tokens=count_words)
+
+    assert [count_words(chunk) for chunk in chunks] == [10, 10, 5]